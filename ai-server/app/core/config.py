@@ -0,0 +1,138 @@
+import os
+
+# ✅ ai-server 루트 및 로컬 데이터 디렉토리
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+def _csv(value: str):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Settings:
+    # ✅ 모델 로딩 설정
+    MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"  # 더미 입력으로 워밍업 수행 여부
+    MODEL_LOAD_RETRY_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_SECONDS", "30"))  # 로드 실패 시 재시도 간격
+
+    # ✅ 멀티 워커 서빙 설정 (python -m app.serve)
+    SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+    SERVE_PORT = int(os.getenv("SERVE_PORT", "8001"))
+    WEB_WORKERS = int(os.getenv("WEB_WORKERS", "1"))
+    # 부모 프로세스에서 미리 로드해 fork 후 copy-on-write로 공유할 태거
+    # (TensorFlow 런타임은 fork-safe 하지 않으므로 companion은 워커에서 로드)
+    PRELOAD_MODELS = _csv(os.getenv("PRELOAD_MODELS", "place,location"))
+
+    # ✅ 워커당 스레드 예산 (0이면 CPU 코어 수 / 워커 수)
+    WORKER_THREADS = int(os.getenv("WORKER_THREADS", "0"))
+    TF_INTER_OP_THREADS = int(os.getenv("TF_INTER_OP_THREADS", "1"))
+
+    # ✅ 태거 프로세스 격리 (TensorFlow 얼굴 스택 / PyTorch CLIP 스택을 별도 프로세스로 실행)
+    # 격리 모드에서는 가중치가 태거 프로세스에 있으므로 PRELOAD_MODELS는 무시됨
+    ISOLATE_TAGGERS = os.getenv("ISOLATE_TAGGERS", "0") == "1"
+    PLACE_PROCESS_THREADS = int(os.getenv("PLACE_PROCESS_THREADS", "0"))  # 0이면 WORKER_THREADS 규칙 사용
+    FACE_PROCESS_THREADS = int(os.getenv("FACE_PROCESS_THREADS", "0"))
+    TAGGER_CALL_TIMEOUT = float(os.getenv("TAGGER_CALL_TIMEOUT", "120"))
+    TAGGER_START_TIMEOUT = float(os.getenv("TAGGER_START_TIMEOUT", "600"))
+
+    # ✅ 장소 모델 (시작 시 로드할 버전, 실행 중에는 POST /admin/models/place/reload로 무중단 교체)
+    PLACE_MODEL_NAME = os.getenv("PLACE_MODEL_NAME", "ViT-L/14")
+    PLACE_THRESHOLD = float(os.getenv("PLACE_THRESHOLD", "0.4"))
+    PLACE_VOCABULARY_PATH = os.getenv("PLACE_VOCABULARY_PATH", "")  # {"영문 레이블": "태그"} JSON, 비우면 내장 목록
+    PLACE_BATCH_SIZE = int(os.getenv("PLACE_BATCH_SIZE", "8"))  # 추론 스레드가 한 번에 인코딩하는 최대 이미지 수
+    PLACE_PREFETCH_IMAGES = int(os.getenv("PLACE_PREFETCH_IMAGES", "32"))  # 전처리 후 추론을 기다릴 수 있는 최대 이미지 수
+    TEXT_EMBEDDING_CACHE_SIZE = int(os.getenv("TEXT_EMBEDDING_CACHE_SIZE", "2048"))  # 검색어 텍스트 임베딩 LRU 크기
+    MODEL_DRAIN_TIMEOUT = float(os.getenv("MODEL_DRAIN_TIMEOUT", "120"))  # 교체된 모델의 진행 중 요청을 기다리는 최대 시간
+
+    # ✅ 사용자 장소 목록 (요청의 places, 전역 장소 목록과 함께 분류)
+    USER_PLACES_MAX_LABELS = int(os.getenv("USER_PLACES_MAX_LABELS", "50"))  # 사용자당 최대 레이블 수
+    USER_PLACES_MAX_USERS = int(os.getenv("USER_PLACES_MAX_USERS", "10000"))  # 목록을 기억할 최대 사용자 수 (LRU)
+    USER_VOCABULARY_CACHE_SIZE = int(os.getenv("USER_VOCABULARY_CACHE_SIZE", "256"))  # 사용자별 레이블 행렬 LRU 크기
+    USER_VOCABULARY_CACHE_DIR = os.getenv("USER_VOCABULARY_CACHE_DIR", os.path.join(DATA_DIR, "user_vocabularies"))
+
+    # ✅ 일기 감정 분석 (POST /ai/emotions, 다국어 NLI 모델로 8가지 감정을 제로샷 분류)
+    # 격리 모드에서도 서버 프로세스에서 실행 (TensorFlow 얼굴 스택은 이미 별도 프로세스)
+    EMOTION_ENABLED = os.getenv("EMOTION_ENABLED", "1") == "1"
+    EMOTION_MODEL_NAME = os.getenv("EMOTION_MODEL_NAME", "MoritzLaurer/multilingual-MiniLMv2-L6-mnli-xnli")
+    EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "16"))  # 한 번에 분류하는 최대 텍스트 수 (텍스트당 가설 8쌍)
+    EMOTION_BATCH_WAIT_MS = float(os.getenv("EMOTION_BATCH_WAIT_MS", "10"))  # 첫 텍스트 이후 다른 요청을 모으는 최대 대기
+    EMOTION_MAX_TOKENS = int(os.getenv("EMOTION_MAX_TOKENS", "256"))  # 일기 + 가설 토큰 상한 (넘으면 일기 뒷부분을 자름)
+    EMOTION_CACHE_SIZE = int(os.getenv("EMOTION_CACHE_SIZE", "4096"))  # 텍스트 해시 → 감정 확률 LRU 크기
+    EMOTION_MAX_TEXTS = int(os.getenv("EMOTION_MAX_TEXTS", "16"))  # 요청당 최대 텍스트 수
+    EMOTION_BULK_MAX_TEXTS = int(os.getenv("EMOTION_BULK_MAX_TEXTS", "256"))  # priority=bulk 요청당 최대 텍스트 수
+    EMOTION_SUGGEST_THRESHOLD = float(os.getenv("EMOTION_SUGGEST_THRESHOLD", "0.2"))
+    EMOTION_SUGGEST_MAX = int(os.getenv("EMOTION_SUGGEST_MAX", "3"))
+
+    # ✅ 비동기 태깅 작업 (POST /ai/jobs)
+    JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))  # 대기 가능한 최대 작업 수
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_CALLBACK_URL = os.getenv("JOB_CALLBACK_URL")  # 요청에 callback_url이 없을 때 사용할 기본값
+    JOB_CALLBACK_RETRIES = int(os.getenv("JOB_CALLBACK_RETRIES", "3"))
+    JOB_CALLBACK_TIMEOUT = float(os.getenv("JOB_CALLBACK_TIMEOUT", "10"))
+    # 실행 중인 작업은 이 간격의 1/3마다 lease를 갱신, 갱신이 끊긴 지 이만큼 지나면 다른 프로세스가 다시 실행 (초)
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+    # ✅ 우선순위 레인 (interactive: 일기 작성, bulk: 재태깅/가져오기)
+    # 레인 간에는 priority가 작은 쪽이 항상 먼저, 같은 priority 안에서는 weight 비율로 배분
+    TAGGING_CONCURRENCY = int(os.getenv("TAGGING_CONCURRENCY", "4"))  # 동시에 태깅 중인 이미지 수 상한
+    TAGGING_LANES = {
+        "interactive": {
+            "priority": 0,
+            "weight": 1.0,
+            "max_concurrency": int(os.getenv("LANE_INTERACTIVE_CONCURRENCY", "4")),
+            "max_pending": int(os.getenv("LANE_INTERACTIVE_MAX_PENDING", "64")),  # 수락 후 미완료 이미지 수 상한
+        },
+        "bulk": {
+            "priority": 1,
+            "weight": 1.0,
+            # 전체보다 작게 두어 interactive용 슬롯을 항상 남김
+            "max_concurrency": int(os.getenv("LANE_BULK_CONCURRENCY", "2")),
+            "max_pending": int(os.getenv("LANE_BULK_MAX_PENDING", "256")),
+        },
+    }
+    DEFAULT_LANE = "interactive"
+    JOB_DEFAULT_LANE = os.getenv("JOB_DEFAULT_LANE", "bulk")
+
+    # ✅ 요청 마감 시간 (X-Request-Deadline-Ms 헤더 또는 deadline_ms 필드, 0이면 무제한)
+    DEFAULT_DEADLINE_MS = int(os.getenv("DEFAULT_DEADLINE_MS", "0"))
+    # 남은 시간이 (예상 소요 시간 × 이 값)보다 작으면 해당 단계를 건너뜀
+    STAGE_SKIP_SAFETY = float(os.getenv("STAGE_SKIP_SAFETY", "1.2"))
+
+    # ✅ 바이트 업로드 입력 (multipart / raw body) 이미지 한 장의 최대 크기
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+
+    # ✅ 지역 태그만 필요한 요청(stages=["region"])은 Range 요청으로 JPEG 앞부분(EXIF APP1)만 받음
+    EXIF_RANGE_INITIAL_BYTES = int(os.getenv("EXIF_RANGE_INITIAL_BYTES", "16384"))  # 첫 요청 크기, 부족하면 늘려 재요청
+    EXIF_RANGE_MAX_BYTES = int(os.getenv("EXIF_RANGE_MAX_BYTES", str(256 * 1024)))  # 이보다 뒤에 있으면 EXIF 없음으로 처리
+
+    # ✅ 연속 촬영(버스트) 근접 중복 이미지 태그 재사용 (dHash 해밍 거리 기준, 0이면 비활성)
+    PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "6"))
+    PHASH_INDEX_SIZE = int(os.getenv("PHASH_INDEX_SIZE", "64"))  # 사용자별 최근 해시 보관 개수
+    PHASH_INDEX_USERS = int(os.getenv("PHASH_INDEX_USERS", "1000"))  # 인덱스를 유지할 최대 사용자 수 (LRU)
+    PHASH_TTL_SECONDS = float(os.getenv("PHASH_TTL_SECONDS", "86400"))
+
+    # ✅ 분산 트레이싱 (backend에서 받은 traceparent 이어받기, span은 로컬 JSONL 파일로 기록)
+    SERVICE_NAME = os.getenv("SERVICE_NAME", "mindlog-ai-server")
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))  # traceparent 없이 들어온 요청의 샘플링 비율
+    TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join(DATA_DIR, "traces.jsonl"))
+    TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(50 * 1024 * 1024)))  # 넘으면 .1로 회전
+
+    # ✅ 관리자 API 토큰 (X-Admin-Token 헤더, 비어 있으면 관리자 API와 프로파일링 비활성)
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+    # ✅ 온디맨드 프로파일링 (관리자 API로 켜거나 X-Profile: <ADMIN_TOKEN> 헤더로 요청 단위 실행)
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 시작 시 샘플링 비율 (0이면 꺼짐)
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))  # 스택 샘플링 간격
+    PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "4"))  # 동시에 프로파일링할 최대 요청 수
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(DATA_DIR, "profiles"))
+
+    # ✅ 인물 태깅 얼굴 DB (벤치마크처럼 운영 DB를 건드리면 안 되는 실행은 별도 경로 지정)
+    FACE_DATABASE_PATH = os.getenv("FACE_DATABASE_PATH", os.path.join(DATA_DIR, "face_database.json"))
+    FACE_IMAGE_DIR = os.getenv("FACE_IMAGE_DIR", os.path.join(DATA_DIR, "faces"))
+
+    # ✅ 역지오코딩 (Nominatim 호환 /reverse 엔드포인트, 공개 서버 정책상 요청 간 최소 1초)
+    NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse")
+    GEOCODE_MIN_INTERVAL = float(os.getenv("GEOCODE_MIN_INTERVAL", "1.0"))
+
+
+settings = Settings()
@@ -0,0 +1,23 @@
+import time
+from typing import Optional
+
+
+class Deadline:
+    """🔹 요청 단위 마감 시간 (budget_ms가 없으면 무제한)"""
+
+    def __init__(self, budget_ms: Optional[int] = None):
+        self.expires_at = time.monotonic() + budget_ms / 1000 if budget_ms else None
+
+    def remaining(self) -> Optional[float]:
+        """🔹 남은 시간(초), 무제한이면 None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def allows(self, estimated_seconds: float) -> bool:
+        remaining = self.remaining()
+        return remaining is None or remaining >= estimated_seconds
@@ -0,0 +1,264 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class Counter:
+    """🔹 단조 증가 카운터 (레이블 조합별 값)"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+    def drain(self):
+        """🔹 지금까지 값 반환 후 초기화 (태거 프로세스 → 부모로 전달용)"""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0) + value
+
+
+# ✅ 기본 히스토그램 구간 (초) — 이미지 한 장 단계 시간 기준
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """🔹 구간별 누적 관측 수 + 합계 (레이블 조합별)"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}  # key → [구간별 개수..., +Inf 개수, 합계]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[len(self.buckets)] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """🔹 with 블록 실행 시간 관측 (예외가 나도 기록)"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def count(self, **labels) -> int:
+        counts = self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        samples = []
+        for key, counts in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": f"{bound:g}"}, cumulative))
+            cumulative += counts[len(self.buckets)]
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, cumulative))
+            samples.append((f"{self.name}_sum", labels, round(counts[-1], 6)))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+    def drain(self):
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values):
+        with self._lock:
+            for key, counts in values.items():
+                current = self._values.get(key)
+                if current is None:
+                    self._values[key] = list(counts)
+                else:
+                    for index, value in enumerate(counts):
+                        current[index] += value
+
+
+class Gauge:
+    """🔹 현재 값 게이지 (set으로 갱신하거나, collect 콜백이 출력 시점에 값을 읽음)
+
+    collect는 (레이블 dict, 값) 목록을 반환한다.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Iterable[Tuple[dict, float]]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.collect = collect
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[tuple(str(labels.get(name, "")) for name in self.labelnames)] = value
+
+    def samples(self):
+        if self.collect is not None:
+            return [(self.name, labels, value) for labels, value in self.collect() if value is not None]
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in list(self._values.items())]
+
+
+class Registry:
+    """🔹 메트릭 모음 + Prometheus 텍스트 포맷 출력"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def drain(self) -> dict:
+        """🔹 카운터/히스토그램 증분 스냅샷 (태거 프로세스 응답에 실어 보냄)"""
+        return {name: metric.drain() for name, metric in self._metrics.items() if hasattr(metric, "drain")}
+
+    def merge(self, snapshot: dict):
+        """🔹 다른 프로세스에서 받은 증분을 합침"""
+        for name, values in (snapshot or {}).items():
+            metric = self._metrics.get(name)
+            if metric is not None and values:
+                metric.merge(values)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def gauge(name: str, documentation: str, labelnames: Tuple[str, ...] = (), collect=None) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames, collect))
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """🔹 프로세스 상주 메모리 (리눅스 /proc 기준, 읽을 수 없으면 None)"""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# ✅ 공통 메트릭
+COALESCED_REQUESTS = counter(
+    "mindlog_coalesced_requests_total",
+    "동일 이미지의 진행 중 계산에 합류한 요청 수",
+    ("level",),  # url: 같은 URL, content: 다른 URL이지만 같은 바이트
+)
+
+NEAR_DUPLICATE_REUSES = counter(
+    "mindlog_near_duplicate_reuses_total",
+    "근접 중복(dHash) 이미지에서 태그를 재사용한 단계 수",
+    ("stage",),
+)
+
+# ✅ 단계별 소요 시간
+# download / decode / resize: 요청 이미지 준비, clip_encode: CLIP 인코딩 + 유사도,
+# face_detect / face_embed / db_match: 인물 태깅, geocode: 역지오코딩, e2e: 이미지 한 장 전체
+STAGE_SECONDS = histogram(
+    "mindlog_stage_seconds",
+    "이미지 처리 단계별 소요 시간 (초)",
+    ("stage",),
+)
+
+STAGE_ERRORS = counter(
+    "mindlog_errors_total",
+    "단계별 처리 실패 수",
+    ("stage",),
+)
+
+CACHE_LOOKUPS = counter(
+    "mindlog_cache_lookups_total",
+    "캐시 조회 결과",
+    ("cache", "result"),  # result: hit / miss
+)
+
+FETCH_BYTES = histogram(
+    "mindlog_fetch_bytes",
+    "이미지 한 장을 가져오며 받은 바이트 수",
+    ("mode",),  # full: 전체 다운로드, exif_range: Range 요청으로 EXIF 구간만
+    buckets=(4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+CLIP_BATCH_IMAGES = histogram(
+    "mindlog_clip_batch_images",
+    "CLIP 추론 스레드가 한 번에 인코딩한 이미지 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+EMOTION_BATCH_TEXTS = histogram(
+    "mindlog_emotion_batch_texts",
+    "감정 분류 스레드가 한 번에 분류한 텍스트 수",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+FACES_PER_IMAGE = histogram(
+    "mindlog_faces_per_image",
+    "이미지당 검출된 얼굴 수",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21),
+)
+
+PROCESS_MEMORY = gauge(
+    "mindlog_process_resident_memory_bytes",
+    "API 프로세스 상주 메모리",
+    collect=lambda: [({}, rss_bytes())],
+)
@@ -0,0 +1,301 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import gauge, rss_bytes
+from app.core.threads import configure_torch_threads
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotReadyError(RuntimeError):
+    """🔹 아직 로드/워밍업이 끝나지 않은 태거를 요청한 경우"""
+
+
+class ModelReloadError(RuntimeError):
+    """🔹 이미 교체가 진행 중이거나 교체할 수 없는 태거"""
+
+
+class ModelSlot:
+    """🔹 태거 하나의 로드 상태 (pending → loading → warming → ready / failed)
+
+    교체(reload) 중에는 현재 인스턴스가 계속 요청을 받고, 새 인스턴스는 candidate에 준비 상태가 기록된다.
+    """
+
+    def __init__(self, name: str, factory: Callable[..., object]):
+        self.name = name
+        self.factory = factory
+        self.instance = None
+        self.version = None
+        self.generation = 0  # 인스턴스가 바뀔 때마다 1씩 증가
+        self.leases: Dict[int, int] = {}  # 인스턴스 id → 사용 중인 요청 수
+        self.condition = threading.Condition()
+        self.candidate = None  # 진행 중이거나 마지막으로 시도한 교체 상태
+        self.status = "pending"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.memory_bytes = None  # 로드 전후 RSS 차이 (같은 프로세스에서 로드한 경우)
+        self.ready_event = threading.Event()
+
+    def install(self, instance) -> Optional[object]:
+        """🔹 새 인스턴스로 원자적으로 교체 → 이전 인스턴스 반환"""
+        with self.condition:
+            previous = self.instance
+            self.instance = instance
+            self.version = getattr(instance, "version", None) or f"{self.name}-{self.generation + 1}"
+            self.generation += 1
+        return previous
+
+    def drain(self, instance, timeout: float) -> bool:
+        """🔹 이전 인스턴스를 빌려 간 요청이 모두 반납될 때까지 대기 (시간 초과면 False)"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.leases.get(id(instance)), timeout)
+
+    def to_dict(self):
+        return {
+            "status": self.status,
+            "version": self.version,
+            "generation": self.generation,
+            "in_flight": sum(self.leases.values()),
+            "reload": self.candidate,
+            "error": self.error,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "memory_bytes": self.memory_bytes,
+        }
+
+    def current_memory_bytes(self):
+        """🔹 전용 프로세스에서 도는 태거는 그 프로세스 RSS, 아니면 로드 시 측정값"""
+        if hasattr(self.instance, "memory_bytes"):
+            return self.instance.memory_bytes()
+        return self.memory_bytes
+
+
+class ModelManager:
+    """🔹 태거 지연 로딩 + 백그라운드 워밍업 관리자
+
+    프로세스 시작 시에는 아무 모델도 import 하지 않고, `start()`가 띄운
+    백그라운드 스레드에서 등록 순서대로 모델을 로드한 뒤 더미 입력으로
+    한 번 추론해 lazy 커널 초기화를 미리 끝낸다.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, ModelSlot] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, name: str, factory: Callable[[], object]):
+        self._slots[name] = ModelSlot(name, factory)
+
+    def start(self):
+        """🔹 백그라운드 로딩 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._load_loop, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def load_all(self, warmup: bool = None, names=None):
+        """🔹 모든 태거(names가 주어지면 그 태거만)를 현재 스레드에서 동기 로드"""
+        for name, slot in self._slots.items():
+            if names is not None and name not in names:
+                continue
+            if slot.status != "ready":
+                self._load(slot, settings.MODEL_WARMUP if warmup is None else warmup)
+
+    def preload(self, names):
+        """🔹 가중치만 로드하고 워밍업은 하지 않음 (fork 전 부모 프로세스용)
+
+        부모에서 추론을 한 번이라도 돌리면 OpenMP 스레드 풀이 생성되어 fork 된
+        자식에서 교착될 수 있으므로 torch 스레드를 1개로 묶어 둔 상태로 로드만 한다.
+        워밍업은 각 워커의 `start()`에서 수행된다.
+        """
+        for name in names:
+            slot = self._slots[name]
+            if slot.instance is not None:
+                continue
+            configure_torch_threads(1)
+            start_time, start_rss = time.time(), rss_bytes()
+            slot.install(slot.factory())
+            slot.load_seconds = round(time.time() - start_time, 3)
+            slot.memory_bytes = _rss_delta(start_rss)
+            slot.status = "loaded"
+            logger.info(f"✅ {name} 태거 사전 로드 완료 (소요시간: {slot.load_seconds}초)")
+
+    def _load_loop(self):
+        while True:
+            self.load_all()
+            if self.is_ready():
+                return
+            logger.warning(f"⚠️ 일부 모델 로드 실패 → {settings.MODEL_LOAD_RETRY_SECONDS:.0f}초 후 재시도")
+            time.sleep(settings.MODEL_LOAD_RETRY_SECONDS)
+
+    def _load(self, slot: ModelSlot, warmup: bool):
+        try:
+            if slot.instance is None:
+                slot.status = "loading"
+                start_time, start_rss = time.time(), rss_bytes()
+                slot.install(slot.factory())
+                slot.load_seconds = round(time.time() - start_time, 3)
+                slot.memory_bytes = _rss_delta(start_rss)
+            configure_torch_threads()
+
+            if warmup and hasattr(slot.instance, "warmup"):
+                slot.status = "warming"
+                start_time = time.time()
+                slot.instance.warmup()
+                slot.warmup_seconds = round(time.time() - start_time, 3)
+
+            slot.status = "ready"
+            slot.error = None
+            slot.ready_event.set()
+            logger.info(f"✅ {slot.name} 태거 준비 완료 (로드: {slot.load_seconds}초, 워밍업: {slot.warmup_seconds}초)")
+        except Exception as e:
+            slot.status = "failed"
+            slot.error = str(e)
+            logger.error(f"❌ {slot.name} 태거 로드 실패: {e}", exc_info=True)
+
+    def get(self, name: str):
+        """🔹 준비된 태거 인스턴스 반환 (준비 전이면 ModelNotReadyError)"""
+        slot = self._slots[name]
+        if not slot.ready_event.is_set():
+            raise ModelNotReadyError(f"{name} 태거가 아직 준비되지 않았습니다 (상태: {slot.status})")
+        return slot.instance
+
+    @contextmanager
+    def lease(self, name: str):
+        """🔹 준비된 태거를 (인스턴스, 버전)으로 빌려 씀
+
+        사용 중에 교체되어도 빌린 인스턴스는 반납될 때까지 정리되지 않는다.
+        """
+        slot = self._slots[name]
+        with slot.condition:
+            instance, version = self.get(name), slot.version
+            slot.leases[id(instance)] = slot.leases.get(id(instance), 0) + 1
+        try:
+            yield instance, version
+        finally:
+            with slot.condition:
+                slot.leases[id(instance)] -= 1
+                if not slot.leases[id(instance)]:
+                    del slot.leases[id(instance)]
+                    slot.condition.notify_all()
+
+    def reload(self, name: str, **options):
+        """🔹 새 버전 태거를 백그라운드에서 로드 + 워밍업한 뒤 교체하고 이전 버전을 정리
+
+        교체 전까지는 현재 버전이 계속 요청을 처리하고, 교체 이후의 새 요청만 새 버전을 쓴다.
+        options는 태거 생성 인자로 그대로 전달된다. 이미 교체 중이면 ModelReloadError.
+        """
+        if name not in self._slots:
+            raise ModelReloadError(f"알 수 없는 태거: {name}")
+        slot = self._slots[name]
+        with self._lock:
+            if slot.candidate is not None and slot.candidate["status"] in ("loading", "warming", "draining"):
+                raise ModelReloadError(f"{name} 태거 교체가 이미 진행 중입니다 (상태: {slot.candidate['status']})")
+            summary = {key: (f"{len(value)}개" if key == "vocabulary" else value) for key, value in options.items()}
+            slot.candidate = {"status": "loading", "options": summary, "version": None, "error": None,
+                              "started_at": time.time()}
+        threading.Thread(target=self._reload, args=(slot, options), name=f"{name}-reload", daemon=True).start()
+        return slot.candidate
+
+    def _reload(self, slot: ModelSlot, options: dict):
+        candidate = slot.candidate
+        try:
+            start_time = time.time()
+            instance = slot.factory(**options)
+            candidate["load_seconds"] = round(time.time() - start_time, 3)
+            candidate["version"] = getattr(instance, "version", None)
+
+            if settings.MODEL_WARMUP and hasattr(instance, "warmup"):
+                candidate["status"] = "warming"
+                start_time = time.time()
+                instance.warmup()
+                candidate["warmup_seconds"] = round(time.time() - start_time, 3)
+        except Exception as e:
+            candidate["status"] = "failed"
+            candidate["error"] = str(e)
+            logger.error(f"❌ {slot.name} 태거 교체 실패 (현재 버전 유지: {slot.version}): {e}", exc_info=True)
+            return
+
+        previous_version = slot.version
+        previous = slot.install(instance)
+        slot.status, slot.error = "ready", None
+        slot.load_seconds, slot.warmup_seconds = candidate.get("load_seconds"), candidate.get("warmup_seconds")
+        slot.memory_bytes = None  # 두 버전이 같은 프로세스에 있었으므로 RSS 차이로는 측정 불가
+        slot.ready_event.set()
+        candidate["version"] = slot.version
+        logger.info(f"✅ {slot.name} 태거 교체: {previous_version} → {slot.version}")
+
+        if previous is not None:
+            candidate["status"] = "draining"
+            if not slot.drain(previous, settings.MODEL_DRAIN_TIMEOUT):
+                logger.warning(f"⚠️ {slot.name} 이전 버전({previous_version}) 요청이 {settings.MODEL_DRAIN_TIMEOUT:.0f}초 내 "
+                               f"끝나지 않음 → 그대로 정리")
+            if hasattr(previous, "close"):
+                previous.close()
+        candidate["status"] = "done"
+        candidate["finished_at"] = time.time()
+
+    def is_ready(self, names=None) -> bool:
+        """🔹 등록된 모든 모델(names가 주어지면 그 모델만)이 준비됐으면 True"""
+        return all(slot.ready_event.is_set() for name, slot in self._slots.items() if names is None or name in names)
+
+    def status(self) -> dict:
+        return {name: slot.to_dict() for name, slot in self._slots.items()}
+
+
+def _rss_delta(start_rss):
+    end_rss = rss_bytes()
+    if start_rss is None or end_rss is None:
+        return None
+    return max(0, end_rss - start_rss)
+
+
+def _create_place_tagger(**options):
+    if settings.ISOLATE_TAGGERS:
+        from app.workers.isolated import IsolatedTagger
+        return IsolatedTagger("place", **options)
+    from app.models.place_tag import PlaceTagger
+    return PlaceTagger(**options)
+
+
+def _create_location_tagger():
+    from app.models.location_tag import LocationTagger
+    return LocationTagger()
+
+
+def _create_companion_tagger():
+    if settings.ISOLATE_TAGGERS:
+        from app.workers.isolated import IsolatedTagger
+        return IsolatedTagger("companion")
+    from app.models.companion_tag import CompanionTagger
+    return CompanionTagger()
+
+
+def _create_emotion_classifier(**options):
+    from app.models.emotion_tag import EmotionClassifier
+    return EmotionClassifier(**options)
+
+
+# ✅ 이미지 태깅에 필요한 태거 (/health/ready와 작업 큐는 이 태거들만 기다림, 감정 모델은 따로 준비됨)
+TAGGER_MODELS = ("place", "location", "companion")
+
+# ✅ 전역 모델 관리자 (태거 모듈은 로딩 스레드에서 처음 import 됨)
+model_manager = ModelManager()
+model_manager.register("place", _create_place_tagger)
+model_manager.register("location", _create_location_tagger)
+model_manager.register("companion", _create_companion_tagger)
+if settings.EMOTION_ENABLED:
+    model_manager.register("emotion", _create_emotion_classifier)
+
+gauge("mindlog_model_memory_bytes", "태거별 모델 메모리 (전용 프로세스면 그 RSS, 아니면 로드 시 RSS 증가량)", ("model",),
+      collect=lambda: [({"model": name}, slot.current_memory_bytes()) for name, slot in model_manager._slots.items()])
+gauge("mindlog_model_generation", "태거별 현재 인스턴스 세대 (교체할 때마다 증가, version 레이블은 현재 버전)",
+      ("model", "version"),
+      collect=lambda: [({"model": name, "version": slot.version or ""}, slot.generation)
+                       for name, slot in model_manager._slots.items()])
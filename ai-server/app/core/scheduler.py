@@ -0,0 +1,203 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from app.core.config import settings
+from app.core.metrics import gauge
+from app.core.tracing import span
+
+
+class UnknownLaneError(ValueError):
+    """🔹 등록되지 않은 우선순위 레인"""
+
+
+class AdmissionError(RuntimeError):
+    """🔹 레인의 수락 한도를 넘은 요청 (retry_after: 재시도 권장 초)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Lane:
+    """🔹 우선순위 레인 하나의 대기열과 통계"""
+
+    def __init__(self, name: str, priority: int, weight: float, max_concurrency: int, max_pending: int):
+        self.name = name
+        self.priority = priority  # 작을수록 먼저 처리 (우선순위 그룹 간에는 엄격한 우선)
+        self.weight = weight  # 같은 우선순위 그룹 안에서의 공정 분배 가중치
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending  # 수락했지만 끝나지 않은 작업 단위 상한 (초과 시 429)
+        self.waiters = deque()  # (future, enqueued_at)
+        self.running = 0
+        self.pending = 0
+        self.virtual_time = 0.0
+        self.ewma_service = 1.0  # 슬롯 점유 시간 EWMA (Retry-After 추정용)
+
+        self.dispatched = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.ewma_wait = 0.0
+
+    def record_wait(self, wait: float):
+        self.dispatched += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.ewma_wait = wait if self.dispatched == 1 else 0.8 * self.ewma_wait + 0.2 * wait
+
+    def record_service(self, duration: float):
+        self.ewma_service = 0.8 * self.ewma_service + 0.2 * duration
+
+    def retry_after(self) -> int:
+        """🔹 현재 적체량이 빠지는 데 걸릴 예상 시간 (초)"""
+        return max(1, math.ceil(self.pending * self.ewma_service / max(1, self.max_concurrency)))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "priority": self.priority,
+            "weight": self.weight,
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "depth": len(self.waiters),
+            "running": self.running,
+            "dispatched": self.dispatched,
+            "avg_wait_seconds": round(self.total_wait / self.dispatched, 4) if self.dispatched else 0.0,
+            "ewma_wait_seconds": round(self.ewma_wait, 4),
+            "max_wait_seconds": round(self.max_wait, 4),
+            "oldest_wait_seconds": round(now - self.waiters[0][1], 4) if self.waiters else 0.0,
+        }
+
+
+class LaneScheduler:
+    """🔹 우선순위 레인 스케줄러
+
+    - 전체 동시 실행 수(max_concurrency)와 레인별 동시 실행 수를 함께 제한
+    - 대기 중인 작업은 우선순위 그룹이 높은 레인부터 배정 → interactive가 대기 중인 bulk를 항상 앞지름
+    - 같은 우선순위 그룹 안에서는 가중치 기반 가상 시간(WFQ)으로 공정하게 배정
+    - bulk 레인의 동시 실행 수를 전체보다 작게 두면 interactive용 슬롯이 항상 남는다
+    """
+
+    def __init__(self, lanes: Dict[str, dict], max_concurrency: int):
+        self.lanes = {name: Lane(name, **config) for name, config in lanes.items()}
+        self.max_concurrency = max_concurrency
+        self.running = 0
+
+    def lane(self, name: str) -> Lane:
+        if name not in self.lanes:
+            raise UnknownLaneError(f"알 수 없는 우선순위 레인: {name} (가능: {', '.join(self.lanes)})")
+        return self.lanes[name]
+
+    def _eligible(self):
+        return [lane for lane in self.lanes.values() if lane.waiters and lane.running < lane.max_concurrency]
+
+    def _dispatch(self):
+        """🔹 빈 슬롯이 있는 동안 (우선순위, 가상 시간) 최소 레인의 대기 작업을 깨움"""
+        while self.running < self.max_concurrency:
+            eligible = self._eligible()
+            if not eligible:
+                return
+            lane = min(eligible, key=lambda item: (item.priority, item.virtual_time))
+            future, enqueued_at = lane.waiters.popleft()
+            if future.done():  # 대기 중 취소된 요청
+                continue
+            self._start(lane, time.monotonic() - enqueued_at)
+            future.set_result(None)
+
+    def _start(self, lane: Lane, wait: float):
+        # 오래 쉬던 레인이 밀린 가상 시간을 몰아서 쓰지 않도록 활성 레인의 최소값에 맞춤
+        active = [other.virtual_time for other in self.lanes.values()
+                  if other is not lane and other.priority == lane.priority and (other.waiters or other.running)]
+        if active:
+            lane.virtual_time = max(lane.virtual_time, min(active))
+        lane.virtual_time += 1.0 / lane.weight
+        lane.running += 1
+        self.running += 1
+        lane.record_wait(wait)
+
+    async def acquire(self, lane_name: str):
+        lane = self.lane(lane_name)
+        if self.running < self.max_concurrency and lane.running < lane.max_concurrency and not self._eligible():
+            self._start(lane, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        lane.waiters.append((future, time.monotonic()))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 받은 직후 취소된 경우 → 반납
+                self.release(lane_name)
+            raise
+
+    def release(self, lane_name: str):
+        lane = self.lanes[lane_name]
+        lane.running -= 1
+        self.running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, lane_name: str, timeout: float = None):
+        """🔹 레인 슬롯을 잡은 동안만 모델 작업 실행 (timeout 초과 시 asyncio.TimeoutError)
+
+        yield한 리스트에 넣은 future가 블록을 벗어날 때까지 끝나지 않았으면 (마감으로 결과를 버린 모델 스레드 등)
+        그 future가 모두 끝난 뒤에 슬롯을 반납한다 → 버린 작업이 슬롯 밖에서 CPU를 계속 쓰지 않음.
+        """
+        with span("scheduler.wait", lane=lane_name):
+            await asyncio.wait_for(self.acquire(lane_name), timeout)
+        started_at = time.monotonic()
+        holds = []
+
+        def _finish(_=None):
+            self.lanes[lane_name].record_service(time.monotonic() - started_at)
+            self.release(lane_name)
+
+        try:
+            yield holds
+        finally:
+            pending = [future for future in holds if not future.done()]
+            if pending:
+                asyncio.gather(*pending, return_exceptions=True).add_done_callback(_finish)
+            else:
+                _finish()
+
+    def admit(self, lane_name: str, units: int):
+        """🔹 요청 수락 (레인의 미완료 작업이 max_pending을 넘으면 AdmissionError)
+
+        레인이 비어 있으면 한도보다 큰 요청도 받아 큰 일기 하나가 영원히 거절되지 않게 한다.
+        """
+        lane = self.lane(lane_name)
+        if lane.pending and lane.pending + units > lane.max_pending:
+            raise AdmissionError(
+                f"{lane_name} 레인이 가득 찼습니다 (대기 {lane.pending}/{lane.max_pending})",
+                lane.retry_after(),
+            )
+        lane.pending += units
+
+    def finish(self, lane_name: str, units: int):
+        self.lanes[lane_name].pending -= units
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": self.running,
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+        }
+
+
+# ✅ 전역 태깅 스케줄러 (이미지 단위로 슬롯 할당)
+tagging_scheduler = LaneScheduler(settings.TAGGING_LANES, settings.TAGGING_CONCURRENCY)
+
+# ✅ 레인별 대기열 게이지 (/metrics 출력 시점에 읽음)
+gauge("mindlog_lane_queue_depth", "레인별 슬롯을 기다리는 이미지 수", ("lane",),
+      collect=lambda: [({"lane": name}, len(lane.waiters)) for name, lane in tagging_scheduler.lanes.items()])
+gauge("mindlog_lane_running", "레인별 실행 중인 이미지 수", ("lane",),
+      collect=lambda: [({"lane": name}, lane.running) for name, lane in tagging_scheduler.lanes.items()])
+gauge("mindlog_lane_pending", "레인별 수락했지만 끝나지 않은 이미지 수", ("lane",),
+      collect=lambda: [({"lane": name}, lane.pending) for name, lane in tagging_scheduler.lanes.items()])
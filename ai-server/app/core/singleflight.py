@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core.metrics import COALESCED_REQUESTS
+
+
+class SingleFlight:
+    """🔹 같은 키의 진행 중 계산을 하나로 합치는 single-flight 그룹
+
+    첫 요청이 계산을 별도 태스크로 시작하고, 끝나기 전에 들어온 같은 키의 요청은
+    그 태스크의 결과를 함께 기다린다. 계산을 시작한 요청이 취소되어도 태스크는
+    계속 진행되므로 합류한 요청은 영향을 받지 않는다.
+    shareable이 주어지면 합류한 요청은 그 조건을 만족하는 결과만 받고,
+    아니면 (예: 먼저 온 요청의 마감이 짧아 단계를 건너뜀) 직접 다시 계산한다.
+    timeout(초)이 주어지면 합류한 요청은 그만큼만 기다리고, 그때까지 끝나지 않으면 직접 계산한다
+    (먼저 온 요청이 느린 작업이어도 자기 마감을 지킴).
+    on_join이 주어지면 합류하는 시점에 호출한다 (직접 계산하지 않는다는 것을 알려야 하는 경우).
+    """
+
+    def __init__(self, level: str):
+        self.level = level
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable],
+                 shareable: Optional[Callable[[Any], bool]] = None, timeout: Optional[float] = None,
+                 on_join: Optional[Callable[[], None]] = None):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            return await asyncio.shield(task)
+        COALESCED_REQUESTS.inc(level=self.level)
+        if on_join is not None:
+            on_join()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            return await fn()
+        if shareable is None or shareable(result):
+            return result
+        return await fn()
+
+    def inflight(self) -> int:
+        return len(self._inflight)
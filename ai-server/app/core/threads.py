@@ -0,0 +1,42 @@
+import os
+import sys
+
+from app.core.config import settings
+
+# ✅ 네이티브 스레드 풀 크기를 결정하는 환경 변수 (torch/numpy/TF가 import 되기 전에 설정해야 적용됨)
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "TF_NUM_INTRAOP_THREADS")
+
+
+def worker_thread_budget() -> int:
+    """🔹 워커 하나가 사용할 intra-op 스레드 수"""
+    if settings.WORKER_THREADS > 0:
+        return settings.WORKER_THREADS
+    return max(1, (os.cpu_count() or 1) // max(1, settings.WEB_WORKERS))
+
+
+def apply_thread_env(override: bool = False):
+    """🔹 스레드 관련 환경 변수 설정 (override=False면 사용자가 지정한 값은 유지)"""
+    values = {name: str(worker_thread_budget()) for name in _THREAD_ENV_VARS}
+    values["TF_NUM_INTEROP_THREADS"] = str(settings.TF_INTER_OP_THREADS)
+    for name, value in values.items():
+        if override:
+            os.environ[name] = value
+        else:
+            os.environ.setdefault(name, value)
+
+
+def configure_torch_threads(num_threads: int = None):
+    """🔹 torch intra-op 스레드 수 설정 (torch가 이미 import 된 경우에만)"""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(num_threads or worker_thread_budget())
+
+
+def configure_tensorflow_threads(tf):
+    """🔹 TF intra/inter-op 스레드 수 설정 (TF 런타임 초기화 전에만 가능)"""
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(worker_thread_budget())
+        tf.config.threading.set_inter_op_parallelism_threads(settings.TF_INTER_OP_THREADS)
+    except RuntimeError:
+        # 이미 초기화된 런타임에서는 변경 불가 → 환경 변수 값이 적용됨
+        pass
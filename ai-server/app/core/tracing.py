@@ -0,0 +1,245 @@
+"""🔹 분산 트레이싱 (W3C traceparent 전파 + 로컬 JSONL 내보내기)
+
+외부 수집기 없이 동작하도록 span을 로컬 JSONL 파일에 한 줄씩 기록한다.
+backend와 ai-server가 같은 trace_id를 이어 쓰므로 두 서비스의 파일을 trace_id로
+합치면 일기 업로드 하나의 전체 타임라인(S3 업로드 → AI 요청 → 모델 단계)을 볼 수 있다.
+
+원본은 ai-server/app/core/tracing.py이고 backend/app/core/tracing.py는 그대로 복사한 사본이다
+(두 서비스는 따로 빌드되어 공유 패키지가 없음). 고칠 때는 원본을 고친 뒤 복사한다.
+"""
+import atexit
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from app.core.config import settings
+
+
+class Span:
+    """🔹 작업 구간 하나 (sampled=False면 전파만 하고 기록하지 않음)"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "sampled", "attributes",
+                 "status", "start_time", "_started_at")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_time = time.time()
+        self._started_at = time.perf_counter()
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error"] = f"{type(error).__name__}: {error}"
+
+    def duration_ms(self) -> float:
+        return round((time.perf_counter() - self._started_at) * 1000, 3)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_dict(self) -> dict:
+        return {
+            "service": settings.SERVICE_NAME,
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": round(self.start_time, 6),
+            "duration_ms": self.duration_ms(),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class FileExporter:
+    """🔹 span을 백그라운드 스레드에서 JSONL 파일에 추가 (요청 경로에서는 큐에 넣기만 함)
+
+    fork 된 워커/태거 프로세스마다 자기 스레드를 새로 띄우고, 같은 파일에 append 한다.
+    파일이 max_bytes를 넘으면 `.1`로 한 번 회전한다.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: Optional[queue.Queue] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=10000)
+            threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True).start()
+            self._pid = os.getpid()
+
+    def export(self, span: dict):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass  # 내보내기가 밀리면 span을 버림 (요청을 막지 않음)
+
+    def _drain(self, first=None):
+        batch = [first] if first is not None else []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, self.path + ".1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in batch))
+        except OSError:
+            pass
+
+    def _write_loop(self):
+        while True:
+            self._write(self._drain(self._queue.get()))
+
+    def flush(self):
+        if self._pid == os.getpid():
+            self._write(self._drain())
+
+
+_exporter = FileExporter(settings.TRACE_EXPORT_PATH, settings.TRACE_MAX_BYTES)
+atexit.register(_exporter.flush)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+# ✅ span 종료 알림 (프로파일러가 단계별 시간을 모을 때만 등록됨, 평소에는 비어 있음)
+_span_listeners = []
+
+
+def add_span_listener(listener):
+    _span_listeners.append(listener)
+
+
+def remove_span_listener(listener):
+    if listener in _span_listeners:
+        _span_listeners.remove(listener)
+
+
+def parse_traceparent(header: Optional[str]):
+    """🔹 W3C traceparent → (trace_id, parent_span_id, sampled), 형식이 틀리면 None"""
+    if not header:
+        return None
+    parts = header.strip().lower().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[0] == "ff" or parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+@contextmanager
+def _activate(span: Span):
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        if span.sampled:
+            _exporter.export(span.to_dict())
+        for listener in list(_span_listeners):
+            listener(span)
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes):
+    """🔹 서버/루트 span: 들어온 traceparent를 이어받거나 새 trace 시작 (샘플링은 부모 결정을 따름)"""
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+    parent = parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id, sampled = os.urandom(16).hex(), None, random.random() < settings.TRACE_SAMPLE_RATE
+    with _activate(Span(name, trace_id, parent_id, sampled, attributes)) as span:
+        yield span
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """🔹 현재 trace 안의 하위 span (진행 중인 trace가 없으면 아무것도 하지 않음)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with _activate(Span(name, parent.trace_id, parent.span_id, parent.sampled, attributes)) as child:
+        yield child
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+def current_traceparent() -> Optional[str]:
+    current = _current_span.get()
+    return current.traceparent() if current is not None else None
+
+
+def inject(headers: dict) -> dict:
+    """🔹 나가는 요청 헤더에 현재 trace 컨텍스트 추가"""
+    traceparent = current_traceparent()
+    if traceparent:
+        headers["traceparent"] = traceparent
+    return headers
+
+
+class TracingMiddleware:
+    """🔹 요청마다 서버 span 생성 (ASGI, 스트리밍 응답도 전송이 끝날 때까지 포함)"""
+
+    def __init__(self, app, exclude_paths=()):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)  # 헬스 체크/메트릭 수집처럼 span이 필요 없는 경로
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        with start_trace(f"{scope['method']} {scope['path']}", traceparent, **{"http.method": scope["method"]}) as server_span:
+            async def _send(message):
+                if server_span is not None and message["type"] == "http.response.start":
+                    server_span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        server_span.status = "error"
+                await send(message)
+
+            await self.app(scope, receive, _send)
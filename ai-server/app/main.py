@@ -1,6 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.tag import router as tag_router
+from app.routers.health import router as health_router
+from app.routers.jobs import router as jobs_router
+from app.routers.queue import router as queue_router
+from app.routers.metrics import router as metrics_router
+from app.routers.admin import router as admin_router
+from app.routers.embed import router as embed_router
+from app.routers.emotion import router as emotion_router
+from app.core.config import settings
+from app.core.model_manager import model_manager
+from app.core.tracing import TracingMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.services.jobs import job_queue
+from app.services.tagging import close_http_session
 
 # ✅ FastAPI 앱 생성
 app = FastAPI(title="MindLog AI Server", description="Handles AI-based tagging")
@@ -14,8 +27,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ 온디맨드 프로파일링 (관리자 토큰이 있을 때만 등록, TracingMiddleware 안쪽에서 실행)
+if settings.ADMIN_TOKEN or settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware, exclude_paths=("/metrics", "/health", "/admin"))
+
+# ✅ 요청별 서버 span (backend가 보낸 traceparent를 이어받음)
+app.add_middleware(TracingMiddleware, exclude_paths=("/metrics", "/health"))
+
 # ✅ 라우터 등록
 app.include_router(tag_router, prefix="/ai")
+app.include_router(jobs_router, prefix="/ai")
+app.include_router(embed_router, prefix="/ai")
+app.include_router(emotion_router, prefix="/ai")
+app.include_router(queue_router, prefix="/ai")
+app.include_router(health_router, prefix="/health")
+app.include_router(metrics_router)
+app.include_router(admin_router, prefix="/admin")
+
+# ✅ 모델은 백그라운드에서 로드 (프로세스는 즉시 요청 수신 가능)
+@app.on_event("startup")
+async def start_background_workers():
+    model_manager.start()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await job_queue.stop()
+    await close_http_session()
 
 # ✅ 루트 엔드포인트
 @app.get("/")
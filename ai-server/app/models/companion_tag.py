@@ -2,34 +2,77 @@ import json
 import os
 import numpy as np
 import cv2
-from deepface import DeepFace
 from scipy.spatial.distance import cosine
 from scipy.cluster.hierarchy import fcluster, linkage
 from typing import Dict, List
 from PIL import Image
 import tempfile
-import tensorflow as tf
+import threading
+import logging
+from app.core.config import settings
+from app.core.metrics import FACES_PER_IMAGE, STAGE_ERRORS, STAGE_SECONDS
+from app.core.tracing import span
 
-# Metal 플러그인 활성화 시도
-try:
-    tf.config.experimental.set_visible_devices([], 'GPU')
-    print("✅ TensorFlow Metal 플러그인 활성화됨")
-except:
-    print("⚠️ TensorFlow Metal 플러그인 활성화 실패")
+logger = logging.getLogger(__name__)
 
-# ✅ 현재 파일(companion_tag.py)의 경로를 기준으로 `data/face_database.json` 절대 경로 설정
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # ai-server 경로
-DATABASE_PATH = os.path.join(BASE_DIR, "data", "face_database.json")  # ai-server/data/face_database.json
+# ✅ TensorFlow/DeepFace는 import만으로 수십 초가 걸리므로 CompanionTagger 생성 시점에 로드
+DeepFace = None
+
+
+def load_face_backend():
+    """🔹 TensorFlow/DeepFace 지연 로드"""
+    global DeepFace
+    if DeepFace is not None:
+        return DeepFace
+
+    import tensorflow as tf
+    from app.core.threads import configure_tensorflow_threads
+
+    configure_tensorflow_threads(tf)
+
+    # Metal 플러그인 활성화 시도
+    try:
+        tf.config.experimental.set_visible_devices([], 'GPU')
+        print("✅ TensorFlow Metal 플러그인 활성화됨")
+    except:
+        print("⚠️ TensorFlow Metal 플러그인 활성화 실패")
+
+    from deepface import DeepFace as _DeepFace
+    DeepFace = _DeepFace
+    return DeepFace
+
+# ✅ 기본 얼굴 DB 경로 (ai-server/data/face_database.json, FACE_DATABASE_PATH로 변경 가능)
+DATABASE_PATH = settings.FACE_DATABASE_PATH
 
 class CompanionTagger:
-    def __init__(self):
+    def __init__(self, database_path: str = None, face_dir: str = None):
         """🔹 AI 서버 내부 저장된 얼굴 데이터베이스 로드"""
+        self.database_path = database_path or DATABASE_PATH
+        self.face_dir = face_dir or settings.FACE_IMAGE_DIR
+        load_face_backend()
         self.face_database = self.load_database()
+        self._db_lock = threading.Lock()  # 얼굴 DB 매칭/갱신(읽기-수정-쓰기) 직렬화 (동시 요청)
+
+    def warmup(self):
+        """🔹 더미 입력으로 RetinaFace/Facenet 그래프를 미리 초기화 (첫 요청 지연 제거)"""
+        dummy = np.zeros((224, 224, 3), dtype=np.uint8)
+        DeepFace.extract_faces(
+            img_path=dummy,
+            detector_backend='retinaface',
+            enforce_detection=False,
+            align=True
+        )
+        DeepFace.represent(
+            img_path=dummy,
+            model_name="Facenet",
+            enforce_detection=False,
+            detector_backend='skip'
+        )
 
     def load_database(self):
         """🔹 AI 서버 내부 얼굴 데이터베이스 로드"""
-        if os.path.exists(DATABASE_PATH):
-            with open(DATABASE_PATH, "r", encoding="utf-8") as f:
+        if os.path.exists(self.database_path):
+            with open(self.database_path, "r", encoding="utf-8") as f:
                 try:
                     return json.load(f)
                 except json.JSONDecodeError:
@@ -48,8 +91,8 @@ class CompanionTagger:
             sorted_database[f"person_{new_id}"] = database[old_id]
         
         # 정렬된 데이터베이스 저장
-        os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-        with open(DATABASE_PATH, "w", encoding="utf-8") as f:
+        os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+        with open(self.database_path, "w", encoding="utf-8") as f:
             json.dump(sorted_database, f, ensure_ascii=False, indent=4)
 
     def get_face_embeddings(self, image_data_dict: Dict[str, Image.Image]):
@@ -65,36 +108,33 @@ class CompanionTagger:
                 if img.mode != 'RGB':
                     img = img.convert('RGB')
                 
-                print(f"🔍 이미지 정보: {url}")
-                print(f"- 크기: {img.size}")
-                print(f"- 모드: {img.mode}")
-                print(f"- 형식: {img.format}")
-                
                 with tempfile.NamedTemporaryFile(suffix='.jpg') as temp:
                     img.save(temp.name, 'JPEG', quality=95)
                     
+                    detected = 0
                     try:
-                        # 얼굴 검출 - detector_kwargs 제거
-                        faces = DeepFace.extract_faces(
-                            img_path=temp.name,
-                            detector_backend='retinaface',
-                            enforce_detection=True,
-                            align=True
-                        )
+                        # 얼굴 검출 - detector_kwargs 제거 (얼굴이 없으면 enforce_detection으로 예외)
+                        with span("face.detect"), STAGE_SECONDS.time(stage="face_detect"):
+                            faces = DeepFace.extract_faces(
+                                img_path=temp.name,
+                                detector_backend='retinaface',
+                                enforce_detection=True,
+                                align=True
+                            )
                         
                         if not faces:
-                            print(f"⚠️ 얼굴 검출 실패: {url}")
+                            logger.debug(f"⚠️ 얼굴 검출 실패: {url}")
                             continue
-                        
-                        print(f"🔍 검출된 얼굴 수: {len(faces)}")
+                        detected = len(faces)
                         
                         # 임베딩 추출 - enforce_detection=True로 변경
-                        embeddings = DeepFace.represent(
-                            img_path=temp.name,
-                            model_name="Facenet",
-                            enforce_detection=True,  # False → True
-                            detector_backend='retinaface'
-                        )
+                        with span("face.embed"), STAGE_SECONDS.time(stage="face_embed"):
+                            embeddings = DeepFace.represent(
+                                img_path=temp.name,
+                                model_name="Facenet",
+                                enforce_detection=True,  # False → True
+                                detector_backend='retinaface'
+                            )
                         
                         if not isinstance(embeddings, list):
                             embeddings = [embeddings]
@@ -107,14 +147,19 @@ class CompanionTagger:
                             
                             if embedding_array.shape == (128,):
                                 face_data.append((url, embedding_array))
-                                print(f"✅ 얼굴 {i+1} 임베딩 추출 완료: {url}")
+                                logger.debug(f"✅ 얼굴 {i+1} 임베딩 추출 완료: {url}")
                 
                     except Exception as e:
-                        print(f"⚠️ 얼굴 검출/임베딩 추출 실패: {url}, 오류: {str(e)}")
+                        if detected:
+                            STAGE_ERRORS.inc(stage="face_embed")
+                        logger.debug(f"⚠️ 얼굴 검출/임베딩 추출 실패: {url}, 오류: {str(e)}")
                         continue
+                    finally:
+                        FACES_PER_IMAGE.observe(detected)
                     
             except Exception as e:
-                print(f"⚠️ 이미지 처리 실패: {url}, 오류: {str(e)}")
+                STAGE_ERRORS.inc(stage="face_detect")
+                logger.warning(f"⚠️ 이미지 처리 실패: {url}, 오류: {str(e)}")
                 continue
         
         return face_data
@@ -146,7 +191,7 @@ class CompanionTagger:
         for i, cluster_id in enumerate(clusters):
             url = face_data[i][0]
             result[url].append(f"person_{cluster_id}")
-            print(f"🔍 {url} → 클러스터 {cluster_id} (유사도: {1 - similarity_matrix[i][i-1]:.3f})")
+            logger.debug(f"🔍 {url} → 클러스터 {cluster_id} (유사도: {1 - similarity_matrix[i][i-1]:.3f})")
         
         return result
 
@@ -162,12 +207,12 @@ class CompanionTagger:
             
             # 이미지에서 검출된 얼굴들의 임베딩 찾기
             image_embeddings = [emb for url, emb in face_data if url == image_url]
-            print(f"- 이미지 {image_url}의 임베딩 개수: {len(image_embeddings)}")
+            logger.debug(f"- 이미지 {image_url}의 임베딩 개수: {len(image_embeddings)}")
             
             # DB가 비어있거나 방금 생성된 경우, 클러스터링 결과 사용
             if not database or len(database) == len(image_embeddings):
                 result[image_url] = assigned_tags[image_url]
-                print(f"✅ 새로운 인물 태그 생성: {assigned_tags[image_url]}")
+                logger.debug(f"✅ 새로운 인물 태그 생성: {assigned_tags[image_url]}")
                 continue
             
             # 각 얼굴 임베딩에 대해 기존 DB와 매칭
@@ -188,35 +233,41 @@ class CompanionTagger:
                 if matched_person:
                     if matched_person not in result[image_url]:  # 중복 방지
                         result[image_url].append(matched_person)
-                        print(f"✅ 매칭된 인물 추가: {image_url} → {matched_person} (유사도: {max_similarity:.3f})")
+                        logger.debug(f"✅ 매칭된 인물 추가: {image_url} → {matched_person} (유사도: {max_similarity:.3f})")
                 else:
-                    print(f"⚠️ 매칭된 인물 없음: 최대 유사도 {max_similarity:.3f}")
+                    logger.debug(f"⚠️ 매칭된 인물 없음: 최대 유사도 {max_similarity:.3f}")
         
         return result
 
     def process_faces(self, image_data_dict: Dict[str, Image.Image]):
         """🔹 인물 태깅 실행 함수 (여러 얼굴 처리)"""
-        face_dir = "data/faces"
+        face_dir = self.face_dir
         os.makedirs(face_dir, exist_ok=True)
         
         # 얼굴 검출 및 임베딩 추출
         face_data = self.get_face_embeddings(image_data_dict)
         face_images = self.get_face_images(image_data_dict)
-        print(f"🔍 검출된 얼굴 데이터: {len(face_data)}개")
+        logger.debug(f"🔍 검출된 얼굴 데이터: {len(face_data)}개")
         
         # 얼굴이 검출되지 않은 경우 빈 결과 반환
         if not face_data:
-            print("⚠️ 검출된 얼굴 없음")
+            logger.debug("⚠️ 검출된 얼굴 없음")
             return {url: [] for url in image_data_dict.keys()}
         
         # 1. 배치 내 얼굴 클러스터링 수행
         batch_clusters = self.cluster_faces_hierarchical(face_data, threshold=0.7)
-        print(f"✅ 배치 내 클러스터링 완료: {len(batch_clusters)}개 이미지")
+        logger.debug(f"✅ 배치 내 클러스터링 완료: {len(batch_clusters)}개 이미지")
         
+        # 얼굴 검출/임베딩은 동시에 실행하고, 얼굴 DB 읽기-수정-쓰기만 요청 간 직렬화
+        with span("face.db_match"), STAGE_SECONDS.time(stage="db_match"), self._db_lock:
+            return self._match_clusters(image_data_dict, face_data, face_images, batch_clusters, face_dir)
+
+    def _match_clusters(self, image_data_dict, face_data, face_images, batch_clusters, face_dir):
+        """🔹 클러스터링 결과를 얼굴 DB와 매칭하고 DB 갱신"""
         # 2. DB 로드 및 매칭
         database = self.load_database()
         if not database:
-            print("✅ DB 없음 → 클러스터링 결과로 새 DB 생성")
+            logger.debug("✅ DB 없음 → 클러스터링 결과로 새 DB 생성")
             
             # 클러스터별 얼굴 매핑 및 임베딩 매핑
             cluster_faces = {}
@@ -236,7 +287,7 @@ class CompanionTagger:
                         cluster_faces[person_id] = face
                         face_path = os.path.join(face_dir, f"{person_id}.jpg")
                         face.save(face_path)
-                        print(f"✅ 얼굴 이미지 저장: {face_path}")
+                        logger.debug(f"✅ 얼굴 이미지 저장: {face_path}")
                     
                     # 임베딩 매핑
                     if person_id not in cluster_embeddings:
@@ -251,12 +302,12 @@ class CompanionTagger:
                 database[person_id] = {
                     "embeddings": embeddings
                 }
-                print(f"✅ {person_id}의 임베딩 {len(embeddings)}개 저장")
+                logger.debug(f"✅ {person_id}의 임베딩 {len(embeddings)}개 저장")
             self.save_database(database)
             return batch_clusters
         
         # 3. 기존 DB가 있는 경우, 각 클러스터와 DB 매칭
-        print("✅ 기존 DB와 매칭 시도")
+        logger.debug("✅ 기존 DB와 매칭 시도")
         final_results = {url: [] for url in image_data_dict.keys()}
         db_updates = {}  # DB 업데이트를 위한 임시 저장소
         
@@ -284,21 +335,16 @@ class CompanionTagger:
                 for person_id, person_data in database.items():
                     for db_data in person_data["embeddings"]:
                         similarity = 1 - cosine(cluster_embedding, np.array(db_data["embedding"]))
-                        print(f"- 유사도 체크: {cluster_id} vs {person_id} → {similarity:.3f}")
                         if similarity > max_similarity:
                             max_similarity = similarity
                             if similarity >= 0.55:  # 0.6 → 0.55로 임계값 낮춤
                                 best_match = person_id
-                            print(f"  → max_similarity 갱신: {similarity:.3f}")
-                            if best_match:
-                                print(f"  → best_match 갱신: {best_match}")
                 
-                print(f"최종 best_match: {best_match}, max_similarity: {max_similarity:.3f}")
+                logger.debug(f"최종 best_match: {best_match}, max_similarity: {max_similarity:.3f}")
 
                 if best_match:
-                    print(f"✅ if best_match 조건문 진입")
                     # DB의 기존 인물과 매칭된 경우
-                    print(f"✅ 클러스터 {cluster_id} → DB의 {best_match}와 매칭 (유사도: {max_similarity:.3f})")
+                    logger.debug(f"✅ 클러스터 {cluster_id} → DB의 {best_match}와 매칭 (유사도: {max_similarity:.3f})")
                     if best_match not in final_results[url]:
                         final_results[url].append(best_match)
                     # 새 임베딩 임시 저장
@@ -310,18 +356,18 @@ class CompanionTagger:
                     })
                     face_idx[url] += 1
                 else:
-                    print(f"❌ best_match가 None이어서 새 인물 추가")
+                    logger.debug(f"❌ best_match가 None이어서 새 인물 추가")
                     # 새로운 인물로 추가
                     next_id = max([int(pid.split('_')[1]) for pid in list(database.keys()) + list(db_updates.keys())]) + 1
                     new_person_id = f"person_{next_id}"
-                    print(f"✅ 새로운 인물 추가: {new_person_id}")
+                    logger.debug(f"✅ 새로운 인물 추가: {new_person_id}")
                     
                     # 새 인물의 얼굴 이미지 저장
                     if url in face_images:
                         face_path = os.path.join(face_dir, f"{new_person_id}.jpg")
                         face_img = face_images[url][face_idx[url]]
                         face_img.save(face_path)
-                        print(f"✅ 얼굴 이미지 저장: {face_path}")
+                        logger.debug(f"✅ 얼굴 이미지 저장: {face_path}")
 
                     if new_person_id not in db_updates:
                         db_updates[new_person_id] = []
@@ -340,7 +386,7 @@ class CompanionTagger:
                 else:
                     database[person_id] = {"embeddings": embeddings}
             self.save_database(database)
-            print("✅ DB 저장 완료")
+            logger.debug("✅ DB 저장 완료")
         
         # 결과 반환 전에 인물 태그 정렬
         for url in final_results:
@@ -366,12 +412,13 @@ class CompanionTagger:
                     
                     # 얼굴 검출
                     try:
-                        faces = DeepFace.extract_faces(
-                            img_path=temp.name,
-                            detector_backend='retinaface',
-                            enforce_detection=True,  # 얼굴 검출 강제
-                            align=True
-                        )
+                        with span("face.detect"), STAGE_SECONDS.time(stage="face_detect"):
+                            faces = DeepFace.extract_faces(
+                                img_path=temp.name,
+                                detector_backend='retinaface',
+                                enforce_detection=True,  # 얼굴 검출 강제
+                                align=True
+                            )
                         
                         # 얼굴이 검출된 경우에만 처리
                         if faces and len(faces) > 0:
@@ -390,16 +437,16 @@ class CompanionTagger:
                                         face_img = Image.fromarray(face_array)
                                         face_img = face_img.resize((224, 224), Image.Resampling.LANCZOS)
                                         face_images[url].append(face_img)
-                                        print(f"✅ 얼굴 이미지 추출 성공: {url} (얼굴 {len(face_images[url])})")
+                                        logger.debug(f"✅ 얼굴 이미지 추출 성공: {url} (얼굴 {len(face_images[url])})")
                         else:
-                            print(f"⚠️ 얼굴 검출 실패: {url}")
+                            logger.debug(f"⚠️ 얼굴 검출 실패: {url}")
                     
                     except Exception as e:
-                        print(f"⚠️ 얼굴 검출 실패: {url}, 오류: {str(e)}")
+                        logger.debug(f"⚠️ 얼굴 검출 실패: {url}, 오류: {str(e)}")
                         continue
             
             except Exception as e:
-                print(f"⚠️ 얼굴 이미지 추출 실패: {url}, 오류: {str(e)}")
+                logger.warning(f"⚠️ 얼굴 이미지 추출 실패: {url}, 오류: {str(e)}")
                 continue
         
         return face_images
\ No newline at end of file
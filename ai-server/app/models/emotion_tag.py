@@ -0,0 +1,169 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS, EMOTION_BATCH_TEXTS, STAGE_SECONDS
+from app.core.tracing import span
+from app.utils.emotions import EMOTIONS, HYPOTHESIS_TEMPLATE
+
+logger = logging.getLogger(__name__)
+
+# ✅ 큐 우선순위 (작을수록 먼저): 작성 중 추천 요청이 일괄 보정(bulk) 텍스트보다 앞섬
+PRIORITIES = {"interactive": 0, "bulk": 1}
+_STOP = 99  # 종료 신호 (남은 텍스트를 모두 처리한 뒤 꺼냄)
+
+
+class EmotionClassifier:
+    """🔹 일기 텍스트 감정 분류기 (다국어 NLI 모델 제로샷, MindLog 감정 8종)
+
+    텍스트마다 "일기 + 감정 가설" 8쌍의 함의(entailment) 점수를 softmax해 감정별 확률을 낸다.
+    predict를 호출한 스레드들은 텍스트를 우선순위 큐에 넣고 기다리며, 분류 스레드 하나가
+    EMOTION_BATCH_WAIT_MS 동안 다른 요청의 텍스트까지 모아 최대 EMOTION_BATCH_SIZE개씩 한 번에 분류한다.
+    결과는 텍스트 해시로 LRU에 보관하고, 같은 텍스트가 분류 중이면 그 결과를 함께 기다린다.
+    """
+
+    def __init__(self, model_name=None):
+        model_name = model_name or settings.EMOTION_MODEL_NAME
+        try:
+            logger.info(f"🔧 EmotionClassifier 초기화 시작 (model: {model_name})")
+            self.model_name = model_name
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+            start_time = time.time()
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(model_name).to(self.device).eval()
+            logger.info(f"✅ 감정 모델 로드 완료 (소요시간: {time.time() - start_time:.2f}초, device: {self.device})")
+
+            label2id = {label.lower(): index for label, index in self.model.config.label2id.items()}
+            entailment = [index for label, index in label2id.items() if label.startswith("entail")]
+            if not entailment:
+                raise ValueError(f"NLI 모델이 아닙니다 (entailment 레이블 없음: {list(label2id)})")
+            self.entailment = entailment[0]
+            self.hypotheses = [HYPOTHESIS_TEMPLATE.format(label) for label in EMOTIONS.values()]
+            # 응답에 함께 실리는 모델 버전 (모델 / 감정 가설 해시)
+            prompts = json.dumps([HYPOTHESIS_TEMPLATE, EMOTIONS], ensure_ascii=False).encode("utf-8")
+            self.version = f"{model_name}/{hashlib.sha256(prompts).hexdigest()[:8]}"
+
+            self._cache = OrderedDict()  # 텍스트 해시 → 감정별 확률 (LRU)
+            self._inflight: Dict[str, Future] = {}  # 분류 중인 텍스트 해시 → 결과
+            self._lock = threading.Lock()
+            self._sequence = itertools.count()  # 같은 우선순위는 들어온 순서대로
+            # 분류 스레드는 첫 사용 시 시작 (미리 로드한 뒤 fork하면 스레드는 자식에 복제되지 않음)
+            self._queue: Optional[queue.PriorityQueue] = None
+            self._consumer: Optional[threading.Thread] = None
+            self._consumer_pid = None
+        except Exception as e:
+            logger.error(f"❌ EmotionClassifier 초기화 실패: {str(e)}", exc_info=True)
+            raise
+
+    def warmup(self):
+        """🔹 짧은 문장으로 한 번 분류하여 lazy 커널 초기화를 미리 수행 (캐시에는 남기지 않음)"""
+        self._classify(["오늘은 평범한 하루였다."])
+
+    def _ensure_consumer(self):
+        """🔹 현재 프로세스의 분류 스레드와 큐 준비 (fork 후 첫 호출이면 대기 상태도 새로 만듦, self._lock 안에서 호출)"""
+        if self._consumer_pid == os.getpid():
+            return
+        self._cache, self._inflight = OrderedDict(), {}
+        self._queue = queue.PriorityQueue()
+        self._consumer = threading.Thread(target=self._inference_loop, args=(self._queue,),
+                                          name="emotion-inference", daemon=True)
+        self._consumer.start()
+        self._consumer_pid = os.getpid()
+
+    def close(self):
+        """🔹 분류 스레드 종료 (모델 교체 후 이전 버전 정리)"""
+        with self._lock:
+            if self._consumer_pid != os.getpid():
+                return  # 이 프로세스에서는 스레드를 시작하지 않음
+        self._queue.put((_STOP, next(self._sequence), None, None, None))
+        self._consumer.join(timeout=settings.MODEL_DRAIN_TIMEOUT)
+
+    def predict(self, texts: List[str], priority: str = "interactive") -> List[Dict[str, float]]:
+        """🔹 텍스트 목록 → 텍스트별 {감정: 확률} (입력 순서 유지)"""
+        keys = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        results, futures = {}, {}
+        with self._lock:
+            self._ensure_consumer()
+            for key, text in zip(keys, texts):
+                if key in results or key in futures:
+                    continue
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[key] = cached
+                    CACHE_LOOKUPS.inc(cache="emotion", result="hit")
+                    continue
+                CACHE_LOOKUPS.inc(cache="emotion", result="miss")
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    self._queue.put((PRIORITIES[priority], next(self._sequence), key, text, future))
+                futures[key] = future
+
+        for key, future in futures.items():
+            results[key] = future.result()
+        return [dict(results[key]) for key in keys]
+
+    def _inference_loop(self, pending: queue.PriorityQueue):
+        """🔹 우선순위 큐에서 텍스트를 모아 배치로 분류 (소비자)"""
+        while True:
+            item = pending.get()
+            if item[0] == _STOP:
+                return
+            batch = [item]
+            stopping = False
+            collect_until = time.monotonic() + settings.EMOTION_BATCH_WAIT_MS / 1000
+            while len(batch) < settings.EMOTION_BATCH_SIZE:
+                try:
+                    item = pending.get(timeout=max(0.0, collect_until - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item[0] == _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                scores = self._classify([text for _, _, _, text, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    for _, _, key, _, _ in batch:
+                        self._inflight.pop(key, None)
+                for _, _, _, _, future in batch:
+                    future.set_exception(e)
+            else:
+                with self._lock:
+                    for (_, _, key, _, _), result in zip(batch, scores):
+                        self._cache[key] = result
+                        self._inflight.pop(key, None)
+                    while len(self._cache) > settings.EMOTION_CACHE_SIZE:
+                        self._cache.popitem(last=False)
+                for (_, _, _, _, future), result in zip(batch, scores):
+                    future.set_result(result)
+            if stopping:
+                return
+
+    def _classify(self, texts: List[str]) -> List[Dict[str, float]]:
+        """🔹 텍스트 N개 → (N × 감정 8종) 쌍을 한 번에 추론해 감정별 확률"""
+        EMOTION_BATCH_TEXTS.observe(len(texts))
+        premises = [text for text in texts for _ in self.hypotheses]
+        with torch.inference_mode(), span("emotion.classify", texts=len(texts)), \
+                STAGE_SECONDS.time(stage="emotion_classify"):
+            encoded = self.tokenizer(premises, self.hypotheses * len(texts), padding=True, truncation="only_first",
+                                     max_length=settings.EMOTION_MAX_TOKENS, return_tensors="pt").to(self.device)
+            logits = self.model(**encoded).logits[:, self.entailment].view(len(texts), len(self.hypotheses))
+            probabilities = logits.float().softmax(dim=-1).cpu().tolist()
+        return [dict(zip(EMOTIONS, row)) for row in probabilities]
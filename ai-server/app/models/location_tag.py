@@ -1,70 +1,93 @@
+import asyncio
+import aiohttp
 import requests
-import exifread
+import threading
 import time
+import logging
 from typing import Dict
-from io import BytesIO
+from app.core.config import settings
+from app.core.metrics import FETCH_BYTES, STAGE_ERRORS, STAGE_SECONDS
+from app.core.tracing import span
+from app.utils.exif import read_exif_segment, read_gps
 
-class LocationTagger:
-    def __init__(self, user_agent="Mozilla/5.0"):
-        self.headers = {"User-Agent": user_agent}
+logger = logging.getLogger(__name__)
 
-    def convert_to_decimal(self, gps_value):
-        """ 🔹 GPS 좌표를 소수점 형식으로 변환 """
-        return float(gps_value[0]) + float(gps_value[1]) / 60 + float(gps_value[2].num) / float(gps_value[2].den) / 3600
 
-    def get_gps_from_exif(self, image_url: str):
-        """ 🔹 이미지의 EXIF 데이터에서 GPS 정보를 추출 (URL에서 직접 다운로드) """
-        try:
-            response = requests.get(image_url, headers=self.headers, timeout=5)
-            response.raise_for_status()
-            image_bytes = BytesIO(response.content)  # 🔹 URL에서 이미지 바이트로 변환
-            tags = exifread.process_file(image_bytes)  # 🔹 EXIF 데이터 처리
+class _CallSpacer:
+    """🔹 프로세스 전체에서 호출 시작 간격을 interval초 이상으로 벌림 (태거 인스턴스/스레드 공용)"""
 
-            if 'GPS GPSLatitude' in tags and 'GPS GPSLongitude' in tags:
-                lat_values = tags['GPS GPSLatitude'].values
-                lon_values = tags['GPS GPSLongitude'].values
-                lat_ref = tags.get('GPS GPSLatitudeRef', 'N').values
-                lon_ref = tags.get('GPS GPSLongitudeRef', 'E').values
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_at = 0.0
 
-                lat = self.convert_to_decimal(lat_values)
-                lon = self.convert_to_decimal(lon_values)
+    def wait(self, interval: float):
+        with self._lock:
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                with span("geocode.rate_limit_sleep"):
+                    time.sleep(delay)
+            self._next_at = time.monotonic() + interval
 
-                if lat_ref != 'N': lat = -lat
-                if lon_ref != 'E': lon = -lon
 
-                print(f"✅ {image_url} → GPS 좌표: ({lat}, {lon})")
-                return lat, lon
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ {image_url} → 이미지 요청 실패: {e}")
-        except Exception as e:
-            print(f"⚠️ {image_url} → EXIF 데이터 처리 실패: {e}")
+# ✅ Nominatim 사용 정책(초당 1회)은 프로세스 단위로 지켜야 하므로 모든 LocationTagger가 함께 씀
+_geocode_spacer = _CallSpacer()
+
+class LocationTagger:
+    def __init__(self, user_agent="Mozilla/5.0", geocode_url=None, geocode_interval=None):
+        self.headers = {"User-Agent": user_agent}
+        self.geocode_url = geocode_url or settings.NOMINATIM_URL  # Nominatim 호환 /reverse 엔드포인트
+        self.geocode_interval = settings.GEOCODE_MIN_INTERVAL if geocode_interval is None else geocode_interval
 
-        return None, None  # GPS 정보가 없는 경우
+    async def _read_exif_segment(self, image_url: str):
+        async with aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(total=5)) as session:
+            return await read_exif_segment(session, image_url, settings.EXIF_RANGE_INITIAL_BYTES,
+                                           settings.EXIF_RANGE_MAX_BYTES)
+
+    def get_gps_from_exif(self, image_url: str):
+        """ 🔹 이미지의 EXIF 데이터에서 GPS 정보를 추출 (URL에서 EXIF 구간만 다운로드) """
+        try:
+            with span("location.download"), STAGE_SECONDS.time(stage="download"):
+                # 태깅 서비스와 같은 EXIF 구간 다운로드 구현 사용 (이 메서드는 워커 스레드에서 호출됨)
+                prefix, full = asyncio.run(self._read_exif_segment(image_url))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            STAGE_ERRORS.inc(stage="download")
+            logger.warning(f"⚠️ {image_url} → 이미지 요청 실패: {e}")
+            return None, None
+        FETCH_BYTES.observe(len(prefix), mode="full" if full else "exif_range")
+
+        lat, lon = read_gps(prefix)
+        if lat is not None:
+            logger.debug(f"✅ {image_url} → GPS 좌표: ({lat}, {lon})")
+        return lat, lon  # GPS 정보가 없으면 (None, None)
 
     def get_full_address(self, lat, lon):
         """ 🔹 OpenStreetMap API를 활용한 GPS → 주소 변환 """
         if lat is None or lon is None:
-            print("⚠️ GPS 정보 없음 → 주소 변환 불가")
+            logger.debug("⚠️ GPS 정보 없음 → 주소 변환 불가")
             return None
 
-        url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={lat}&lon={lon}&zoom=14&addressdetails=1"
+        params = {"format": "json", "lat": lat, "lon": lon, "zoom": 14, "addressdetails": 1}
 
         try:
-            time.sleep(1)  # API 요청 제한 방지
-            response = requests.get(url, headers=self.headers, timeout=5)
+            if self.geocode_interval > 0:
+                _geocode_spacer.wait(self.geocode_interval)  # API 요청 제한 방지 (실제 요청 간격 기준)
+            with span("geocode.nominatim"), STAGE_SECONDS.time(stage="geocode"):
+                response = requests.get(self.geocode_url, params=params, headers=self.headers, timeout=5)
             if response.status_code == 200:
                 address = response.json().get("address", {})
-                print(f"📍 주소 변환 성공: {address}")
+                logger.debug(f"📍 주소 변환 성공: {address}")
                 return address
+            STAGE_ERRORS.inc(stage="geocode")
         except requests.exceptions.RequestException as e:
-            print(f"⚠️ 주소 변환 실패: {e}")
+            STAGE_ERRORS.inc(stage="geocode")
+            logger.warning(f"⚠️ 주소 변환 실패: {e}")
 
         return None
 
     def extract_best_region_tag(self, address):
         """ 🔹 OpenStreetMap에서 최적의 지역 태그 추출 """
         if not address:
-            print("🚨 주소 정보 없음 → 지역 태그 생성 불가")
+            logger.debug("🚨 주소 정보 없음 → 지역 태그 생성 불가")
             return None
 
         region_priority = ["quarter", "suburb", "town", "village", "borough", "county", "city_district"]
@@ -74,6 +97,17 @@ class LocationTagger:
 
         return None
 
+    def predict_region(self, lat, lon) -> dict:
+        """ 🔹 GPS 좌표 → 지역 태그 ({"region": ...} 또는 {"error": ...}) """
+        if lat is None or lon is None:
+            return {"error": "지역 태그 없음"}
+        try:
+            best_tag = self.extract_best_region_tag(self.get_full_address(lat, lon))
+        except Exception as e:
+            logger.warning(f"⚠️ ({lat}, {lon}) → 지역 태그 생성 실패: {e}")
+            return {"error": "지역 태그 생성 실패"}
+        return {"region": best_tag} if best_tag else {"error": "지역 태그 없음"}
+
     def predict_locations(self, image_urls: list[str]) -> dict:
         """ 🔹 이미지 URL 리스트에 대한 지역 태깅 수행 (원래 방식 복원) """
         results = {}
@@ -81,18 +115,15 @@ class LocationTagger:
             try:
                 lat, lon = self.get_gps_from_exif(image_url)  # ✅ 이미지 URL에서 직접 GPS 추출
                 if lat is None or lon is None:
-                    print(f"⚠️ {image_url} → GPS 정보 없음 → 기본값 반환")
+                    logger.debug(f"⚠️ {image_url} → GPS 정보 없음 → 기본값 반환")
                     results[image_url] = {"error": "지역 태그 없음"}
                     continue
 
-                full_address = self.get_full_address(lat, lon)
-                best_tag = self.extract_best_region_tag(full_address)
-
-                results[image_url] = {"region": best_tag} if best_tag else {"error": "지역 태그 없음"}
-                print(f"📍 {image_url} → 지역 태그: {results[image_url]}")
+                results[image_url] = self.predict_region(lat, lon)
+                logger.debug(f"📍 {image_url} → 지역 태그: {results[image_url]}")
 
             except Exception as e:
-                print(f"⚠️ {image_url} → 지역 태그 생성 실패: {e}")
+                logger.warning(f"⚠️ {image_url} → 지역 태그 생성 실패: {e}")
                 results[image_url] = {"error": "지역 태그 생성 실패"}
 
-        return results
\ No newline at end of file
+        return results
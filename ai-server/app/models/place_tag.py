@@ -2,9 +2,20 @@ import torch
 import clip
 import torch.nn.functional as F
 from PIL import Image
+import hashlib
 import logging
+import os
+import queue
+import threading
 import time
-from app.utils.places import places
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional
+import numpy as np
+from app.core.metrics import CLIP_BATCH_IMAGES, STAGE_ERRORS, STAGE_SECONDS
+from app.core.tracing import span
+from app.core.config import settings
+from app.utils.places import load_vocabulary, vocabulary_version
 
 # 로깅 설정
 logging.basicConfig(
@@ -14,12 +25,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ✅ CLIP 입력 정규화 값 (clip.load가 돌려주는 preprocess의 Normalize와 동일)
+CLIP_MEAN = torch.tensor([0.48145466, 0.4578275, 0.40821073]).view(1, 3, 1, 1)
+CLIP_STD = torch.tensor([0.26862954, 0.26130258, 0.27577711]).view(1, 3, 1, 1)
+
+
 class PlaceTagger:
-    def __init__(self, model_name="ViT-L/14", threshold=0.4):
+    """🔹 CLIP 장소 태거
+
+    전처리와 추론을 생산자/소비자로 분리한다: predict_places를 호출한 스레드(서버에서는
+    요청별 to_thread 워커들)가 uint8 픽셀을 한 번에 텐서로 리사이즈/정규화해 크기가 정해진
+    prefetch 큐에 넣고, 추론 스레드 하나가 큐에 쌓인 이미지를 배치로 묶어 인코딩한다.
+    모델이 배치를 처리하는 동안 다른 호출의 전처리가 동시에 진행된다.
+    """
+
+    def __init__(self, model_name=None, threshold=None, vocabulary=None, vocabulary_path=None):
+        """🔹 vocabulary({영문 레이블: 태그})가 없으면 vocabulary_path → PLACE_VOCABULARY_PATH → 내장 목록 순"""
+        model_name = model_name or settings.PLACE_MODEL_NAME
+        threshold = settings.PLACE_THRESHOLD if threshold is None else threshold
         try:
             logger.info(f"🔧 PlaceTagger 초기화 시작 (model: {model_name}, threshold: {threshold})")
             self.model_name = model_name
             self.threshold = threshold
+            if vocabulary is None:
+                self.vocabulary, vocabulary_hash = load_vocabulary(vocabulary_path or settings.PLACE_VOCABULARY_PATH)
+            else:
+                self.vocabulary, vocabulary_hash = vocabulary, vocabulary_version(vocabulary)
+            # 응답 태그에 함께 실리는 모델 버전 (모델 / 임계값 / 장소 목록 해시)
+            self.version = f"{model_name}@{threshold}/{vocabulary_hash}"
             
             # GPU 설정 및 검증
             if torch.backends.mps.is_available():
@@ -37,155 +70,389 @@ class PlaceTagger:
             
             # 프롬프트 수정 - outdoor scene 제거
             self.prompt_template = "a photo of {}"  # 더 일반적인 프롬프트로 변경
-            self.labels = [self.prompt_template.format(place) for place in places.keys()]
+            self.labels = [self.prompt_template.format(place) for place in self.vocabulary.keys()]
+            self.text_features = None  # 장소 목록이 인스턴스마다 고정이므로 첫 배치에서 한 번만 인코딩
+            self._label_sets = OrderedDict()  # (사용자, 사용자 목록 버전) → (레이블, 레이블→태그, 전역+사용자 텍스트 특징) LRU
+            self._label_lock = threading.Lock()
+            self._query_cache = OrderedDict()  # 검색어 → 정규화된 텍스트 임베딩 (LRU)
+            self._query_lock = threading.Lock()
             logger.info(f"✅ 프롬프트 설정 완료 (레이블 수: {len(self.labels)}개)")
+
+            # 전처리 → 추론 파이프라인
+            self.input_resolution = getattr(self.model.visual, "input_resolution", 224)
+            # 이미지 임베딩 버전 (CLIP 모델 / 입력 해상도 / 좌우 반전 평균): 임계값이나 장소 목록이 바뀌어도
+            # 임베딩은 그대로이므로 태깅 버전(self.version)과 따로 두어 저장된 임베딩을 계속 비교할 수 있게 함
+            self.embedding_version = f"{model_name}@{self.input_resolution}px+flip"
+            self.batch_size = max(1, settings.PLACE_BATCH_SIZE)
+            # 추론 스레드는 첫 사용 시 시작 (serve.py가 미리 로드한 뒤 fork하면 스레드는 자식에 복제되지 않음)
+            self._prefetch: Optional[queue.Queue] = None
+            self._consumer: Optional[threading.Thread] = None
+            self._consumer_pid = None
+            self._consumer_lock = threading.Lock()
             
         except Exception as e:
             logger.error(f"❌ PlaceTagger 초기화 실패: {str(e)}", exc_info=True)
             raise
 
+    def warmup(self):
+        """🔹 더미 이미지로 한 번 추론하여 lazy 커널 초기화를 미리 수행"""
+        self.predict_places({"__warmup__": Image.new("RGB", (224, 224))})
+
+    def _query_prompts(self, text: str) -> list:
+        """🔹 검색어 → CLIP 텍스트 목록
+
+        CLIP은 영어로 학습되어 한국어 문장은 잘 맞지 않으므로, 검색어에 장소 태그(예: "바다")가 들어 있으면
+        그 태그의 영문 레이블 프롬프트로 바꾼다 (가장 긴 태그 기준, 같은 태그의 레이블이 여럿이면 모두).
+        """
+        matched = [tag for tag in set(self.vocabulary.values()) if tag and tag in text]
+        if not matched:
+            return [text]
+        longest = max(matched, key=len)
+        return [self.prompt_template.format(label) for label, tag in self.vocabulary.items() if tag == longest]
+
+    def encode_text(self, texts: list) -> np.ndarray:
+        """🔹 검색어 목록 → 정규화된 CLIP 텍스트 임베딩 (len(texts), 차원) float32
+
+        이미지 임베딩과 같은 공간이므로 저장된 이미지 임베딩과 내적하면 코사인 유사도가 된다.
+        검색어별 결과는 LRU(TEXT_EMBEDDING_CACHE_SIZE)에 보관해 같은 검색어는 다시 인코딩하지 않는다.
+        """
+        with self._query_lock:
+            cached = {text: self._query_cache[text] for text in texts if text in self._query_cache}
+            for text in cached:
+                self._query_cache.move_to_end(text)
+        missing = [text for text in dict.fromkeys(texts) if text not in cached]
+
+        if missing:
+            prompts = [self._query_prompts(text) for text in missing]
+            flat = [prompt for group in prompts for prompt in group]
+            with torch.no_grad(), span("clip.encode_text", texts=len(flat)), STAGE_SECONDS.time(stage="clip_encode_text"):
+                features = self.model.encode_text(clip.tokenize(flat, truncate=True).to(self.device))
+                features = F.normalize(features.float(), dim=-1).cpu().numpy()
+            offset = 0
+            with self._query_lock:
+                for text, group in zip(missing, prompts):
+                    vector = features[offset:offset + len(group)].mean(axis=0)
+                    offset += len(group)
+                    cached[text] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+                    self._query_cache[text] = cached[text]
+                while len(self._query_cache) > settings.TEXT_EMBEDDING_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+
+        return np.stack([cached[text] for text in texts]).astype(np.float32)
+
+    def _global_text_features(self) -> torch.Tensor:
+        """🔹 전역 장소 목록의 텍스트 특징 (처음 한 번만 인코딩)"""
+        with self._label_lock:
+            if self.text_features is None:
+                with torch.no_grad():
+                    self.text_features = self.model.encode_text(clip.tokenize(self.labels).to(self.device))
+            return self.text_features
+
+    def _user_text_features(self, owner: str, version: str, prompts: list) -> np.ndarray:
+        """🔹 사용자 레이블 프롬프트 → 텍스트 특징 (float32), USER_VOCABULARY_CACHE_DIR에 저장해 재시작 후에도 재사용"""
+        name = hashlib.sha256(f"{self.model_name}|{owner}|{version}".encode("utf-8")).hexdigest()[:24]
+        path = os.path.join(settings.USER_VOCABULARY_CACHE_DIR, f"{name}.npy")
+        try:
+            features = np.load(path)
+            if features.shape[0] == len(prompts):
+                return features
+        except (OSError, ValueError):
+            pass
+
+        with torch.no_grad(), span("clip.encode_text", texts=len(prompts)), STAGE_SECONDS.time(stage="clip_encode_text"):
+            features = self.model.encode_text(clip.tokenize(prompts, truncate=True).to(self.device))
+            features = features.float().cpu().numpy()
+        try:
+            os.makedirs(settings.USER_VOCABULARY_CACHE_DIR, exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                np.save(f, features)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"⚠️ 사용자 장소 임베딩 저장 실패: {path} ({e})")
+        return features
+
+    def label_set(self, owner: Optional[str] = None, vocabulary: Optional[dict] = None):
+        """🔹 사용자 장소 목록을 합친 (레이블, 레이블→태그, 텍스트 특징 행렬)
+
+        사용자 목록({영문 레이블: 태그})의 텍스트 특징은 (사용자, 목록 버전)마다 한 번만 인코딩해
+        전역 특징 뒤에 붙인 행렬을 LRU(USER_VOCABULARY_CACHE_SIZE)에 보관하므로, 요청마다 텍스트를
+        다시 인코딩하지 않고 이미지 특징과 한 번의 행렬 곱으로 점수를 낸다.
+        전역 목록에 이미 있는 레이블은 다시 인코딩하지 않고 사용자 태그로 바꿔 부른다.
+        """
+        global_features = self._global_text_features()
+        if not vocabulary:
+            return self.labels, self.vocabulary, global_features
+
+        key = (owner, vocabulary_version(vocabulary))
+        with self._label_lock:
+            cached = self._label_sets.get(key)
+            if cached is not None:
+                self._label_sets.move_to_end(key)
+                return cached
+
+        user_labels = sorted(vocabulary)
+        features = self._user_text_features(owner or "", key[1], [self.prompt_template.format(label) for label in user_labels])
+        added = [i for i, label in enumerate(user_labels) if label not in self.vocabulary]
+        extra = torch.from_numpy(features[added]).to(self.device, dtype=global_features.dtype)
+        cached = (
+            self.labels + [self.prompt_template.format(user_labels[i]) for i in added],
+            {**self.vocabulary, **vocabulary},
+            torch.cat([global_features, extra]),
+        )
+        with self._label_lock:
+            self._label_sets[key] = cached
+            while len(self._label_sets) > settings.USER_VOCABULARY_CACHE_SIZE:
+                self._label_sets.popitem(last=False)
+        return cached
+
+    def _ensure_consumer(self) -> queue.Queue:
+        """🔹 현재 프로세스의 추론 스레드와 prefetch 큐 준비 (fork 후 또는 close 후 첫 호출이면 새로 만듦)"""
+        with self._consumer_lock:
+            if self._consumer_pid != os.getpid():
+                self._prefetch = queue.Queue(maxsize=max(1, settings.PLACE_PREFETCH_IMAGES))
+                self._consumer = threading.Thread(target=self._inference_loop, args=(self._prefetch,),
+                                                  name="place-inference", daemon=True)
+                self._consumer.start()
+                self._consumer_pid = os.getpid()
+            return self._prefetch
+
+    def close(self):
+        """🔹 추론 스레드 종료 (모델 교체 후 이전 버전 정리)
+
+        이후에 호출이 오면 (드물게 늦게 도착한 요청) 추론 스레드를 새로 시작하므로 소비자 없는 큐에서 멈추지 않는다.
+        """
+        with self._consumer_lock:
+            if self._consumer_pid != os.getpid():
+                return  # 이 프로세스에서는 스레드를 시작하지 않음
+            self._consumer_pid = None
+            prefetch, consumer = self._prefetch, self._consumer
+        prefetch.put(None)
+        consumer.join(timeout=settings.MODEL_DRAIN_TIMEOUT)
+        # 종료 신호 뒤에 들어온 이미지는 처리되지 않으므로 기다리는 호출을 실패시킴
+        while True:
+            try:
+                item = prefetch.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(RuntimeError("장소 태거가 종료되었습니다"))
+
     def _validate_image(self, image):
-        """이미지 유효성 검사 및 전처리"""
+        """이미지 유효성 검사 (크기 보정은 텐서 리사이즈에서 처리)"""
         if image is None:
             raise ValueError("이미지가 None입니다")
         
         # 이미지 모드 검사
         if image.mode != 'RGB':
-            logger.info(f"⚠️ 이미지 모드 변환: {image.mode} → RGB")
+            logger.debug(f"⚠️ 이미지 모드 변환: {image.mode} → RGB")
             image = image.convert('RGB')
         
-        # 이미지 크기 검사
-        min_size = 224
-        original_size = image.size
-        if image.size[0] < min_size or image.size[1] < min_size:
-            logger.warning(f"⚠️ 이미지 크기가 너무 작음: {original_size} → ({min_size}, {min_size})")
-            image = image.resize((min_size, min_size), Image.LANCZOS)
-        
-        logger.debug(f"✅ 이미지 검증 완료: 크기={image.size}, 모드={image.mode}")
         return image
 
-    def predict_places(self, image_data_dict: dict, top_k=3) -> dict:
-        """장소 태깅 (배치 처리)"""
-        results = {}
-        total_images = len(image_data_dict)
-        processed_count = 0
-        error_count = 0
-        
-        logger.info(f"🚀 장소 태깅 시작: 총 {total_images}개 이미지")
-        batch_start_time = time.time()
+    def _to_tensors(self, pixels: torch.Tensor) -> torch.Tensor:
+        """🔹 같은 크기 uint8 이미지 묶음 (B, H, W, 3) → 정규화된 CLIP 입력 (B, 2, 3, n, n)
 
+        clip preprocess(짧은 변 bicubic 리사이즈 → 중앙 크롭 → 정규화)를 PIL 없이 배치 텐서 연산으로 수행하고,
+        이미지마다 원본 + 좌우 반전 두 장을 만든다.
+        """
+        n = self.input_resolution
+        batch = pixels.permute(0, 3, 1, 2).float()
+        height, width = batch.shape[-2:]
+        scale = n / min(height, width)
+        size = (max(n, round(height * scale)), max(n, round(width * scale)))
+        if size != (height, width):
+            batch = F.interpolate(batch, size=size, mode="bicubic", align_corners=False, antialias=True)
+        top, left = (size[0] - n) // 2, (size[1] - n) // 2
+        batch = batch[..., top:top + n, left:left + n].clamp_(0, 255).div_(255)
+        batch = (batch - CLIP_MEAN) / CLIP_STD
+        return torch.stack([batch, batch.flip(-1)], dim=1)
+
+    def _preprocess(self, image_data_dict: dict):
+        """🔹 (이미지 키, 텐서 또는 예외)를 크기가 같은 이미지끼리 batch_size 단위로 묶어 생성"""
+        groups = {}
         for image_url, image in image_data_dict.items():
             try:
-                processed_count += 1
-                logger.info(f"🔍 [{processed_count}/{total_images}] 이미지 처리 중: {image_url}")
-                image_start_time = time.time()
-
-                # 이미지 검증 및 전처리
-                image = self._validate_image(image)
-                
-                # CLIP 입력 준비 부분 수정
-                try:
-                    # 이미지 변환 수정
-                    image_transforms = []
-                    transforms = [
-                        lambda x: x,  # 원본
-                        lambda x: x.transpose(Image.FLIP_LEFT_RIGHT)  # 좌우 반전
-                    ]
-                    
-                    for transform in transforms:
-                        processed = self.preprocess(transform(image))
-                        image_transforms.append(processed)
-                    
-                    # 텐서 스택 수정 (배치 차원 올바르게 처리)
-                    image_tensors = torch.cat([t.unsqueeze(0) for t in image_transforms], dim=0).to(self.device)
-                    
-                    # 텐서 shape 로깅 추가
-                    logger.debug(f"이미지 텐서 shape: {image_tensors.shape}")
-                    
-                    text_inputs = clip.tokenize(self.labels).to(self.device)
-
-                    # 예측 수행
-                    with torch.no_grad():
-                        # 이미지 특징 추출
-                        image_features = self.model.encode_image(image_tensors)
-                        text_features = self.model.encode_text(text_inputs)
-                        
-                        # 유사도 계산
-                        similarity = F.softmax(
-                            (image_features @ text_features.T).mean(dim=0).unsqueeze(0), 
-                            dim=-1
-                        )
-
-                        # 상위 결과 추출
-                        best_match_indices = similarity.argsort(descending=True)[0][:top_k]
-                        best_places = [
-                            (self.labels[idx], float(similarity[0, idx].item()))
-                            for idx in best_match_indices
-                        ]
-                        
-                        # 임계값 기반 필터링
-                        valid_places = [
-                            place for place in best_places 
-                            if place[1] >= self.threshold
-                        ]
-
-                        # 결과 저장
-                        if valid_places:
-                            place_name = valid_places[0][0].replace("a photo of ", "")
-                            results[image_url] = {
-                                "place": places.get(place_name, place_name),
-                                "confidence": valid_places[0][1],
-                                "all_predictions": [
-                                    {"place": p[0], "confidence": p[1]} 
-                                    for p in best_places[:3]
-                                ]
-                            }
-                            
-                            process_time = time.time() - image_start_time
-                            # 상세 로깅 추가
-                            logger.info(
-                                f"✅ 태깅 완료: {image_url}\n"
-                                f"   - 최종 선택 장소: {results[image_url]['place']} (신뢰도: {results[image_url]['confidence']:.4f})\n"
-                                f"   - 상위 3개 후보:\n" + 
-                                "\n".join([
-                                    f"     {i+1}. {p[0].replace('a photo of ', '')} "  # outdoor scene 제거
-                                    f"(신뢰도: {p[1]:.4f})"
-                                    for i, p in enumerate(best_places[:3])
-                                ]) + f"\n"
-                                f"   - 처리시간: {process_time:.2f}초"
-                            )
-                        else:
-                            error_count += 1
-                            results[image_url] = {
-                                "error": "임계값을 넘는 장소가 없음",
-                                "best_guess": best_places[0] if best_places else None
-                            }
-                            # 임계값을 넘지 못한 경우에도 상위 후보 로깅
-                            logger.warning(
-                                f"⚠️ 유효한 장소 없음: {image_url}\n" +
-                                "   - 상위 3개 후보 (임계값 {self.threshold} 미만):\n" +
-                                "\n".join([
-                                    f"     {i+1}. {p[0].replace('a photo of ', '')} "  # outdoor scene 제거
-                                    f"(신뢰도: {p[1]:.4f})"
-                                    for i, p in enumerate(best_places[:3])
-                                ])
-                            )
+                array = np.asarray(self._validate_image(image), dtype=np.uint8)
+                groups.setdefault(array.shape, []).append((image_url, array))
+            except Exception as e:
+                yield image_url, e
 
+        for items in groups.values():
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                try:
+                    with span("clip.preprocess", images=len(chunk)), STAGE_SECONDS.time(stage="clip_preprocess"):
+                        tensors = self._to_tensors(torch.from_numpy(np.stack([array for _, array in chunk])))
                 except Exception as e:
-                    error_count += 1
-                    results[image_url] = {"error": str(e)}
-                    logger.error(f"❌ 처리 실패: {image_url}", exc_info=True)
+                    for image_url, _ in chunk:
+                        yield image_url, e
+                    continue
+                for (image_url, _), tensor in zip(chunk, tensors):
+                    yield image_url, tensor
+
+    def _inference_loop(self, prefetch: queue.Queue):
+        """🔹 prefetch 큐에서 준비된 이미지를 최대 batch_size장씩 꺼내 한 번에 인코딩 (소비자)"""
+        while True:
+            item = prefetch.get()
+            if item is None:
+                return
+            batch = [item]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = prefetch.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                similarities, embeddings = self._encode(torch.stack([tensor for tensor, _, _ in batch]),
+                                                        [features for _, _, features in batch])
+                for (_, future, _), similarity, embedding in zip(batch, similarities, embeddings):
+                    future.set_result((similarity, embedding))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            if stopping:
+                return
+
+    def _encode(self, tensors: torch.Tensor, text_features: list):
+        """🔹 (B, 2, 3, n, n) + 이미지별 텍스트 특징 행렬 → (이미지별 장소 확률 목록, 이미지 임베딩 (B, 차원) float32 numpy)
 
+        사용자 장소 목록이 다른 요청이 한 배치에 섞일 수 있으므로, 같은 행렬을 쓰는 이미지끼리 묶어 행렬 곱을 한 번씩 한다.
+        임베딩은 원본 + 좌우 반전 특징을 각각 L2 정규화해 평균낸 뒤 다시 정규화한 값 (코사인 유사도용).
+        """
+        CLIP_BATCH_IMAGES.observe(len(tensors))
+        with torch.no_grad(), span("clip.encode", images=len(tensors)), STAGE_SECONDS.time(stage="clip_encode"):
+            image_features = self.model.encode_image(tensors.flatten(0, 1).to(self.device))
+            views = image_features.view(len(tensors), 2, -1)
+            groups = {}
+            for row, features in enumerate(text_features):
+                groups.setdefault(id(features), (features, []))[1].append(row)
+            similarities = [None] * len(tensors)
+            for features, rows in groups.values():
+                # 원본 + 좌우 반전 두 장의 유사도 평균 → 레이블 softmax
+                logits = views[rows] @ features.T
+                for row, similarity in zip(rows, F.softmax(logits.mean(dim=1), dim=-1).float().cpu()):
+                    similarities[row] = similarity
+            embeddings = F.normalize(image_features.float(), dim=-1).view(len(tensors), 2, -1).mean(dim=1)
+            embeddings = F.normalize(embeddings, dim=-1).cpu().numpy()
+        return similarities, embeddings
+
+    def _select(self, image_url, similarity: torch.Tensor, top_k: int, verbose: bool, started_at: float,
+                labels: list, vocabulary: dict) -> dict:
+        """🔹 장소 확률 → 임계값을 넘는 최상위 장소 (없으면 error)"""
+        # 상위 결과 추출
+        best_match_indices = similarity.argsort(descending=True)[:top_k]
+        best_places = [
+            (labels[idx], float(similarity[idx].item()))
+            for idx in best_match_indices
+        ]
+
+        # 임계값 기반 필터링
+        valid_places = [
+            place for place in best_places 
+            if place[1] >= self.threshold
+        ]
+
+        if not valid_places:
+            # 임계값을 넘지 못한 경우에도 상위 후보 로깅
+            if verbose:
+                logger.debug(
+                    f"⚠️ 유효한 장소 없음: {image_url}\n" +
+                    f"   - 상위 3개 후보 (임계값 {self.threshold} 미만):\n" +
+                    "\n".join([
+                        f"     {i+1}. {p[0].replace('a photo of ', '')} "  # outdoor scene 제거
+                        f"(신뢰도: {p[1]:.4f})"
+                        for i, p in enumerate(best_places[:3])
+                    ])
+                )
+            return {
+                "error": "임계값을 넘는 장소가 없음",
+                "best_guess": best_places[0] if best_places else None
+            }
+
+        place_name = valid_places[0][0].replace("a photo of ", "")
+        result = {
+            "place": vocabulary.get(place_name, place_name),
+            "confidence": valid_places[0][1],
+            "all_predictions": [
+                {"place": p[0], "confidence": p[1]} 
+                for p in best_places[:3]
+            ]
+        }
+        # 상세 로깅 추가
+        if verbose:
+            logger.debug(
+                f"✅ 태깅 완료: {image_url}\n"
+                f"   - 최종 선택 장소: {result['place']} (신뢰도: {result['confidence']:.4f})\n"
+                f"   - 상위 3개 후보:\n" + 
+                "\n".join([
+                    f"     {i+1}. {p[0].replace('a photo of ', '')} "  # outdoor scene 제거
+                    f"(신뢰도: {p[1]:.4f})"
+                    for i, p in enumerate(best_places[:3])
+                ]) + f"\n"
+                f"   - 처리시간: {time.time() - started_at:.2f}초"
+            )
+        return result
+
+    def predict_places(self, image_data_dict: dict, top_k=3, embeddings=False,
+                       owner: Optional[str] = None, extra_vocabulary: Optional[dict] = None) -> dict:
+        """장소 태깅 (배치 처리)
+
+        전처리한 묶음을 바로 prefetch 큐에 넣으므로, 앞 묶음이 추론되는 동안 다음 묶음을 전처리한다.
+        큐가 가득 차면 추론 스레드가 따라잡을 때까지 기다린다.
+        embeddings=True면 추론에 성공한 이미지 결과에 "embedding"(정규화된 float32 벡터)을 함께 담는다
+        (임계값을 넘는 장소가 없어도 포함).
+        extra_vocabulary({영문 레이블: 태그})가 주어지면 owner(사용자)의 장소로 전역 목록과 함께 분류한다.
+        """
+        results = {}
+        pending = {}
+        total_images = len(image_data_dict)
+        labels, vocabulary, text_features = self.label_set(owner, extra_vocabulary)
+        prefetch = self._ensure_consumer()
+        
+        # ✅ 이미지별 상세 로그는 DEBUG에서만 (메시지 포맷팅 자체도 요청 경로의 비용)
+        verbose = logger.isEnabledFor(logging.DEBUG)
+        batch_start_time = time.time()
+
+        for image_url, tensor in self._preprocess(image_data_dict):
+            if isinstance(tensor, Exception):
+                STAGE_ERRORS.inc(stage="clip_preprocess")
+                results[image_url] = {"error": str(tensor)}
+                logger.error(f"❌ 전처리 실패: {image_url} ({tensor})")
+                continue
+            future = Future()
+            prefetch.put((tensor, future, text_features))
+            pending[image_url] = future
+
+        for image_url, future in pending.items():
+            try:
+                similarity, embedding = future.result()
+                results[image_url] = self._select(image_url, similarity, top_k, verbose, batch_start_time,
+                                                  labels, vocabulary)
+                if embeddings:
+                    results[image_url]["embedding"] = embedding
             except Exception as e:
-                error_count += 1
+                STAGE_ERRORS.inc(stage="clip_encode")
                 results[image_url] = {"error": str(e)}
                 logger.error(f"❌ 처리 실패: {image_url}", exc_info=True)
 
+        # 입력 순서대로 정리
+        results = {image_url: results[image_url] for image_url in image_data_dict}
+        error_count = sum(1 for result in results.values() if "error" in result)
+
         # 최종 통계
+        if not verbose or not total_images:
+            return results
         total_time = time.time() - batch_start_time
         success_rate = ((total_images - error_count) / total_images) * 100
         
-        logger.info(
+        logger.debug(
             f"\n📊 처리 완료 통계:\n"
             f"   - 총 이미지: {total_images}개\n"
             f"   - 성공: {total_images - error_count}개\n"
@@ -195,4 +462,4 @@ class PlaceTagger:
             f"   - 이미지당 평균 처리시간: {total_time/total_images:.2f}초"
         )
 
-        return results
\ No newline at end of file
+        return results
@@ -0,0 +1,89 @@
+import os
+import re
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.model_manager import ModelReloadError, model_manager
+from app.core.profiling import profiler, verify_admin_token
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """🔹 X-Admin-Token 헤더 확인 (ADMIN_TOKEN 미설정이면 관리자 API 비활성)"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="관리자 API가 비활성화되어 있습니다.")
+    if not verify_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# ✅ 저장된 프로파일 파일 이름 (경로 이동 방지)
+PROFILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_\-]+\.(folded|json)$")
+
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float  # 0 ~ 1, 0이면 끔 (X-Profile 헤더 요청은 항상 프로파일링)
+    duration_seconds: Optional[float] = None  # 지나면 자동으로 꺼짐
+
+
+@router.get("/profiling")
+def get_profiling():
+    """🔹 현재 워커의 프로파일링 스위치 상태"""
+    return profiler.status()
+
+
+@router.put("/profiling")
+def update_profiling(request: ProfilingSettings):
+    """🔹 요청 샘플링 비율 변경 (이 요청을 받은 워커 프로세스에만 적용)"""
+    profiler.configure(request.sample_rate, request.duration_seconds)
+    return profiler.status()
+
+
+@router.get("/profiling/profiles")
+def list_profiles(limit: int = 50):
+    """🔹 최근 저장된 프로파일 목록"""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return {"profiles": []}
+    names = sorted((name for name in os.listdir(settings.PROFILE_DIR) if PROFILE_NAME_PATTERN.match(name)),
+                   reverse=True)
+    return {"profiles": names[:limit]}
+
+
+@router.get("/profiling/profiles/{name}")
+def download_profile(name: str):
+    """🔹 collapsed stack(.folded) 또는 메타데이터(.json) 다운로드"""
+    path = os.path.join(settings.PROFILE_DIR, name)
+    if not PROFILE_NAME_PATTERN.match(name) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="프로파일을 찾을 수 없습니다.")
+    return FileResponse(path, media_type="application/json" if name.endswith(".json") else "text/plain")
+
+
+class ModelReloadRequest(BaseModel):
+    # 장소 태거 생성 인자 (없으면 PLACE_* 설정값), 다른 태거는 인자 없이 다시 로드
+    model_name: Optional[str] = None  # CLIP 모델 (예: ViT-B/32)
+    threshold: Optional[float] = None
+    vocabulary: Optional[Dict[str, str]] = None  # {영문 레이블: 태그}
+    vocabulary_path: Optional[str] = None  # 서버에 있는 장소 목록 JSON
+
+
+@router.get("/models")
+def get_models():
+    """🔹 태거별 현재 버전 / 사용 중인 요청 수 / 진행 중인 교체 상태"""
+    return model_manager.status()
+
+
+@router.post("/models/{name}/reload", status_code=status.HTTP_202_ACCEPTED)
+def reload_model(name: str, request: Optional[ModelReloadRequest] = None):
+    """🔹 새 버전을 백그라운드에서 로드 + 워밍업 후 교체 (교체 전까지 현재 버전으로 계속 처리)"""
+    options = request.model_dump(exclude_none=True) if request is not None else {}
+    if options and name != "place":
+        raise HTTPException(status_code=400, detail=f"{name} 태거는 교체 옵션을 받지 않습니다 (옵션 없이 다시 로드만 가능)")
+    if name not in model_manager.status():
+        raise HTTPException(status_code=404, detail=f"알 수 없는 태거: {name}")
+    try:
+        candidate = model_manager.reload(name, **options)
+    except ModelReloadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"model": name, "current_version": model_manager.status()[name]["version"], "reload": candidate}
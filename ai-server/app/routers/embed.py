@@ -0,0 +1,36 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from typing import List, Literal
+from pydantic import BaseModel
+from app.core.model_manager import ModelNotReadyError, model_manager
+from app.utils.embedding import encode_embedding
+
+router = APIRouter()
+
+# ✅ 요청당 최대 검색어 수
+MAX_TEXTS = 32
+
+
+class TextEncodeRequest(BaseModel):
+    texts: List[str]
+    embedding: Literal["float32", "int8"] = "float32"
+
+
+@router.post("/encode-text")
+async def encode_text(request: TextEncodeRequest):
+    """🔹 검색어 → CLIP 텍스트 임베딩 (저장된 이미지 임베딩과 같은 공간, 임베딩 버전이 같은 것끼리만 비교 가능)"""
+    texts = [text.strip() for text in request.texts]
+    if not texts or len(texts) > MAX_TEXTS or not all(texts):
+        raise HTTPException(status_code=400, detail=f"texts는 비어 있지 않은 검색어 1~{MAX_TEXTS}개여야 합니다")
+
+    try:
+        with model_manager.lease("place") as (tagger, version):
+            vectors = await asyncio.to_thread(tagger.encode_text, texts)
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return {
+        "model_version": version,
+        "embedding_model": tagger.embedding_version,  # 검색 시 비교할 저장 임베딩 버전
+        "embeddings": [encode_embedding(vector, tagger.embedding_version, request.embedding) for vector in vectors],
+    }
@@ -0,0 +1,43 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from typing import List, Literal
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.model_manager import ModelNotReadyError, model_manager
+from app.utils.emotions import EMOTIONS, suggest_emotions
+
+router = APIRouter()
+
+
+class EmotionRequest(BaseModel):
+    texts: List[str]
+    priority: Literal["interactive", "bulk"] = "interactive"  # bulk: 기존 일기 일괄 보정 (더 많은 텍스트, 낮은 우선순위)
+
+
+@router.post("/emotions")
+async def analyze_emotions(request: EmotionRequest):
+    """🔹 일기 텍스트 → 감정 8종별 확률 + 추천 감정 (같은 텍스트는 캐시된 결과)"""
+    limit = settings.EMOTION_BULK_MAX_TEXTS if request.priority == "bulk" else settings.EMOTION_MAX_TEXTS
+    texts = [text.strip() for text in request.texts]
+    if not texts or len(texts) > limit or not all(texts):
+        raise HTTPException(status_code=400, detail=f"texts는 비어 있지 않은 텍스트 1~{limit}개여야 합니다")
+
+    if not settings.EMOTION_ENABLED:
+        raise HTTPException(status_code=503, detail="감정 분석이 비활성화되어 있습니다 (EMOTION_ENABLED=0)")
+    try:
+        with model_manager.lease("emotion") as (classifier, version):
+            scores = await asyncio.to_thread(classifier.predict, texts, request.priority)
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return {
+        "model_version": version,
+        "emotions": list(EMOTIONS),
+        "results": [
+            {
+                "scores": score,
+                "suggested": suggest_emotions(score, settings.EMOTION_SUGGEST_THRESHOLD, settings.EMOTION_SUGGEST_MAX),
+            }
+            for score in scores
+        ],
+    }
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.model_manager import TAGGER_MODELS, model_manager
+
+router = APIRouter()
+
+
+@router.get("/live")
+def live():
+    """🔹 프로세스 생존 여부 (모델 로드 상태와 무관)"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+def ready():
+    """🔹 이미지 태거가 모두 로드 + 워밍업 완료되었을 때만 200 (감정 모델 상태는 models에만 표시)"""
+    models = model_manager.status()
+    if not model_manager.is_ready(TAGGER_MODELS):
+        return JSONResponse(status_code=503, content={"status": "warming_up", "models": models})
+    return {"status": "ready", "models": models}
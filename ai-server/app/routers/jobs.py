@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Header, status
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel
+from app.core.config import settings
+from app.routers.tag import resolve_lane
+from app.services.jobs import job_queue, job_payload, QueueFullError
+from app.services.tagging import register_places, resolve_stages
+
+router = APIRouter()
+
+
+# ✅ 비동기 태깅 작업 요청 스키마
+class TaggingJobRequest(BaseModel):
+    image_urls: List[str]
+    callback_url: Optional[str] = None  # 완료 시 결과를 POST 할 URL (없으면 JOB_CALLBACK_URL)
+    priority: Optional[str] = None  # 없으면 X-Priority 헤더 → JOB_DEFAULT_LANE
+    user_id: Optional[str] = None  # 근접 중복 태그 재사용 범위
+    stages: Optional[List[str]] = None  # 실행할 단계 (place / region / people), 없으면 전체 — 지역 일괄 보정은 ["region"]
+    embedding: Optional[Literal["float32", "int8"]] = None  # 결과에 CLIP 이미지 임베딩 포함 형식
+    places: Optional[Dict[str, str]] = None  # 사용자 장소 목록 {영문 레이블: 태그} (user_id 필요, 실행 시 다시 등록)
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_tagging_job(request: TaggingJobRequest, x_priority: Optional[str] = Header(None)):
+    """🔹 태깅 작업 등록 후 즉시 job_id 반환
+
+    asyncio.Queue는 스레드 안전하지 않으므로 이벤트 루프에서 실행 (sync def면 스레드풀에서 put_nowait가 호출됨)
+    """
+    lane = resolve_lane(request.priority or x_priority or settings.JOB_DEFAULT_LANE, None)
+    try:
+        resolve_stages(request.stages)
+        register_places(request.user_id, request.places)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        job_id = job_queue.submit(request.image_urls, request.callback_url, lane, request.user_id, request.stages,
+                                  request.embedding, request.places)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "10"})
+
+    return {"job_id": job_id, "status": "queued", "status_url": f"/ai/jobs/{job_id}"}
+
+
+@router.get("/jobs/{job_id}")
+def get_tagging_job(job_id: str):
+    """🔹 작업 상태 및 결과 조회"""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job_payload(job)
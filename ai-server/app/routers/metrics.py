@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """🔹 Prometheus 텍스트 포맷 메트릭"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from app.core.scheduler import tagging_scheduler
+from app.services.jobs import job_queue
+
+router = APIRouter()
+
+
+@router.get("/queue/stats")
+def get_queue_stats():
+    """🔹 레인별 대기 깊이/대기 시간 + 비동기 작업 큐 깊이"""
+    return {
+        "scheduler": tagging_scheduler.stats(),
+        "jobs": {"depth": job_queue.depth(), "maxsize": job_queue.maxsize},
+    }
@@ -1,174 +1,208 @@
-from fastapi import APIRouter, HTTPException
-from app.models.place_tag import PlaceTagger
-from app.models.location_tag import LocationTagger
-from app.models.companion_tag import CompanionTagger
-from typing import List, Dict
+import json
+from fastapi import APIRouter, HTTPException, Request, Header
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.model_manager import ModelNotReadyError
+from app.core.scheduler import tagging_scheduler, AdmissionError, UnknownLaneError
+from app.services.tagging import (ImageUpload, ensure_taggers_ready, register_places, resolve_stages, run_tagging,
+                                  stream_tagging)
+from typing import Dict, List, Literal, Optional, Type
 from pydantic import BaseModel
-import re
-import requests
-from io import BytesIO
-from PIL import Image, ExifTags
-import piexif
-import aiohttp
-import io
 
 router = APIRouter()
 
-def convert_image_url(url: str) -> str:
-    """Google Drive URL 변환"""
-    match = re.search(r"file/d/([^/]+)/view", url)
-    if match:
-        image_id = match.group(1)
-        return f"https://drive.google.com/uc?id={image_id}"
-    
-    return url  # ✅ 기타 URL은 그대로 반환
-
-def download_image(image_url: str):
-    """🔹 이미지 다운로드 후 PIL 객체로 변환 (EXIF 데이터 유지)"""
+# ✅ 요청 스키마 정의
+class TaggingRequest(BaseModel):
+    image_urls: List[str] = []
+    priority: Optional[str] = None  # 우선순위 레인 (interactive / bulk), 없으면 X-Priority 헤더 → 기본값
+    deadline_ms: Optional[int] = None  # 처리 시간 예산, 없으면 X-Request-Deadline-Ms 헤더 → 기본값
+    user_id: Optional[str] = None  # 주어지면 같은 사용자의 근접 중복 이미지에서 장소/인물 태그 재사용
+    stages: Optional[List[str]] = None  # 실행할 단계 (place / region / people), 없으면 전체 — region만이면 EXIF 구간만 다운로드
+    embedding: Optional[Literal["float32", "int8"]] = None  # 주어지면 결과마다 CLIP 이미지 임베딩을 이 형식으로 포함
+    places: Optional[Dict[str, str]] = None  # 사용자 장소 목록 {영문 레이블: 태그} (user_id 필요, 빈 객체면 삭제, 없으면 이전 목록 유지)
+
+
+def resolve_lane(priority: Optional[str], header_priority: Optional[str]) -> str:
+    """🔹 요청 필드 → X-Priority 헤더 → 기본 레인 순으로 결정 (알 수 없으면 400)"""
+    lane = priority or header_priority or settings.DEFAULT_LANE
+    try:
+        tagging_scheduler.lane(lane)
+    except UnknownLaneError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return lane
+
+
+def resolve_deadline(deadline_ms: Optional[int], header_deadline_ms: Optional[int]) -> Deadline:
+    """🔹 요청 필드 → X-Request-Deadline-Ms 헤더 → DEFAULT_DEADLINE_MS (0이면 무제한)"""
+    return Deadline(deadline_ms or header_deadline_ms or settings.DEFAULT_DEADLINE_MS or None)
+
+
+def check_stages(stages: Optional[List[str]]) -> Optional[tuple]:
+    """🔹 요청한 단계 검증 (알 수 없는 이름이면 400) 후 해당 태거 준비 확인 (로딩/워밍업 전이면 503)"""
+    try:
+        resolved = resolve_stages(stages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        ensure_taggers_ready(resolved)
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return resolved
+
+
+def check_places(request: TaggingRequest):
+    """🔹 요청의 사용자 장소 목록 등록 (형식이 틀리거나 user_id가 없으면 400)"""
+    try:
+        register_places(request.user_id, request.places)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def admit_or_reject(lane: str, units: int):
+    """🔹 레인 수락 한도 확인 (초과 시 429 + Retry-After)"""
     try:
-        response = requests.get(image_url, timeout=5)
-        response.raise_for_status()
-        
-        # 이미지 데이터를 BytesIO에 저장
-        image_data = BytesIO(response.content)
-        
-        # PIL Image로 열기
-        image = Image.open(image_data)
-        
-        # EXIF 데이터 디버깅
-        print(f"📸 이미지 정보: {image_url}")
-        print(f"- 이미지 모드: {image.mode}")
-        print(f"- 이미지 포맷: {image.format}")
-        print(f"- info 키: {list(image.info.keys())}")
-        
-        # EXIF 데이터 보존을 위한 처리
-        if "exif" in image.info:
-            exif_dict = piexif.load(image.info["exif"])
-            print(f"- EXIF 데이터: {list(exif_dict.keys())}")
-            
-            # GPS 데이터 상세 확인
-            if "GPS" in exif_dict:
-                print(f"- GPS 데이터: {exif_dict['GPS']}")
-            
-            # RGB로 변환이 필요한 경우
-            if image.mode != "RGB":
-                original_exif = image.info.get("exif")
-                image = image.convert("RGB")
-                image.info["exif"] = original_exif
-        else:
-            print("- EXIF 데이터 없음")
-            if image.mode != "RGB":
-                image = image.convert("RGB")
-        
-        return image
-
-    except Exception as e:
-        print(f"⚠️ 이미지 다운로드 실패: {image_url}, 오류: {e}")
+        tagging_scheduler.admit(lane, units)
+    except AdmissionError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+class StreamingTaggingRequest(TaggingRequest):
+    partial: bool = False  # True면 태거(place/region/people)별 중간 결과도 전송
+
+
+# ✅ 요청 본문 형식 (같은 엔드포인트에서 Content-Type으로 구분)
+# - application/json: TaggingRequest (image_urls)
+# - multipart/form-data: images 파일 여러 개 + 같은 순서의 image_ids / lat / lon (빈 값 허용),
+#   나머지 필드(image_urls, stages, embedding, priority, deadline_ms, user_id, partial)는 폼 필드 (목록은 같은 이름 반복),
+#   places는 JSON 문자열
+# - image/* 또는 application/octet-stream: 본문이 이미지 한 장, image_id / lat / lon 등은 쿼리 파라미터
+def _coordinate(values: List[str], index: int, name: str) -> Optional[float]:
+    value = values[index].strip() if index < len(values) else ""
+    if not value:
         return None
+    try:
+        return float(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} 값이 숫자가 아닙니다: {value}")
 
-def resize_image(image: Image.Image, max_width: int, max_height: int):
-    """🔹 이미지 크기를 조정하여 메모리 최적화"""
-    width, height = image.size
-    if width > max_width or height > max_height:
-        scale = min(max_width / width, max_height / height)
-        new_size = (int(width * scale), int(height * scale))
-        image = image.resize(new_size, Image.LANCZOS)
-    
-    return image
 
-# ✅ 요청 스키마 정의
-class TaggingRequest(BaseModel):
-    image_urls: List[str]
+def _validate(model: Type[TaggingRequest], fields: dict) -> TaggingRequest:
+    if isinstance(fields.get("places"), str):
+        try:
+            fields["places"] = json.loads(fields["places"])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="places는 JSON 객체여야 합니다")
+    try:
+        return model.model_validate(fields)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def _check_size(size: int, name: str):
+    if size > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"{name}: 이미지가 너무 큽니다 ({size} > {settings.UPLOAD_MAX_BYTES} bytes)")
+
+
+async def parse_tagging_request(http_request: Request, model: Type[TaggingRequest] = TaggingRequest):
+    """🔹 요청 본문 → (요청 필드, 태깅할 이미지 목록: URL 문자열 또는 ImageUpload)"""
+    content_type = http_request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        form = await http_request.form()
+        files = [item for item in form.getlist("images") if not isinstance(item, str)]
+        image_ids, lats, lons = form.getlist("image_ids"), form.getlist("lat"), form.getlist("lon")
+        fields = {key: value for key, value in form.items() if isinstance(value, str) and key in model.model_fields}
+        fields["image_urls"] = form.getlist("image_urls")
+        if "stages" in form:
+            fields["stages"] = form.getlist("stages")
+        request = _validate(model, fields)
+
+        uploads = []
+        for index, file in enumerate(files):
+            image_id = (image_ids[index] if index < len(image_ids) else "") or file.filename or f"upload-{index}"
+            _check_size(file.size or 0, image_id)
+            uploads.append(ImageUpload(image_id, await file.read(),
+                                       _coordinate(lats, index, "lat"), _coordinate(lons, index, "lon")))
+        return request, [*request.image_urls, *uploads]
+
+    if content_type.startswith(("image/", "application/octet-stream")):
+        params = http_request.query_params
+        image_id = params.get("image_id") or "upload-0"
+        _check_size(int(http_request.headers.get("content-length") or 0), image_id)
+        data = await http_request.body()
+        _check_size(len(data), image_id)
+        fields = {key: value for key, value in params.items() if key in model.model_fields}
+        if "stages" in params:
+            fields["stages"] = params.getlist("stages")
+        request = _validate(model, fields)
+        upload = ImageUpload(image_id, data,
+                             _coordinate(params.getlist("lat"), 0, "lat"), _coordinate(params.getlist("lon"), 0, "lon"))
+        return request, [*request.image_urls, upload]
+
+    try:
+        body = await http_request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON 본문을 읽을 수 없습니다")
+    request = _validate(model, body)
+    return request, list(request.image_urls)
 
-# ✅ 태깅 모델 인스턴스 생성
-place_tagger = PlaceTagger()
-location_tagger = LocationTagger()
-companion_tagger = CompanionTagger()
 
 @router.post("/generate-tags")
-async def generate_tags(request: TaggingRequest):
+async def generate_tags(http_request: Request, x_priority: Optional[str] = Header(None),
+                        x_request_deadline_ms: Optional[int] = Header(None)):
+    """🔹 이미지 태깅 (이미지 URL JSON, 또는 multipart / raw 바이트로 받은 이미지 — 후자는 다운로드 없이 처리)"""
+    request, images = await parse_tagging_request(http_request)
+    deadline = resolve_deadline(request.deadline_ms, x_request_deadline_ms)
+    lane = resolve_lane(request.priority, x_priority)
+
+    # ✅ 요청한 단계의 태거가 백그라운드 로딩/워밍업 전이면 503
+    check_stages(request.stages)
+    check_places(request)
+
+    admit_or_reject(lane, len(images))
     try:
-        results = []
-        image_urls = []
-        converted_urls = []  # 변환된 URL 저장
-        image_data_dict = {}
-
-        # 이미지 URL 처리
-        for url in request.image_urls:
-            try:
-                # Google Drive URL 변환
-                converted_url = convert_image_url(url)
-                
-                # 이미지 다운로드 및 변환
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(converted_url) as response:
-                        if response.status == 200:
-                            image_data = await response.read()
-                            image = Image.open(io.BytesIO(image_data))
-                            
-                            # 이미지를 RGB로 변환
-                            if image.mode != 'RGB':
-                                image = image.convert('RGB')
-                            
-                            # 각 태거에 맞는 이미지 크기로 복사
-                            image_data_dict[url] = {
-                                "place": image.copy().resize((512, 512)),
-                                "face": image.copy().resize((1024, 1024))
-                            }
-                            image_urls.append(url)
-                            converted_urls.append(converted_url)  # 변환된 URL 저장
-                        else:
-                            print(f"⚠️ 이미지 다운로드 실패: {url}")
-                            results.append({"image_url": url, "tags": []})
-                            continue
-
-            except Exception as e:
-                print(f"⚠️ 이미지 처리 실패: {url}, 오류: {str(e)}")
-                results.append({"image_url": url, "tags": []})
-                continue
-
-        # 이미지가 하나도 처리되지 않은 경우
-        if not image_data_dict:
-            return {"results": results}
-
-        # 태깅 수행
-        place_tags = place_tagger.predict_places({url: data["place"] for url, data in image_data_dict.items()})
-        location_tags = location_tagger.predict_locations(converted_urls)  # 변환된 URL 사용
-
-        # 인물 태그 생성
-        companion_tags = {}
+        results = await run_tagging(images, lane, deadline, request.user_id, request.stages, request.embedding)
+    finally:
+        tagging_scheduler.finish(lane, len(images))
+
+    return {"results": results, "degraded": any(result["degraded"] for result in results)}
+
+
+@router.post("/generate-tags/stream")
+async def generate_tags_stream(http_request: Request,
+                               x_priority: Optional[str] = Header(None),
+                               x_request_deadline_ms: Optional[int] = Header(None)):
+    """🔹 이미지별 태그를 준비되는 즉시 전송 (기본 NDJSON, Accept: text/event-stream이면 SSE)"""
+    request, images = await parse_tagging_request(http_request, StreamingTaggingRequest)
+    deadline = resolve_deadline(request.deadline_ms, x_request_deadline_ms)
+    lane = resolve_lane(request.priority, x_priority)
+    check_stages(request.stages)
+    check_places(request)
+
+    admit_or_reject(lane, len(images))
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    released = False
+
+    def _release():
+        # 본문 생성기가 시작되지 않고 끝나도(연결 끊김 등) 응답 background에서 반납 → 한 번만 반납
+        nonlocal released
+        if not released:
+            released = True
+            tagging_scheduler.finish(lane, len(images))
+
+    async def _body():
         try:
-            companion_tags = companion_tagger.process_faces({url: data["face"] for url, data in image_data_dict.items()})
-            if companion_tags is None:
-                companion_tags = {url: [] for url in image_urls}
-        except Exception as e:
-            print(f"⚠️ 인물 태깅 실패: {str(e)}")
-            companion_tags = {url: [] for url in image_urls}
-
-        # 이미지별 응답 구조화
-        for url, converted_url in zip(image_urls, converted_urls):
-            tags = []
-            
-            # 장소 태그 추가
-            if url in place_tags and "error" not in place_tags[url]:
-                tags.append({"type": "장소", "tag_name": place_tags[url]["place"]})
-            
-            # 지역 태그 추가 (변환된 URL 사용)
-            if converted_url in location_tags and "error" not in location_tags[converted_url]:
-                tags.append({"type": "지역", "tag_name": location_tags[converted_url]["region"]})
-            
-            # 인물 태그 추가
-            if companion_tags and url in companion_tags:
-                person_tags = companion_tags[url]
-                if isinstance(person_tags, list):
-                    for person_tag in person_tags:
-                        tags.append({"type": "인물", "tag_name": person_tag})
-            
-            results.append({"image_url": url, "tags": tags})
-
-        return {"results": results}
-        
-    except Exception as e:
-        print(f"🚨 전역 에러 발생: {str(e)}")
-        results = [{"image_url": url, "tags": []} for url in request.image_urls]
-        return {"results": results}
\ No newline at end of file
+            async for event in stream_tagging(images, request.partial, lane, deadline, request.user_id,
+                                                 request.stages, request.embedding):
+                data = json.dumps(event, ensure_ascii=False)
+                yield f"event: {event['event']}\ndata: {data}\n\n" if use_sse else data + "\n"
+        finally:
+            _release()
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(_body(), media_type=media_type, headers={"Cache-Control": "no-cache"},
+                             background=BackgroundTask(_release))
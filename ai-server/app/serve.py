@@ -0,0 +1,113 @@
+"""🔹 멀티 워커 서빙 엔트리포인트
+
+    WEB_WORKERS=4 python -m app.serve
+
+부모 프로세스가 소켓을 열고 PRELOAD_MODELS에 지정된 태거의 가중치를 한 번만
+로드한 뒤 워커를 fork 한다. 워커들은 가중치 페이지를 copy-on-write로 공유하므로
+`uvicorn --workers N`처럼 워커마다 CLIP ViT-L을 따로 올리지 않는다.
+죽은 워커는 부모가 다시 fork 한다.
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+from app.core.config import settings
+from app.core.threads import apply_thread_env, configure_torch_threads
+
+logger = logging.getLogger("app.serve")
+
+
+def _bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.SERVE_HOST, settings.SERVE_PORT))
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, app):
+    """🔹 fork 된 자식 프로세스에서 uvicorn 서버 실행"""
+    import uvicorn
+
+    # 부모에서 1개로 묶어 둔 torch 스레드를 워커 예산만큼 복원
+    configure_torch_threads()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    config = uvicorn.Config(app, host=settings.SERVE_HOST, port=settings.SERVE_PORT)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket, app) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_worker(sock, app)
+        finally:
+            os._exit(0)
+    logger.info(f"✅ 워커 시작 (pid: {pid})")
+    return pid
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+    # ✅ 워커별 스레드 예산은 torch/TF/numpy import 전에 환경 변수로 고정
+    apply_thread_env()
+    sock = _bind_socket()
+
+    from app.main import app
+    from app.core.model_manager import model_manager
+
+    # 격리 모드에서는 가중치가 태거 프로세스에 있으므로 부모에서 미리 로드하지 않음
+    if not settings.ISOLATE_TAGGERS:
+        if "place" in settings.PRELOAD_MODELS:
+            import torch  # noqa: F401 — 로드 전에 스레드를 1개로 묶기 위해 먼저 import
+        model_manager.preload(settings.PRELOAD_MODELS)
+
+    # ✅ 로드된 객체를 GC 추적 대상에서 제외 → 자식에서 GC가 페이지를 건드려 복사되는 것 방지
+    gc.collect()
+    gc.freeze()
+
+    workers = set()
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    for _ in range(settings.WEB_WORKERS):
+        workers.add(_fork_worker(sock, app))
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if stopping:
+            continue
+        logger.warning(f"⚠️ 워커 종료 감지 (pid: {pid}, status: {status}) → 재시작")
+        time.sleep(1)
+        workers.add(_fork_worker(sock, app))
+
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.metrics import gauge
+from app.core.model_manager import model_manager
+from app.services.tagging import register_places, resolve_stages, run_tagging, stage_models
+
+logger = logging.getLogger(__name__)
+
+# ✅ 작업 상태 (queued → running → done / failed)
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFullError(RuntimeError):
+    """🔹 작업 큐가 가득 차 새 작업을 받을 수 없는 경우"""
+
+
+class JobStore:
+    """🔹 SQLite 기반 작업 저장소 (서버 재시작 후에도 작업 유지)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    callback_url TEXT,
+                    callback_status TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner INTEGER,
+                    leased_at REAL
+                )
+                """
+            )
+
+    def create(self, request: dict, callback_url: Optional[str]) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, request, callback_url, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request), callback_url, now, now),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def claim(self, job_id: str) -> bool:
+        """🔹 queued → running 원자적 전환 (여러 워커 프로세스가 같은 저장소를 공유해도 한 번만 실행)
+
+        실행하는 프로세스(owner)와 lease 시각을 함께 기록한다.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, leased_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, os.getpid(), now, now, job_id, QUEUED),
+            )
+        return cursor.rowcount == 1
+
+    def renew(self, job_id: str) -> bool:
+        """🔹 실행 중인 작업의 lease 갱신 (이 프로세스가 아직 owner일 때만)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET leased_at = ? WHERE id = ? AND status = ? AND owner = ?",
+                (time.time(), job_id, RUNNING, os.getpid()),
+            )
+        return cursor.rowcount == 1
+
+    def reclaim_expired(self, lease_seconds: float) -> List[str]:
+        """🔹 lease가 끊긴 running 작업(실행하던 프로세스가 죽음)만 queued로 되돌림 → 되돌린 작업 ID
+
+        다른 살아 있는 프로세스가 lease를 갱신 중인 작업은 건드리지 않는다.
+        """
+        expired_before = time.time() - lease_seconds
+        reclaimed = []
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND (leased_at IS NULL OR leased_at < ?) ORDER BY created_at",
+                (RUNNING, expired_before),
+            ).fetchall()
+            for row in rows:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, owner = NULL, leased_at = NULL, updated_at = ? "
+                    "WHERE id = ? AND status = ? AND (leased_at IS NULL OR leased_at < ?)",
+                    (QUEUED, time.time(), row["id"], RUNNING, expired_before),
+                )
+                if cursor.rowcount == 1:
+                    reclaimed.append(row["id"])
+        return reclaimed
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self) -> List[str]:
+        """🔹 재시작 시 다시 큐에 넣어야 하는 대기 작업 (생성 순서대로, 여러 프로세스가 넣어도 claim으로 한 번만 실행)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobQueue:
+    """🔹 제한된 크기의 작업 큐 + 고정 개수 워커"""
+
+    def __init__(self, store_path: str, maxsize: int, num_workers: int):
+        self.store_path = store_path
+        self.store: Optional[JobStore] = None
+        self.maxsize = maxsize
+        self.num_workers = num_workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers = []
+
+    async def start(self):
+        """🔹 워커 시작 + 이전 실행에서 끝나지 않은 작업 복구"""
+        # SQLite 연결은 fork 이후 각 워커 프로세스에서 생성
+        self.store = JobStore(self.store_path)
+        self._queue = asyncio.Queue()
+        # 실행 중이던 작업은 lease가 끊긴 것만 되돌림 (다른 워커 프로세스가 실행 중인 작업은 그대로)
+        self.store.reclaim_expired(settings.JOB_LEASE_SECONDS)
+        for job_id in self.store.unfinished():
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            logger.info(f"✅ 미완료 작업 {self._queue.qsize()}개 복구")
+
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+        self._workers.append(asyncio.create_task(self._reclaim_loop()))
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, image_urls: List[str], callback_url: Optional[str] = None,
+               lane: str = settings.JOB_DEFAULT_LANE, user_id: Optional[str] = None,
+               stages: Optional[List[str]] = None, embedding: Optional[str] = None,
+               places: Optional[Dict[str, str]] = None) -> str:
+        """🔹 작업 등록 후 즉시 job_id 반환 (큐가 가득 차면 QueueFullError)"""
+        if self.depth() >= self.maxsize:
+            raise QueueFullError(f"작업 큐가 가득 찼습니다 ({self.maxsize}개)")
+        request = {"image_urls": image_urls, "lane": lane, "user_id": user_id, "stages": stages, "embedding": embedding,
+                   "places": places}
+        job_id = self.store.create(request, callback_url or settings.JOB_CALLBACK_URL)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def _reclaim_loop(self):
+        """🔹 실행 중 죽은 프로세스의 작업을 lease 만료 후 다시 큐에 넣음 (다시 fork 된 워커가 늦게 뜬 경우 포함)"""
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 2)
+            try:
+                reclaimed = self.store.reclaim_expired(settings.JOB_LEASE_SECONDS)
+            except sqlite3.Error as e:
+                logger.error(f"❌ 만료된 작업 확인 실패: {e}")
+                continue
+            for job_id in reclaimed:
+                logger.warning(f"⚠️ lease가 만료된 작업 다시 실행 (job: {job_id})")
+                self._queue.put_nowait(job_id)
+
+    async def _renew_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            self.store.renew(job_id)
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"❌ 작업 처리 중 예외 (job: {job_id}): {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None:
+            return
+        # 요청한 단계의 모델 워밍업이 끝날 때까지 대기 (재시작 직후 복구된 작업, region만 요청하면 위치 모델만)
+        models = stage_models(resolve_stages(job["request"].get("stages")))
+        while not model_manager.is_ready(models):
+            await asyncio.sleep(1)
+
+        if not self.store.claim(job_id):
+            return
+        heartbeat = asyncio.create_task(self._renew_lease(job_id))
+        try:
+            request = job["request"]
+            # 재시작 후 복구된 작업이면 사용자 장소 목록이 메모리에 없으므로 다시 등록
+            register_places(request.get("user_id"), request.get("places"))
+            results = await run_tagging(request["image_urls"], request.get("lane", settings.JOB_DEFAULT_LANE),
+                                        user_id=request.get("user_id"), stages=request.get("stages"),
+                                        embedding=request.get("embedding"))
+            self.store.update(job_id, status=DONE, result={"results": results})
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, error=str(e))
+        finally:
+            heartbeat.cancel()
+
+        if job["callback_url"]:
+            await self._send_callback(job_id, job["callback_url"])
+
+    async def _send_callback(self, job_id: str, callback_url: str):
+        """🔹 완료된 작업 결과를 callback URL로 전송 (지수 백오프 재시도)"""
+        payload = job_payload(self.store.get(job_id))
+        timeout = aiohttp.ClientTimeout(total=settings.JOB_CALLBACK_TIMEOUT)
+        for attempt in range(1, settings.JOB_CALLBACK_RETRIES + 1):
+            try:
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.post(callback_url, json=payload) as response:
+                        if response.status < 400:
+                            self.store.update(job_id, callback_status="delivered")
+                            return
+                        raise RuntimeError(f"HTTP {response.status}")
+            except Exception as e:
+                logger.warning(f"⚠️ 콜백 전송 실패 ({attempt}/{settings.JOB_CALLBACK_RETRIES}, job: {job_id}): {e}")
+                if attempt < settings.JOB_CALLBACK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+        self.store.update(job_id, callback_status="failed")
+
+
+def job_payload(job: dict) -> dict:
+    """🔹 API 응답용 작업 표현"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "results": job["result"]["results"] if job["result"] else None,
+        "error": job["error"],
+        "callback_status": job["callback_status"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+# ✅ 전역 작업 큐 (startup 이벤트에서 시작)
+job_queue = JobQueue(settings.JOB_STORE_PATH, settings.JOB_QUEUE_SIZE, settings.JOB_WORKERS)
+
+gauge("mindlog_job_queue_depth", "비동기 태깅 작업 큐에서 대기 중인 작업 수",
+      collect=lambda: [({}, job_queue.depth())])
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.phash import hamming
+
+# ✅ 근접 중복 이미지에서 재사용하는 단계 (지역 태그는 이미지별 EXIF로 따로 계산)
+REUSABLE_STAGES = ("place", "people")
+
+
+class HashEntry:
+    """🔹 사용자별 최근 이미지 해시 + 단계별 태그 (계산 중이면 ready가 아직 미완료)"""
+
+    def __init__(self, phash: int, image_url: str):
+        self.phash = phash
+        self.image_url = image_url
+        self.created_at = time.monotonic()
+        self.stage_tags: Dict[str, List[dict]] = {}
+        self.embedding: Optional[tuple] = None  # 장소 단계의 (CLIP 임베딩, 모델 버전)
+        self.ready = asyncio.get_running_loop().create_future()
+
+
+class NearDuplicateIndex:
+    """🔹 사용자별 최근 이미지 dHash 인덱스
+
+    같은 사용자의 최근 이미지 중 해밍 거리 max_distance 이내인 것이 있으면 그 이미지의
+    장소/인물 태그를 재사용한다. 같은 일기에 함께 올라온 버스트 사진은 동시에 처리되므로
+    아직 계산 중인 항목도 인덱스에 올려 두고, 뒤따르는 근접 중복은 그 완료를 기다린다.
+    """
+
+    def __init__(self, max_distance: int, per_user: int, max_users: int, ttl: float):
+        self.max_distance = max_distance
+        self.per_user = per_user
+        self.max_users = max_users
+        self.ttl = ttl
+        self._users: "OrderedDict[str, deque]" = OrderedDict()
+
+    def _entries(self, user_id: str) -> deque:
+        entries = self._users.get(user_id)
+        if entries is None:
+            entries = self._users[user_id] = deque(maxlen=self.per_user)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_id)
+        return entries
+
+    def lookup_or_reserve(self, user_id: str, phash: int, image_url: str) -> Tuple[Optional[HashEntry], bool]:
+        """🔹 (근접 중복 항목, 새로 등록했는지)
+
+        근접 중복이 없으면 이 이미지를 계산 중 항목으로 등록해 반환한다(True).
+        호출자는 반드시 complete() 또는 abandon()을 호출해야 한다.
+        """
+        entries = self._entries(user_id)
+        now = time.monotonic()
+        best, best_distance = None, self.max_distance + 1
+        for entry in entries:
+            if now - entry.created_at > self.ttl:
+                continue
+            distance = hamming(entry.phash, phash)
+            if distance < best_distance:
+                best, best_distance = entry, distance
+        if best is not None:
+            return best, False
+
+        entry = HashEntry(phash, image_url)
+        entries.append(entry)
+        return entry, True
+
+    async def wait(self, entry: HashEntry) -> bool:
+        """🔹 계산 중인 항목 완료 대기 (실패로 끝났으면 False)"""
+        return await asyncio.shield(entry.ready)
+
+    def complete(self, user_id: str, entry: HashEntry, stage_tags: Dict[str, List[dict]],
+                 embedding: Optional[tuple] = None):
+        """🔹 계산 결과 등록 (재사용할 수 있는 단계가 하나도 없으면 abandon과 같음)"""
+        reusable = {name: tags for name, tags in stage_tags.items() if name in REUSABLE_STAGES}
+        if not reusable:
+            self.abandon(user_id, entry)
+            return
+        entry.stage_tags = reusable
+        entry.embedding = embedding
+        if not entry.ready.done():
+            entry.ready.set_result(True)
+
+    def abandon(self, user_id: str, entry: HashEntry):
+        entries = self._users.get(user_id)
+        if entries is not None and entry in entries:
+            entries.remove(entry)
+        if not entry.ready.done():
+            entry.ready.set_result(False)
+
+
+# ✅ 전역 근접 중복 인덱스 (프로세스 메모리)
+near_duplicate_index = NearDuplicateIndex(
+    settings.PHASH_MAX_DISTANCE, settings.PHASH_INDEX_SIZE, settings.PHASH_INDEX_USERS, settings.PHASH_TTL_SECONDS
+)
@@ -0,0 +1,601 @@
+import asyncio
+import contextvars
+import hashlib
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+from PIL import Image
+import aiohttp
+import io
+from app.core.config import settings
+from app.core.deadline import Deadline
+from app.core.metrics import CACHE_LOOKUPS, FETCH_BYTES, NEAR_DUPLICATE_REUSES, STAGE_ERRORS, STAGE_SECONDS
+from app.core.model_manager import model_manager
+from app.core.scheduler import tagging_scheduler
+from app.core.singleflight import SingleFlight
+from app.core.tracing import span
+from app.services.near_duplicates import near_duplicate_index
+from app.services.user_places import user_places
+from app.utils.embedding import encode_embedding
+from app.utils.exif import read_exif_segment, read_gps
+from app.utils.phash import dhash
+
+# ✅ 진행 중 계산 합치기: 같은 URL(다운로드+추론), 다른 URL이지만 같은 바이트(추론)
+_url_flight = SingleFlight("url")
+_content_flight = SingleFlight("content")
+
+# ✅ 프로세스 공용 HTTP 세션 (커넥션 재사용, 합류한 요청이 다운로드 중 세션 종료에 영향받지 않도록)
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def http_session() -> aiohttp.ClientSession:
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+
+async def close_http_session():
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+
+def convert_image_url(url: str) -> str:
+    """Google Drive URL 변환"""
+    match = re.search(r"file/d/([^/]+)/view", url)
+    if match:
+        image_id = match.group(1)
+        return f"https://drive.google.com/uc?id={image_id}"
+    
+    return url  # ✅ 기타 URL은 그대로 반환
+
+
+class ImageUpload:
+    """🔹 URL 대신 바이트로 받은 이미지 (image_id는 결과의 image_url로 그대로 돌려줌)
+
+    lat/lon이 주어지면 EXIF 대신 그 좌표로 지역 태그를 만든다 (클라이언트가 이미 읽은 경우).
+    """
+
+    __slots__ = ("image_id", "data", "lat", "lon")
+
+    def __init__(self, image_id: str, data: bytes, lat: Optional[float] = None, lon: Optional[float] = None):
+        self.image_id = image_id
+        self.data = data
+        self.lat = lat
+        self.lon = lon
+
+
+def image_key(image: Union[str, ImageUpload]) -> str:
+    """🔹 결과의 image_url 값 (URL 또는 업로드 image_id)"""
+    return image.image_id if isinstance(image, ImageUpload) else image
+
+
+async def _download(converted_url: str) -> Optional[bytes]:
+    """🔹 이미지 전체 다운로드 (실패 시 None)"""
+    try:
+        with span("image.download", url=converted_url), STAGE_SECONDS.time(stage="download"):
+            async with http_session().get(converted_url) as response:
+                if response.status != 200:
+                    STAGE_ERRORS.inc(stage="download")
+                    print(f"⚠️ 이미지 다운로드 실패: {converted_url}")
+                    return None
+                image_data = await response.read()
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="download")
+        print(f"⚠️ 이미지 다운로드 실패: {converted_url}, 오류: {str(e)}")
+        return None
+
+    FETCH_BYTES.observe(len(image_data), mode="full")
+    return image_data
+
+
+async def fetch_image(url: str):
+    """🔹 이미지 다운로드 후 태거별 입력 크기로 변환 (실패 시 None)"""
+    # Google Drive URL 변환
+    converted_url = convert_image_url(url)
+    image_data = await _download(converted_url)
+    if image_data is None:
+        return None
+    return prepare_image(image_data, converted_url)
+
+
+async def fetch_exif(url: str):
+    """🔹 지역 태그만 필요할 때: EXIF 구간만 받아 GPS 추출 (픽셀 디코딩 없음, 실패 시 None)"""
+    converted_url = convert_image_url(url)
+    try:
+        with span("image.exif_range", url=converted_url) as fetch_span, STAGE_SECONDS.time(stage="exif_fetch"):
+            prefix, full = await read_exif_segment(http_session(), converted_url, settings.EXIF_RANGE_INITIAL_BYTES,
+                                                   settings.EXIF_RANGE_MAX_BYTES)
+            if fetch_span is not None:
+                fetch_span.set_attribute("bytes", len(prefix))
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="download")
+        print(f"⚠️ 이미지 EXIF 구간 요청 실패: {url}, 오류: {str(e)}")
+        return None
+    FETCH_BYTES.observe(len(prefix), mode="full" if full else "exif_range")
+    return {"converted_url": converted_url, "gps": read_gps(prefix)}
+
+
+def prepare_image(image_data: bytes, source: str, lat: Optional[float] = None, lon: Optional[float] = None):
+    """🔹 이미지 바이트 → 태거별 입력 (디코딩/리사이즈, GPS는 주어진 좌표 또는 EXIF, 실패 시 None)"""
+    try:
+        with span("image.decode"), STAGE_SECONDS.time(stage="decode"):
+            image = Image.open(io.BytesIO(image_data))
+            image.load()
+
+            # 이미지를 RGB로 변환
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+
+        # 각 태거에 맞는 이미지 크기로 복사
+        with span("image.resize"), STAGE_SECONDS.time(stage="resize"):
+            place_image = image.copy().resize((512, 512))
+            face_image = image.copy().resize((1024, 1024))
+        if lat is None or lon is None:
+            lat, lon = read_gps(image_data)
+        return {
+            "converted_url": source,
+            "digest": hashlib.sha256(image_data).hexdigest(),
+            "phash": dhash(place_image),
+            "gps": (lat, lon),
+            "place": place_image,
+            "face": face_image,
+        }
+
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="decode")
+        print(f"⚠️ 이미지 처리 실패: {source}, 오류: {str(e)}")
+        return None
+
+
+# ✅ 태그마다 그 태그를 만든 모델 버전(model_version)을 함께 기록 (모델 교체 전후 결과 구분용)
+def _place_tags(place_tags: dict, url: str, version: Optional[str] = None) -> List[dict]:
+    if url in place_tags and "error" not in place_tags[url]:
+        return [{"type": "장소", "tag_name": place_tags[url]["place"], "model_version": version}]
+    return []
+
+
+def _region_tags(region: dict, version: Optional[str] = None) -> List[dict]:
+    if "error" not in region:
+        return [{"type": "지역", "tag_name": region["region"], "model_version": version}]
+    return []
+
+
+def _people_tags(companion_tags: dict, url: str, version: Optional[str] = None) -> List[dict]:
+    person_tags = (companion_tags or {}).get(url)
+    if isinstance(person_tags, list):
+        return [{"type": "인물", "tag_name": person_tag, "model_version": version} for person_tag in person_tags]
+    return []
+
+
+async def _run_place(url: str, inputs: dict, user_id: Optional[str] = None) -> List[dict]:
+    # 사용자가 등록한 장소(예: "우리집")도 전역 장소 목록과 함께 분류
+    places, _ = user_places.get(user_id)
+    with model_manager.lease("place") as (tagger, version):
+        place_tags = await asyncio.to_thread(tagger.predict_places, {url: inputs["place"]}, embeddings=True,
+                                             owner=user_id, extra_vocabulary=places)
+    # 장소 분류에 쓴 CLIP 이미지 임베딩은 버리지 않고 결과에 담음 (요청하면 응답에 포함)
+    embedding = place_tags.get(url, {}).get("embedding")
+    if embedding is not None:
+        inputs["embedding"] = (embedding, tagger.embedding_version)
+    return _place_tags(place_tags, url, version)
+
+
+async def _run_region(url: str, inputs: dict, user_id: Optional[str] = None) -> List[dict]:
+    # GPS는 prepare_image에서 이미 받은 바이트(또는 요청 좌표)로 읽어 둠 → 이미지를 다시 받지 않음
+    lat, lon = inputs["gps"]
+    if lat is None or lon is None:
+        return []
+    with model_manager.lease("location") as (tagger, version):
+        region = await asyncio.to_thread(tagger.predict_region, lat, lon)
+    return _region_tags(region, version)
+
+
+async def _process_faces(faces: Dict[str, Image.Image]):
+    """🔹 {URL: 얼굴 입력 이미지} → ({URL: 인물 태그 목록}, 모델 버전), 실패하면 ({}, None)"""
+    try:
+        with model_manager.lease("companion") as (tagger, version):
+            return await asyncio.to_thread(tagger.process_faces, faces), version
+    except Exception as e:
+        STAGE_ERRORS.inc(stage="people")
+        print(f"⚠️ 인물 태깅 실패: {str(e)}")
+        return {}, None
+
+
+async def _run_people(url: str, inputs: dict, user_id: Optional[str] = None) -> List[dict]:
+    # 비스트리밍 요청은 요청 안의 얼굴을 모아 한 번에 클러스터링 (같은 인물이 이미지마다 같은 태그로 묶임)
+    member = _face_member.get()
+    if member is not None and member.url == url:
+        companion_tags, version = await member.batch.result()
+    else:
+        companion_tags, version = await _process_faces({url: inputs["face"]})
+    return _people_tags(companion_tags, url, version)
+
+
+class FaceBatch:
+    """🔹 한 요청의 이미지 얼굴을 모아 process_faces를 한 번만 호출 (배치 안에서 얼굴 클러스터링)
+
+    이미지마다 스케줄러 슬롯을 잡기 전에 얼굴 입력을 등록하거나 배치에 참여하지 않음을 알리고,
+    모든 이미지가 둘 중 하나를 마치면 배치가 완성된다. 인물 단계는 슬롯을 잡은 뒤 완성을 기다리지만,
+    완성에는 슬롯이 필요 없으므로 이미지 수가 슬롯보다 많아도 서로 기다리며 멈추지 않는다.
+    다른 계산에 합류한 이미지는 참여하지 않고 (합류한 계산의 결과를 받음),
+    합류한 뒤 직접 다시 계산하는 경우는 그 이미지만 따로 처리한다.
+    """
+
+    def __init__(self, size: int):
+        self._remaining = size
+        self._faces: Dict[str, Image.Image] = {}
+        self._complete = asyncio.Event()
+        self._task: Optional[asyncio.Future] = None
+        if size <= 0:
+            self._complete.set()
+
+    def member(self) -> "_FaceMember":
+        return _FaceMember(self)
+
+    def _arrive(self, url: Optional[str], face):
+        if url is not None:
+            self._faces[url] = face
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self._complete.set()
+
+    async def result(self):
+        """🔹 배치가 완성되면 등록된 얼굴 전체로 한 번 태깅 → ({URL: 인물 태그 목록}, 모델 버전)"""
+        await self._complete.wait()
+        if self._task is None:
+            self._task = asyncio.ensure_future(_process_faces(dict(self._faces)))
+        return await asyncio.shield(self._task)
+
+
+class _FaceMember:
+    """🔹 FaceBatch에 참여하는 이미지 하나 (처음 arrive 한 번만 유효)"""
+
+    __slots__ = ("batch", "url", "arrived")
+
+    def __init__(self, batch: FaceBatch):
+        self.batch = batch
+        self.url = None
+        self.arrived = False
+
+    def arrive(self, url: Optional[str] = None, face=None):
+        """🔹 얼굴 입력 등록 (url, face) 또는 배치로 인물 단계를 실행하지 않음을 알림 (인자 없이)"""
+        if self.arrived:
+            return
+        self.arrived = True
+        self.url = url
+        self.batch._arrive(url, face)
+
+
+# ✅ 현재 이미지의 FaceBatch 참여 정보 (run_tagging이 이미지 태스크마다 설정, 스트리밍은 이미지별로 처리)
+_face_member: contextvars.ContextVar = contextvars.ContextVar("face_member", default=None)
+
+
+def _leave_face_batch():
+    member = _face_member.get()
+    if member is not None:
+        member.arrive()
+
+
+# ✅ 태거 단계 (스트리밍 partial 이벤트의 tagger 이름과 동일, 결과 태그 순서도 이 순서를 따름)
+TAGGER_STAGES = {
+    "place": _run_place,
+    "region": _run_region,
+    "people": _run_people,
+}
+
+# ✅ 단계별 태거 모델 (stages로 일부만 요청하면 그 모델만 준비되어 있으면 됨)
+STAGE_MODELS = {"place": "place", "region": "location", "people": "companion"}
+
+# ✅ 디코딩된 픽셀이 필요한 단계 (region만 요청하면 EXIF 구간만 받고 디코딩하지 않음)
+PIXEL_STAGES = ("place", "people")
+
+# ✅ 마감 시간이 부족할 때 건너뛰는 순서 (비싼 단계부터: 얼굴 → 역지오코딩), 장소는 항상 실행
+STAGE_SKIP_ORDER = ["people", "region"]
+
+# ✅ 단계별 소요 시간 EWMA (초) — 초기값은 CPU 기준 대략치, 실행할 때마다 갱신
+_stage_seconds = {"place": 1.0, "region": 1.5, "people": 5.0}
+
+
+def _record_stage_time(name: str, seconds: float):
+    _stage_seconds[name] = 0.8 * _stage_seconds[name] + 0.2 * seconds
+
+
+def resolve_stages(stages: Optional[List[str]]) -> Optional[tuple]:
+    """🔹 요청한 단계 목록 검증 → TAGGER_STAGES 순서의 튜플 (전체 또는 None이면 None, 알 수 없는 이름은 ValueError)"""
+    if not stages:
+        return None
+    unknown = set(stages) - set(TAGGER_STAGES)
+    if unknown:
+        raise ValueError(f"알 수 없는 단계: {', '.join(sorted(unknown))} (가능: {', '.join(TAGGER_STAGES)})")
+    resolved = tuple(name for name in TAGGER_STAGES if name in stages)
+    return None if len(resolved) == len(TAGGER_STAGES) else resolved
+
+
+def _needs_pixels(stages: Optional[tuple]) -> bool:
+    return stages is None or any(name in PIXEL_STAGES for name in stages)
+
+
+def _result(url: str, tags: List[dict], skipped: List[str], reused_from: Optional[str] = None,
+            embedding: Optional[tuple] = None, error: Optional[str] = None) -> dict:
+    return {
+        "image_url": url,
+        "tags": tags,
+        "degraded": bool(skipped),
+        "skipped_stages": skipped,
+        "near_duplicate": reused_from is not None,
+        "reused_from": reused_from,  # 장소/인물 태그를 재사용한 근접 중복 원본 이미지 URL
+        "embedding": embedding,  # (CLIP 이미지 임베딩, 모델 버전) — tag_image에서 요청 형식으로 변환하거나 제거
+        "error": error,  # 이미지를 받거나 디코딩하지 못했으면 사유 (태그가 없는 것과 구분)
+    }
+
+
+async def tag_image(image: Union[str, ImageUpload],
+                    on_partial: Optional[Callable[[str, List[dict]], Awaitable[None]]] = None,
+                    lane: str = settings.DEFAULT_LANE, deadline: Optional[Deadline] = None,
+                    user_id: Optional[str] = None, stages: Optional[tuple] = None,
+                    embedding: Optional[str] = None) -> dict:
+    """🔹 이미지 한 장 태깅: 다운로드(URL) 또는 업로드 바이트 디코딩 후 장소/지역/인물 태거를 동시에 실행
+
+    같은 URL이 이미 처리 중이면 새로 계산하지 않고 그 결과를 함께 기다린다.
+    (합류한 요청에는 partial 이벤트가 전달되지 않고 최종 결과만 전달됨)
+    user_id가 주어지면 그 사용자의 최근 이미지 중 근접 중복에서 장소/인물 태그를 재사용한다.
+    stages(resolve_stages 결과)가 주어지면 그 단계만 실행하고, region만이면 EXIF 구간만 받는다.
+    embedding(float32 / int8)이 주어지면 장소 단계의 CLIP 이미지 임베딩을 그 형식으로 결과에 담는다.
+    """
+    if isinstance(image, ImageUpload):
+        with span("tag_image", image_id=image.image_id, bytes=len(image.data), lane=lane), STAGE_SECONDS.time(stage="e2e"):
+            result = await _tag_upload(image, on_partial, lane, deadline, user_id, stages)
+    else:
+        with span("tag_image", image_url=image, lane=lane), STAGE_SECONDS.time(stage="e2e"):
+            # 사용자 장소 목록이 있으면 장소 결과가 달라지므로 목록 버전이 같은 요청끼리만 합침
+            # 레인도 키에 넣어 interactive 요청이 bulk 대기열에 있는 계산을 기다리지 않게 함
+            key = (image, lane, stages, user_places.get(user_id)[1], _flight_owner(user_id))
+            # 마감으로 단계를 건너뛴 결과는 마감이 더 긴 요청과 공유하지 않고,
+            # 합류한 요청은 자기 마감까지만 기다린 뒤 직접 계산
+            result = await _url_flight.do(key, lambda: _tag_image(image, on_partial, lane, deadline, user_id, stages),
+                                          shareable=lambda shared: not shared["skipped_stages"],
+                                          timeout=deadline.remaining() if deadline is not None else None,
+                                          on_join=_leave_face_batch)
+    result = {**result, "tags": list(result["tags"]), "skipped_stages": list(result["skipped_stages"])}
+    raw_embedding = result.pop("embedding")
+    if embedding:
+        result["embedding"] = encode_embedding(*raw_embedding, embedding) if raw_embedding is not None else None
+    return result
+
+
+def _flight_owner(user_id: Optional[str]) -> Optional[str]:
+    """🔹 합치기 키에 넣을 사용자 (근접 중복 재사용이 켜져 있으면 결과가 사용자의 이전 이미지에 따라 달라짐)"""
+    return user_id if user_id and settings.PHASH_MAX_DISTANCE > 0 else None
+
+
+async def _tag_image(url: str, on_partial, lane: str, deadline: Optional[Deadline], user_id: Optional[str],
+                     stages: Optional[tuple] = None) -> dict:
+    inputs = await (fetch_image(url) if _needs_pixels(stages) else fetch_exif(url))
+    if inputs is None:
+        return _result(url, [], [], error="이미지를 가져오거나 디코딩할 수 없음")
+    return await _tag_inputs(url, inputs, on_partial, lane, deadline, user_id, stages)
+
+
+async def _tag_upload(upload: ImageUpload, on_partial, lane: str, deadline: Optional[Deadline],
+                      user_id: Optional[str], stages: Optional[tuple] = None) -> dict:
+    if _needs_pixels(stages):
+        inputs = prepare_image(upload.data, upload.image_id, upload.lat, upload.lon)
+    elif upload.lat is not None and upload.lon is not None:
+        inputs = {"converted_url": upload.image_id, "gps": (upload.lat, upload.lon)}
+    else:
+        inputs = {"converted_url": upload.image_id, "gps": read_gps(upload.data)}
+    if inputs is None:
+        return _result(upload.image_id, [], [], error="이미지를 디코딩할 수 없음")
+    return await _tag_inputs(upload.image_id, inputs, on_partial, lane, deadline, user_id, stages)
+
+
+async def _tag_inputs(url: str, inputs: dict, on_partial, lane: str, deadline: Optional[Deadline],
+                      user_id: Optional[str], stages: Optional[tuple] = None) -> dict:
+    infer = lambda: _infer(url, inputs, on_partial, lane, deadline or Deadline(), user_id, stages)
+    if "digest" not in inputs:
+        tags, skipped, reused_from, embedding = await infer()  # EXIF만 받은 경우 (바이트 전체가 없어 내용 합치기 불가)
+    else:
+        # 다른 URL(또는 업로드)이라도 바이트와 좌표가 같으면 추론 결과 공유
+        tags, skipped, reused_from, embedding = await _content_flight.do(
+            (inputs["digest"], inputs["gps"], lane, stages, user_places.get(user_id)[1], _flight_owner(user_id)),
+            infer, shareable=lambda shared: not shared[1],
+            timeout=deadline.remaining() if deadline is not None else None, on_join=_leave_face_batch)
+    return _result(url, list(tags), list(skipped), reused_from, embedding)
+
+
+async def _find_near_duplicate(user_id: Optional[str], url: str, inputs: dict, deadline: Deadline):
+    """🔹 (재사용할 근접 중복 항목, 이 이미지로 새로 등록한 항목)
+
+    근접 중복이 아직 계산 중이면 끝날 때까지 기다린다 (같은 일기의 버스트 사진).
+    """
+    if not user_id or settings.PHASH_MAX_DISTANCE <= 0:
+        return None, None
+    entry, reserved = near_duplicate_index.lookup_or_reserve(user_id, inputs["phash"], url)
+    if reserved:
+        CACHE_LOOKUPS.inc(cache="near_duplicate", result="miss")
+        return None, entry
+    try:
+        if await asyncio.wait_for(near_duplicate_index.wait(entry), deadline.remaining()):
+            CACHE_LOOKUPS.inc(cache="near_duplicate", result="hit")
+            return entry, None
+    except asyncio.TimeoutError:
+        pass
+    CACHE_LOOKUPS.inc(cache="near_duplicate", result="miss")
+    return None, None
+
+
+async def _infer(url: str, inputs: dict, on_partial, lane: str, deadline: Deadline, user_id: Optional[str] = None,
+                 requested: Optional[tuple] = None):
+    """🔹 모델 단계 실행 → (태그, 건너뛴 단계, 재사용한 근접 중복 URL, (CLIP 임베딩, 모델 버전) 또는 None)
+
+    모델 단계는 lane의 스케줄러 슬롯을 잡은 동안만 실행한다.
+    deadline이 있으면 남은 시간으로 끝낼 수 없는 단계는 건너뛰고(얼굴 → 지역 순),
+    실행 중 마감을 넘긴 단계는 결과를 버린 뒤 degraded로 표시한다.
+    근접 중복에서 재사용한 단계는 실행하지 않는다.
+    on_partial이 주어지면 태거 하나가 끝날 때마다 (태거 이름, 태그)로 호출된다.
+    requested가 주어지면 그 단계만 실행한다 (픽셀 입력이 없으면 근접 중복 재사용도 하지 않음).
+    """
+    requested = requested or tuple(TAGGER_STAGES)
+    member = _face_member.get()
+    if member is not None:
+        # 근접 중복을 기다리기 전에 등록 (기다리는 원본 이미지가 같은 배치의 완성을 기다리고 있을 수 있음)
+        if "people" in requested and "face" in inputs:
+            member.arrive(url, inputs["face"])
+        else:
+            member.arrive()
+    if "phash" in inputs:
+        reuse, reserved = await _find_near_duplicate(user_id, url, inputs, deadline)
+    else:
+        reuse, reserved = None, None
+    reused = {name: tags for name, tags in reuse.stage_tags.items() if name in requested} if reuse is not None else {}
+    if not reused:
+        reuse = None  # 요청한 단계 중 근접 중복에서 복사할 태그가 없으면 재사용으로 표시하지 않음
+    stage_tags = dict(reused)
+    completed = {}
+    skipped = []
+
+    async def _stage(name, run, workers):
+        started_at = time.monotonic()
+        with span(f"stage.{name}") as stage_span:
+            try:
+                # 마감으로 기다림을 멈춰도 단계 자체는 취소하지 않음 (스레드는 중간에 멈출 수 없음)
+                # → 단계가 끝날 때까지 모델 lease를 쥐고 있고, 스케줄러 슬롯도 그때 반납됨
+                worker = asyncio.ensure_future(run(url, inputs, user_id))
+                workers.append(worker)
+                tags = await asyncio.wait_for(asyncio.shield(worker), deadline.remaining())
+                _record_stage_time(name, time.monotonic() - started_at)
+                completed[name] = tags
+            except asyncio.TimeoutError:
+                skipped.append(name)
+                tags = []
+                if stage_span is not None:
+                    stage_span.set_attribute("skipped", "deadline")
+            except Exception as e:
+                STAGE_ERRORS.inc(stage=name)
+                if stage_span is not None:
+                    stage_span.record_error(e)
+                print(f"⚠️ {name} 태깅 실패: {url}, 오류: {str(e)}")
+                tags = []
+        stage_tags[name] = tags
+        if on_partial is not None:
+            await on_partial(name, tags)
+
+    try:
+        for name, tags in list(stage_tags.items()):
+            NEAR_DUPLICATE_REUSES.inc(stage=name)
+            if on_partial is not None:
+                await on_partial(name, tags)
+
+        async with tagging_scheduler.slot(lane, deadline.remaining()) as workers:
+            stages = {name: run for name, run in TAGGER_STAGES.items() if name in requested and name not in stage_tags}
+            for name in STAGE_SKIP_ORDER:
+                if name in stages and not deadline.allows(_stage_seconds[name] * settings.STAGE_SKIP_SAFETY):
+                    del stages[name]
+                    skipped.append(name)
+            await asyncio.gather(*[_stage(name, run, workers) for name, run in stages.items()])
+    except asyncio.TimeoutError:
+        # 슬롯을 기다리는 동안 마감 시간 초과
+        skipped = [name for name in requested if name not in stage_tags]
+    finally:
+        if reserved is not None:
+            # 실패/취소로 재사용할 단계가 없으면 인덱스에서 제거 → 기다리던 근접 중복은 직접 계산
+            near_duplicate_index.complete(user_id, reserved, completed, inputs.get("embedding"))
+
+    tags = [tag for name in TAGGER_STAGES for tag in stage_tags.get(name, [])]
+    # 장소 태그를 재사용했으면 임베딩도 근접 중복 원본 것을 씀
+    embedding = reuse.embedding if "place" in reused else inputs.get("embedding")
+    return tags, skipped, reuse.image_url if reuse is not None else None, embedding
+
+
+def register_places(user_id: Optional[str], places: Optional[Dict[str, str]]):
+    """🔹 요청의 사용자 장소 목록 등록 (None이면 이전에 등록한 목록 유지, 형식이 틀리거나 user_id가 없으면 ValueError)"""
+    if places is None:
+        return
+    if not user_id:
+        raise ValueError("places는 user_id와 함께 보내야 합니다")
+    user_places.update(user_id, places)
+
+
+def stage_models(stages: Optional[tuple] = None) -> List[str]:
+    """🔹 요청한 단계(없으면 전체)를 실행하는 데 필요한 태거 모델 이름"""
+    return [STAGE_MODELS[name] for name in stages or TAGGER_STAGES]
+
+
+def ensure_taggers_ready(stages: Optional[tuple] = None):
+    """🔹 요청한 단계(없으면 전체)의 태거가 아직 준비되지 않았으면 ModelNotReadyError"""
+    for name in stage_models(stages):
+        model_manager.get(name)
+
+
+async def run_tagging(requested_images: List[Union[str, ImageUpload]], lane: str = settings.DEFAULT_LANE,
+                      deadline: Optional[Deadline] = None, user_id: Optional[str] = None,
+                      stages: Optional[List[str]] = None, embedding: Optional[str] = None) -> List[dict]:
+    """🔹 이미지 다운로드(또는 업로드 바이트) → 장소/지역/인물 태깅 → 이미지별 결과 리스트 (요청 순서 유지)
+
+    태거가 아직 준비되지 않았으면 ModelNotReadyError, 알 수 없는 단계면 ValueError를 그대로 올린다.
+    """
+    stages = resolve_stages(stages)
+    ensure_taggers_ready(stages)
+    tagging_scheduler.lane(lane)
+    # 요청 안의 얼굴은 한 번에 클러스터링 (이미지별로 따로 하면 같은 인물이 요청 안에서 다른 태그가 될 수 있음)
+    faces = FaceBatch(len(requested_images)) if stages is None or "people" in stages else None
+
+    async def _tag(image):
+        # gather가 이미지마다 태스크(컨텍스트 복사)를 만들므로 참여 정보는 이미지별로 따로 보임
+        member = faces.member() if faces is not None else None
+        _face_member.set(member)
+        try:
+            return await tag_image(image, lane=lane, deadline=deadline, user_id=user_id, stages=stages,
+                                   embedding=embedding)
+        finally:
+            if member is not None:
+                member.arrive()  # 얼굴을 등록하지 못하고 끝난 이미지 (다운로드 실패 등)
+
+    return list(await asyncio.gather(*[_tag(image) for image in requested_images]))
+
+
+async def stream_tagging(requested_images: List[Union[str, ImageUpload]], partial: bool = False,
+                         lane: str = settings.DEFAULT_LANE, deadline: Optional[Deadline] = None,
+                         user_id: Optional[str] = None, stages: Optional[List[str]] = None,
+                         embedding: Optional[str] = None) -> AsyncIterator[dict]:
+    """🔹 이미지별 결과를 준비되는 순서대로 이벤트로 내보냄
+
+    - {"event": "partial", "image_url", "tagger", "tags"}  (partial=True일 때 태거별)
+    - {"event": "result", "image_url", "tags"}              (이미지 완료)
+    - {"event": "done", "count"}                             (전체 완료)
+    """
+    stages = resolve_stages(stages)
+    ensure_taggers_ready(stages)
+    tagging_scheduler.lane(lane)
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def _tag(image):
+        async def _on_partial(tagger, tags):
+            await events.put({"event": "partial", "image_url": image_key(image), "tagger": tagger, "tags": tags})
+
+        try:
+            result = await tag_image(image, _on_partial if partial else None, lane, deadline, user_id, stages,
+                                     embedding)
+        except Exception as e:
+            # 예외로 끝난 이미지도 결과 이벤트를 보내야 스트림이 남은 결과를 계속 기다리지 않음
+            print(f"⚠️ 이미지 태깅 실패: {image_key(image)}, 오류: {str(e)}")
+            result = _result(image_key(image), [], [], error=f"태깅 실패: {str(e) or type(e).__name__}")
+            del result["embedding"]
+            if embedding:
+                result["embedding"] = None
+        await events.put({"event": "result", **result})
+
+    tasks = [asyncio.create_task(_tag(image)) for image in requested_images]
+    try:
+        for _ in range(len(tasks)):
+            event = await events.get()
+            while event["event"] == "partial":
+                yield event
+                event = await events.get()
+            yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield {"event": "done", "count": len(requested_images)}
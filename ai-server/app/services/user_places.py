@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.places import vocabulary_version
+
+# ✅ CLIP 텍스트 입력은 77토큰으로 잘리므로 레이블/태그 길이도 제한
+MAX_LABEL_LENGTH = 100
+MAX_TAG_LENGTH = 50
+
+
+def validate_places(places: Dict[str, str], max_labels: int) -> Dict[str, str]:
+    """🔹 사용자 장소 목록({영문 레이블: 태그}) 검증 → 앞뒤 공백을 정리한 목록 (형식이 틀리면 ValueError)"""
+    if len(places) > max_labels:
+        raise ValueError(f"사용자 장소는 최대 {max_labels}개까지 등록할 수 있습니다 ({len(places)}개)")
+    cleaned = {}
+    for label, tag in places.items():
+        label, tag = label.strip(), tag.strip()
+        if not label or not tag:
+            raise ValueError("사용자 장소의 레이블과 태그는 비어 있을 수 없습니다")
+        if len(label) > MAX_LABEL_LENGTH or len(tag) > MAX_TAG_LENGTH:
+            raise ValueError(f"사용자 장소 레이블은 {MAX_LABEL_LENGTH}자, 태그는 {MAX_TAG_LENGTH}자 이하여야 합니다: {label}")
+        cleaned[label] = tag
+    return cleaned
+
+
+class UserPlaces:
+    """🔹 사용자별 추가 장소 목록 (예: {"my living room": "우리집"})
+
+    백엔드가 태깅 요청의 places로 보내면 등록되고, places 없이 온 같은 사용자의 요청에도 계속 쓰인다
+    (빈 목록을 보내면 삭제). 프로세스 메모리에만 두므로 재시작 후에는 다음 요청의 places로 다시 채워진다.
+    """
+
+    def __init__(self, max_users: int, max_labels: int):
+        self.max_users = max_users
+        self.max_labels = max_labels
+        self._users: "OrderedDict[str, Tuple[Dict[str, str], str]]" = OrderedDict()
+
+    def update(self, user_id: str, places: Dict[str, str]) -> Optional[str]:
+        """🔹 목록 등록/교체 → 목록 버전 (빈 목록이면 삭제 후 None)"""
+        places = validate_places(places, self.max_labels)
+        if not places:
+            self._users.pop(user_id, None)
+            return None
+        self._users[user_id] = (places, vocabulary_version(places))
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return self._users[user_id][1]
+
+    def get(self, user_id: Optional[str]) -> Tuple[Optional[Dict[str, str]], Optional[str]]:
+        """🔹 (목록, 버전), 등록된 목록이 없으면 (None, None)"""
+        entry = self._users.get(user_id) if user_id else None
+        if entry is None:
+            return None, None
+        self._users.move_to_end(user_id)
+        return entry
+
+
+# ✅ 전역 사용자 장소 목록 (프로세스 메모리)
+user_places = UserPlaces(settings.USER_PLACES_MAX_USERS, settings.USER_PLACES_MAX_LABELS)
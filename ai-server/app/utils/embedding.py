@@ -0,0 +1,28 @@
+import base64
+from typing import Optional
+
+import numpy as np
+
+# ✅ 응답에 싣는 임베딩 형식 (int8: 벡터별 스케일로 대칭 양자화, 차원당 1바이트)
+EMBEDDING_FORMATS = ("float32", "int8")
+
+
+def encode_embedding(vector: np.ndarray, embedding_model: Optional[str], fmt: str) -> dict:
+    """🔹 정규화된 임베딩 → JSON으로 보낼 수 있는 압축 표현 (data는 little-endian 바이트의 base64)
+
+    int8이면 값 = data * scale. 다른 임베딩 버전끼리는 비교할 수 없으므로 버전(embedding_model)을 함께 싣는다
+    (태그의 model_version과 달리 장소 목록/임계값이 바뀌어도 같음).
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    payload = {"embedding_model": embedding_model, "dtype": fmt, "dim": int(vector.shape[0])}
+    if fmt == "int8":
+        peak = float(np.abs(vector).max()) if vector.size else 0.0
+        scale = peak / 127 if peak > 0 else 1.0
+        data = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8).tobytes()
+        payload["scale"] = scale
+    elif fmt == "float32":
+        data = vector.astype("<f4").tobytes()
+    else:
+        raise ValueError(f"알 수 없는 임베딩 형식: {fmt} (가능: {', '.join(EMBEDDING_FORMATS)})")
+    payload["data"] = base64.b64encode(data).decode("ascii")
+    return payload
@@ -0,0 +1,23 @@
+from typing import Dict, List
+
+# ✅ MindLog 감정 8종 (백엔드 feeling.ALL_EMOTIONS와 같은 순서) → NLI 가설에 넣는 영문 표현
+# 다국어 NLI 모델은 한국어 일기와 영어 가설을 그대로 비교할 수 있고, 영어 가설 쪽이 학습 분포에 가까움
+EMOTIONS = {
+    "기쁨": "joy",
+    "신뢰": "trust",
+    "긴장": "nervousness",
+    "놀람": "surprise",
+    "슬픔": "sadness",
+    "혐오": "disgust",
+    "격노": "anger",
+    "열망": "longing",
+}
+
+HYPOTHESIS_TEMPLATE = "The writer of this diary feels {}."
+
+
+def suggest_emotions(scores: Dict[str, float], threshold: float, limit: int) -> List[str]:
+    """🔹 감정별 확률 → 추천 감정 (threshold 이상을 높은 순으로 최대 limit개, 없으면 최상위 하나)"""
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    suggested = [emotion for emotion in ranked[:limit] if scores[emotion] >= threshold]
+    return suggested or ranked[:1]
@@ -0,0 +1,99 @@
+from io import BytesIO
+from typing import Optional, Tuple
+
+import aiohttp
+import exifread
+
+
+def _to_decimal(values) -> float:
+    """🔹 EXIF (도, 분, 초) 유리수 → 십진 좌표"""
+    return float(values[0]) + float(values[1]) / 60 + float(values[2].num) / float(values[2].den) / 3600
+
+
+def exif_extent(data: bytes) -> Tuple[str, int]:
+    """🔹 JPEG 앞부분에서 EXIF(APP1) 세그먼트 위치 확인 → (상태, 바이트 수)
+
+    - ("complete", n): 앞 n바이트 안에 EXIF 세그먼트 전체가 있음
+    - ("need", n): EXIF 세그먼트 또는 다음 마커를 보려면 앞 n바이트가 필요
+    - ("absent", n): EXIF 없이 n바이트에서 이미지 데이터(APPn/COM 이외 마커)가 시작됨
+    - ("unsupported", 0): JPEG가 아님 (PNG/HEIC 등은 EXIF 위치가 달라 전체를 받아야 함)
+    """
+    if len(data) < 2:
+        return "need", 2
+    if data[:2] != b"\xff\xd8":
+        return "unsupported", 0
+
+    offset = 2
+    while True:
+        if len(data) < offset + 4:
+            return "need", offset + 4
+        if data[offset] != 0xFF:
+            return "absent", offset  # 마커가 아님 (손상된 파일)
+        marker = data[offset + 1]
+        if marker == 0xFF:  # 마커 앞 채움 바이트
+            offset += 1
+            continue
+        if not (0xE0 <= marker <= 0xEF or marker == 0xFE):
+            return "absent", offset  # EXIF는 APPn 구간에만 있음
+
+        end = offset + 2 + int.from_bytes(data[offset + 2:offset + 4], "big")
+        if marker == 0xE1:
+            if len(data) < offset + 10:
+                return "need", offset + 10
+            if data[offset + 4:offset + 10] == b"Exif\x00\x00":
+                return ("complete", end) if len(data) >= end else ("need", end)
+        offset = end
+
+
+async def read_exif_segment(session: aiohttp.ClientSession, url: str, initial_bytes: int, max_bytes: int,
+                            headers: Optional[dict] = None) -> Tuple[bytes, bool]:
+    """🔹 Range 요청으로 JPEG 앞부분을 EXIF(APP1) 세그먼트 끝까지 받음 → (바이트, 파일 전체인지)
+
+    처음에는 initial_bytes만 받고, 부족하면 필요한 만큼(최소 두 배) 범위를 늘려 이어 받는다 (max_bytes까지).
+    서버가 Range를 무시하고 200으로 전체를 보내면 그대로 쓰고, JPEG가 아니면 EXIF 위치를 알 수 없으므로
+    전체를 다시 받는다. 오류 응답이면 aiohttp.ClientResponseError.
+    """
+    headers = headers or {}
+    data = b""
+    want = initial_bytes
+    while True:
+        async with session.get(url, headers={**headers, "Range": f"bytes={len(data)}-{want - 1}"}) as response:
+            if response.status == 416:  # 요청 범위가 파일 끝을 넘음
+                break
+            response.raise_for_status()
+            chunk = await response.read()
+        if response.status == 200:
+            return chunk, True
+
+        data += chunk
+        status, needed = exif_extent(data)
+        if status != "need" or len(data) < want or needed > max_bytes:
+            break  # EXIF 구간 확보 / EXIF 없음 / 파일 끝 / 상한 초과
+        want = max(needed, len(data) * 2)
+
+    if exif_extent(data)[0] == "unsupported":
+        async with session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            return await response.read(), True
+    return data, False
+
+
+def read_gps(image_bytes: bytes) -> Tuple[Optional[float], Optional[float]]:
+    """🔹 이미지 바이트의 EXIF에서 (위도, 경도) 추출 (없거나 읽을 수 없으면 (None, None))"""
+    try:
+        tags = exifread.process_file(BytesIO(image_bytes), details=False)
+    except Exception:
+        return None, None
+    if 'GPS GPSLatitude' not in tags or 'GPS GPSLongitude' not in tags:
+        return None, None
+
+    try:
+        lat = _to_decimal(tags['GPS GPSLatitude'].values)
+        lon = _to_decimal(tags['GPS GPSLongitude'].values)
+    except (IndexError, TypeError, ZeroDivisionError, AttributeError):
+        return None, None
+    lat_ref = tags.get('GPS GPSLatitudeRef')
+    lon_ref = tags.get('GPS GPSLongitudeRef')
+    if lat_ref is not None and lat_ref.values != 'N': lat = -lat
+    if lon_ref is not None and lon_ref.values != 'E': lon = -lon
+    return lat, lon
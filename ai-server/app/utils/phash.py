@@ -0,0 +1,18 @@
+from PIL import Image
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """🔹 difference hash (64비트): 축소한 흑백 이미지에서 가로로 인접한 픽셀의 밝기 비교"""
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    """🔹 두 해시의 해밍 거리"""
+    return bin(a ^ b).count("1")
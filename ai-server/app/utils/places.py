@@ -1,3 +1,7 @@
+import hashlib
+import json
+from typing import Dict, Optional, Tuple
+
 places = {
     "airfield": "비행장",
     "airplane cabin": "비행기",
@@ -198,4 +202,22 @@ places = {
     "sea": "바다",
     "concert hall": "콘서트홀",
     "temple": "사원"
-}
\ No newline at end of file
+}
+
+
+def vocabulary_version(vocabulary: Dict[str, str]) -> str:
+    """🔹 장소 목록 내용 해시 (같은 목록이면 같은 버전)"""
+    encoded = json.dumps(vocabulary, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:8]
+
+
+def load_vocabulary(path: Optional[str] = None) -> Tuple[Dict[str, str], str]:
+    """🔹 장소 목록 JSON 파일 로드 → (목록, 버전), 경로가 없으면 내장 목록"""
+    if not path:
+        return places, vocabulary_version(places)
+    with open(path, encoding="utf-8") as f:
+        vocabulary = json.load(f)
+    if not isinstance(vocabulary, dict) or not vocabulary \
+            or not all(isinstance(k, str) and isinstance(v, str) for k, v in vocabulary.items()):
+        raise ValueError(f"장소 목록은 {{영문 레이블: 태그}} 형식의 비어 있지 않은 JSON 객체여야 합니다: {path}")
+    return vocabulary, vocabulary_version(vocabulary)
@@ -0,0 +1,311 @@
+"""🔹 태거 패밀리별 프로세스 격리
+
+TensorFlow(DeepFace)와 PyTorch(CLIP)를 한 인터프리터에 올리면 스레드 풀과 GIL을
+두고 경쟁하고, TF 쪽 크래시/메모리 누수가 장소 태깅까지 함께 죽인다.
+`IsolatedTagger`는 태거 하나를 spawn 된 전용 프로세스에서 실행하고, 로컬 태거와
+같은 메서드(predict_places / process_faces / warmup)를 파이프 기반 IPC로 제공한다.
+이미지 픽셀은 공유 메모리 한 블록에 담아 넘기므로 파이프로는 메타데이터만 오간다.
+요청마다 ID를 붙여 보내고 응답은 읽기 스레드가 ID로 돌려주므로, 여러 요청이 동시에 자식에서
+처리된다 (자식은 요청을 스레드 풀에서 실행 → 장소 태거의 배치 추론이 요청 사이에서도 묶임).
+"""
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager, nullcontext
+from multiprocessing import shared_memory
+from typing import Dict
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import settings
+from app.core.metrics import registry, rss_bytes
+from app.core import tracing
+
+logger = logging.getLogger(__name__)
+
+# ✅ 태거 패밀리 → (모듈, 클래스, 프로세스 스레드 설정 이름)
+TAGGER_FAMILIES = {
+    "place": ("app.models.place_tag", "PlaceTagger", "PLACE_PROCESS_THREADS"),
+    "companion": ("app.models.companion_tag", "CompanionTagger", "FACE_PROCESS_THREADS"),
+}
+
+
+class TaggerProcessError(RuntimeError):
+    """🔹 태거 프로세스 호출 실패 (프로세스 종료, 타임아웃, 태거 내부 예외)"""
+
+
+def _write_images(image_data_dict: Dict[str, Image.Image]):
+    """🔹 이미지들을 RGB uint8 배열로 공유 메모리 한 블록에 기록"""
+    arrays = {}
+    for key, image in image_data_dict.items():
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        arrays[key] = np.asarray(image)
+
+    total = sum(array.nbytes for array in arrays.values())
+    if total == 0:
+        return None, []
+
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    layout = []
+    offset = 0
+    for key, array in arrays.items():
+        view = np.ndarray(array.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        view[...] = array
+        layout.append((key, offset, array.shape))
+        offset += array.nbytes
+    del view
+    return shm, layout
+
+
+@contextmanager
+def _shared_images(shm_name: str, layout):
+    """🔹 공유 메모리의 이미지를 복사 없이 PIL 이미지로 (자식 프로세스, 블록은 추론이 끝나 with를 벗어날 때 닫음)"""
+    if not shm_name:
+        yield {}
+        return
+
+    # spawn 된 자식은 부모의 resource tracker를 공유하므로 unlink는 부모에게 맡긴다
+    shm = shared_memory.SharedMemory(name=shm_name)
+    images = {}
+    try:
+        for key, offset, shape in layout:
+            height, width = shape[:2]
+            images[key] = Image.frombuffer("RGB", (width, height), shm.buf[offset:offset + height * width * 3],
+                                           "raw", "RGB", 0, 1)
+        yield images
+    finally:
+        images.clear()
+        try:
+            shm.close()
+        except BufferError:
+            # 태거가 아직 이미지를 참조 중 → 블록 매핑은 참조가 사라질 때 해제됨 (unlink는 부모가 이미 처리)
+            logger.warning("⚠️ 공유 메모리 이미지 참조가 남아 블록을 바로 닫지 못함")
+
+
+def _worker_main(family: str, module_name: str, class_name: str, conn, num_threads: int, options: dict):
+    """🔹 태거 프로세스 진입점: 스레드 예산 적용 → 모델 로드(options는 태거 생성 인자) → 요청 루프
+
+    요청은 (요청 ID, 메서드, 공유 메모리 이름, 레이아웃, 인자, traceparent), 응답은 (요청 ID, 상태, 결과, 메트릭).
+    요청을 스레드 풀에서 동시에 처리하고 끝나는 순서대로 응답한다.
+    """
+    from app.core import threads
+
+    if num_threads > 0:
+        settings.WORKER_THREADS = num_threads
+    threads.apply_thread_env(override=True)
+
+    try:
+        module = __import__(module_name, fromlist=[class_name])
+        tagger = getattr(module, class_name)(**options)
+        threads.configure_torch_threads()
+    except Exception as e:
+        conn.send(("error", f"{class_name} 로드 실패: {e}"))
+        return
+    conn.send(("ready", (os.getpid(), getattr(tagger, "version", None), getattr(tagger, "embedding_version", None))))
+
+    send_lock = threading.Lock()
+
+    def _reply(request_id, status, payload):
+        # 태거 내부 단계 메트릭은 응답에 실어 부모의 /metrics에 합침
+        with send_lock:
+            conn.send((request_id, status, payload, registry.drain()))
+
+    def _handle(request_id, method, shm_name, layout, kwargs, traceparent):
+        try:
+            if method == "warmup":
+                tagger.warmup()
+                _reply(request_id, "ok", None)
+                return
+            # 호출한 API 요청의 trace를 이어받아 태거 내부 단계도 같은 trace에 기록
+            trace = tracing.start_trace(f"{family}.{method}", traceparent) if traceparent else nullcontext()
+            with trace, _shared_images(shm_name, layout) as images:
+                # layout이 None이면 이미지 없이 호출하는 메서드 (encode_text 등)
+                args = () if layout is None else (images,)
+                result = getattr(tagger, method)(*args, **kwargs)
+            _reply(request_id, "ok", result)
+        except Exception as e:
+            logger.error(f"❌ {family} 태거 처리 실패: {e}", exc_info=True)
+            _reply(request_id, "error", str(e))
+
+    # 부모의 동시 호출 수는 스케줄러 슬롯(TAGGING_CONCURRENCY)을 넘지 않음
+    executor = ThreadPoolExecutor(max_workers=max(1, settings.TAGGING_CONCURRENCY), thread_name_prefix=f"{family}-call")
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            executor.shutdown(wait=False)
+            return
+        executor.submit(_handle, *request)
+
+
+class IsolatedTagger:
+    """🔹 전용 프로세스에서 동작하는 태거 프록시 (죽으면 독립적으로 재시작)"""
+
+    def __init__(self, family: str, **options):
+        self.family = family
+        self.options = options  # 태거 생성 인자 (재시작해도 같은 버전으로 로드)
+        self.version = None
+        self.embedding_version = None  # 장소 태거의 이미지 임베딩 버전 (태깅 버전과 별개)
+        self._lock = threading.Lock()  # 프로세스 시작/교체와 요청 보내기만 직렬화 (응답 대기는 잠그지 않음)
+        self._process = None
+        self._conn = None
+        self._closed = False
+        self._ids = itertools.count()
+        self._pending: Dict[int, tuple] = {}  # 요청 ID → (보낸 연결, 응답 future)
+        self._start()
+
+    def _thread_budget(self) -> int:
+        return getattr(settings, TAGGER_FAMILIES[self.family][2])
+
+    def _start(self):
+        ctx = mp.get_context("spawn")  # 부모의 torch/TF 상태를 물려받지 않도록 spawn 사용
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=_worker_main,
+            args=(self.family, *TAGGER_FAMILIES[self.family][:2], child_conn, self._thread_budget(), self.options),
+            name=f"{self.family}-tagger",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        try:
+            if not parent_conn.poll(settings.TAGGER_START_TIMEOUT):
+                raise TaggerProcessError(f"{self.family} 태거 프로세스 시작 시간 초과")
+            status, payload = parent_conn.recv()
+        except EOFError:
+            status, payload = "error", "프로세스가 준비 전에 종료됨"
+        except TaggerProcessError:
+            process.terminate()
+            raise
+        if status != "ready":
+            process.join(timeout=5)
+            raise TaggerProcessError(f"{self.family} 태거 프로세스 시작 실패: {payload}")
+
+        pid, self.version, self.embedding_version = payload
+        self._process, self._conn = process, parent_conn
+        threading.Thread(target=self._read_replies, args=(parent_conn,), name=f"{self.family}-tagger-reader",
+                         daemon=True).start()
+        logger.info(f"✅ {self.family} 태거 프로세스 시작 (pid: {pid})")
+
+    def _stop(self):
+        # 연결은 읽기 스레드가 EOF를 받은 뒤 닫음 (읽는 중인 연결을 다른 스레드에서 닫지 않도록)
+        if self._process is not None and self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join(timeout=5)
+        self._process, self._conn = None, None
+
+    def _read_replies(self, conn):
+        """🔹 응답을 요청 ID의 future로 전달 (연결이 끊기면 그 연결로 보낸 요청을 모두 실패 처리)"""
+        while True:
+            try:
+                request_id, status, payload, metrics = conn.recv()
+            except (EOFError, OSError):
+                break
+            registry.merge(metrics)
+            with self._lock:
+                _, future = self._pending.pop(request_id, (None, None))
+            if future is not None:
+                future.set_result((status, payload))
+        conn.close()
+        self._fail(conn, "프로세스 연결이 끊김")
+
+    def _fail(self, conn, reason: str):
+        """🔹 conn의 프로세스가 죽었거나 멈춤 → 그 연결로 보낸 요청을 실패 처리하고 백그라운드에서 재시작"""
+        with self._lock:
+            failed = [request_id for request_id, (sent_on, _) in self._pending.items() if sent_on is conn]
+            futures = [self._pending.pop(request_id)[1] for request_id in failed]
+            current = conn is self._conn
+            if current:
+                self._stop()
+        for future in futures:
+            if not future.done():
+                future.set_exception(TaggerProcessError(f"{self.family} 태거 프로세스 호출 실패: {reason}"))
+        if current and not self._closed:
+            self._restart_in_background()
+
+    def _restart_in_background(self):
+        def _restart():
+            with self._lock:
+                if self._process is not None or self._closed:
+                    return
+                try:
+                    self._start()
+                except Exception as e:
+                    logger.error(f"❌ {self.family} 태거 프로세스 재시작 실패: {e}")
+
+        threading.Thread(target=_restart, name=f"{self.family}-tagger-restart", daemon=True).start()
+
+    def _call(self, method: str, image_data_dict=None, **kwargs):
+        shm, layout = _write_images(image_data_dict) if image_data_dict is not None else (None, None)
+        future = Future()
+        try:
+            with self._lock:
+                if self._closed:
+                    raise TaggerProcessError(f"{self.family} 태거가 교체되어 종료되었습니다")
+                if self._process is None or not self._process.is_alive():
+                    logger.warning(f"⚠️ {self.family} 태거 프로세스 없음 → 재시작")
+                    self._stop()
+                    self._start()
+                conn, request_id = self._conn, next(self._ids)
+                self._pending[request_id] = (conn, future)
+                try:
+                    conn.send((request_id, method, shm.name if shm else None, layout, kwargs,
+                               tracing.current_traceparent()))
+                except OSError as e:
+                    self._pending.pop(request_id, None)
+                    send_error = e
+                else:
+                    send_error = None
+            if send_error is not None:
+                self._fail(conn, f"{type(send_error).__name__} {send_error}")
+                raise TaggerProcessError(f"{self.family} 태거 프로세스 호출 실패: {send_error}")
+
+            try:
+                status, payload = future.result(timeout=settings.TAGGER_CALL_TIMEOUT)
+            except FutureTimeoutError:
+                # 멈춘 프로세스 → 정리 후 백그라운드에서 재시작 (같은 프로세스로 보낸 다른 요청도 실패)
+                self._fail(conn, f"{settings.TAGGER_CALL_TIMEOUT}초 내 응답 없음")
+                raise TaggerProcessError(f"{self.family} 태거 프로세스 호출 실패: "
+                                         f"{settings.TAGGER_CALL_TIMEOUT}초 내 응답 없음")
+        finally:
+            # 자식은 추론이 끝난 뒤 응답하므로 응답을 받은 뒤(또는 실패 후)에 블록 삭제
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        if status != "ok":
+            raise TaggerProcessError(payload)
+        return payload
+
+    def close(self):
+        """🔹 태거 프로세스 종료 (모델 교체 후 이전 버전 정리, 이후 재시작하지 않음)"""
+        with self._lock:
+            self._closed = True
+            self._stop()
+
+    def memory_bytes(self):
+        """🔹 태거 프로세스 상주 메모리"""
+        process = self._process
+        return rss_bytes(process.pid) if process is not None and process.is_alive() else None
+
+    def warmup(self):
+        return self._call("warmup")
+
+    def predict_places(self, image_data_dict: Dict[str, Image.Image], **kwargs) -> dict:
+        return self._call("predict_places", image_data_dict, **kwargs)
+
+    def process_faces(self, image_data_dict: Dict[str, Image.Image], **kwargs):
+        return self._call("process_faces", image_data_dict, **kwargs)
+
+    def encode_text(self, texts: list):
+        return self._call("encode_text", texts=texts)
@@ -0,0 +1,18 @@
+"""🔹 AI 서버 처리량 벤치마크
+
+고정 시드로 만든 합성 이미지 코퍼스(크기 3종 × 얼굴 유무 × GPS EXIF 유무)로
+태거(장소/인물/지역)와 `/ai/generate-tags` 전체 경로를 동시성 단계별로 측정한다.
+감정 분류(emotion)는 고정 시드로 만든 합성 일기 텍스트로 측정한다.
+지역 태깅은 외부 Nominatim 대신 로컬 역지오코더 대역 서버를 사용하므로 네트워크와 무관하다.
+
+    cd ai-server
+    python -m benchmarks                                  # 전체 스위트, 기준선과 비교
+    python -m benchmarks --suites place,route --concurrency 1,4,8
+    python -m benchmarks --update-baseline                # 현재 결과를 기준선으로 저장
+    python -m benchmarks --face-source ~/lfw_sample       # 실제 얼굴 사진을 합성해 인물 태깅 측정
+    python -m benchmarks --suites emotion --concurrency 1,8,32   # CPU 감정 분류 처리량 (동적 배치 효과)
+
+결과는 단계별 p50/p95/p99 지연, 초당 이미지 수, 최대 RSS(태거 프로세스 포함)이며,
+기준선보다 허용 범위 이상 나빠지면 종료 코드 1로 끝난다. 기준선은 측정한 머신에서만 의미가 있으므로
+저장소에는 포함하지 않고 `--update-baseline`으로 만든다.
+"""
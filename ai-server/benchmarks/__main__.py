@@ -0,0 +1,171 @@
+"""🔹 python -m benchmarks 실행 진입점 (ai-server 디렉토리에서 실행)"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import prepare_corpus
+from benchmarks.report import compare, environment, format_table
+from benchmarks.servers import serve_directory, start_geocoder
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SUITES = ("place", "faces", "location", "route", "emotion")
+
+
+def _int_list(value: str):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="MindLog AI 서버 처리량 벤치마크")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"실행할 스위트 ({', '.join(SUITES)})")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 2, 4, 8], help="동시성 단계 (예: 1,4,8)")
+    parser.add_argument("--rounds", type=int, default=2, help="단계마다 코퍼스를 반복하는 횟수")
+    parser.add_argument("--images-per-request", type=int, default=1, help="호출/요청당 이미지 수 (emotion 스위트는 텍스트 수)")
+
+    corpus = parser.add_argument_group("코퍼스")
+    corpus.add_argument("--corpus", default=os.path.join(BENCH_DIR, "corpus"),
+                        help="코퍼스 디렉토리 (manifest.json 없는 이미지 디렉토리도 그대로 사용)")
+    corpus.add_argument("--seed", type=int, default=1234)
+    corpus.add_argument("--per-combo", type=int, default=2, help="크기 × 얼굴 × GPS 조합마다 생성할 이미지 수")
+    corpus.add_argument("--face-source", help="합성에 쓸 얼굴 사진 디렉토리 (없으면 도식 얼굴)")
+    corpus.add_argument("--regenerate", action="store_true", help="코퍼스를 다시 생성")
+
+    network = parser.add_argument_group("로컬 서버")
+    network.add_argument("--geocode-latency-ms", type=float, default=50.0, help="역지오코더 대역 서버의 응답 지연")
+    network.add_argument("--geocode-interval", type=float, default=0.0,
+                         help="요청 사이 대기 (운영 기본값 1.0초는 Nominatim 정책용이므로 기본적으로 제외)")
+    network.add_argument("--host", default="127.0.0.1", help="코퍼스/지오코더 서버 바인드 주소")
+    network.add_argument("--route-input", choices=("url", "bytes"), default="url",
+                         help="route 스위트 입력 (url: 서버가 이미지를 다운로드, bytes: multipart 업로드)")
+    network.add_argument("--server-url", help="route 스위트를 실행 중인 서버로 보냄 (서버가 --host에 접근 가능해야 함)")
+
+    output = parser.add_argument_group("결과")
+    output.add_argument("--output", help="결과 JSON 저장 경로")
+    output.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    output.add_argument("--update-baseline", action="store_true", help="현재 결과를 기준선으로 저장")
+    output.add_argument("--tolerance", type=float, default=0.15, help="지연/처리량 허용 변화율")
+    output.add_argument("--rss-tolerance", type=float, default=0.10, help="최대 RSS 허용 증가율")
+    output.add_argument("--workdir", help="얼굴 DB/트레이스/작업 저장소 위치 (기본: 임시 디렉토리)")
+
+    args = parser.parse_args(argv)
+    args.suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        parser.error(f"알 수 없는 스위트: {', '.join(sorted(unknown))}")
+    return args
+
+
+def _configure_environment(workdir: str, geocoder_url: str, geocode_interval: float):
+    """🔹 app 설정을 import 하기 전에 운영 데이터와 외부 API를 벤치마크용으로 바꿔 둠"""
+    os.environ["FACE_DATABASE_PATH"] = os.path.join(workdir, "face_database.json")
+    os.environ["FACE_IMAGE_DIR"] = os.path.join(workdir, "faces")
+    os.environ["NOMINATIM_URL"] = f"{geocoder_url}/reverse"
+    os.environ["GEOCODE_MIN_INTERVAL"] = str(geocode_interval)
+    os.environ["JOB_STORE_PATH"] = os.path.join(workdir, "jobs.sqlite3")
+    os.environ["TRACE_EXPORT_PATH"] = os.path.join(workdir, "traces.jsonl")
+    os.environ["PROFILE_DIR"] = os.path.join(workdir, "profiles")
+
+
+def _server_settings() -> dict:
+    from app.core.config import settings
+
+    return {
+        "isolate_taggers": settings.ISOLATE_TAGGERS,
+        "worker_threads": settings.WORKER_THREADS,
+        "tagging_concurrency": settings.TAGGING_CONCURRENCY,
+        "interactive_concurrency": settings.TAGGING_LANES["interactive"]["max_concurrency"],
+        "model_warmup": settings.MODEL_WARMUP,
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="mindlog-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    print(f"📦 코퍼스 준비: {args.corpus}")
+    manifest = prepare_corpus(args.corpus, args.seed, args.per_combo, args.face_source, args.regenerate)
+    print(f"✅ 이미지 {len(manifest['images'])}장 (digest {manifest['digest']}, 얼굴: {manifest['face_source']})")
+
+    image_server = serve_directory(os.path.abspath(args.corpus), args.host)
+    geocoder = start_geocoder(args.geocode_latency_ms, args.host)
+    _configure_environment(workdir, geocoder.url, args.geocode_interval)
+
+    from benchmarks import runners
+
+    results = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "corpus": {"digest": manifest["digest"], "images": len(manifest["images"]), "face_source": manifest["face_source"]},
+        "environment": environment(),
+        "settings": {
+            "concurrency": args.concurrency,
+            "rounds": args.rounds,
+            "images_per_request": args.images_per_request,
+            "geocode_latency_ms": args.geocode_latency_ms,
+            "geocode_interval": args.geocode_interval,
+            "route_target": args.server_url or "in-process",
+            "route_input": args.route_input,
+            "server": _server_settings(),
+        },
+        "suites": {},
+    }
+
+    try:
+        for suite in args.suites:
+            print(f"\n🚀 {suite} 스위트")
+            if suite == "place":
+                result = runners.bench_place(args.corpus, manifest, args.concurrency, args.rounds, args.images_per_request)
+            elif suite == "faces":
+                result = runners.bench_faces(args.corpus, manifest, args.concurrency, args.rounds, args.images_per_request)
+            elif suite == "emotion":
+                result = runners.bench_emotion(args.seed, args.concurrency, args.rounds, args.images_per_request)
+            elif suite == "location":
+                result = runners.bench_location(image_server.url, manifest, args.concurrency, args.rounds, args.images_per_request)
+            else:
+                result = runners.bench_route(image_server.url, args.corpus, manifest, args.concurrency, args.rounds,
+                                             args.images_per_request, args.server_url, args.route_input)
+            results["suites"][suite] = result
+    finally:
+        image_server.close()
+        geocoder.close()
+
+    print("\n" + format_table(results))
+    for suite, levels in results["suites"].items():
+        for level, summary in levels.items():
+            if summary.get("faces_in_corpus") and not summary.get("people_tagged"):
+                print(f"⚠️ {suite} c={level}: 코퍼스 얼굴이 검출되지 않음 → --face-source로 실제 얼굴 사진을 지정하세요")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"💾 기준선 갱신: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️ 기준선 없음 ({args.baseline}) → --update-baseline으로 생성")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions, warnings = compare(results, baseline, args.tolerance, args.rss_tolerance)
+    for warning in warnings:
+        print(f"⚠️ {warning}")
+    if regressions:
+        print("❌ 기준선 대비 성능 저하:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("✅ 기준선 대비 성능 저하 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""🔹 벤치마크용 이미지 코퍼스 (고정 시드 합성 또는 기존 디렉토리 로드)"""
+import hashlib
+import json
+import os
+import random
+from typing import List, Optional
+
+import numpy as np
+import piexif
+from PIL import Image, ImageDraw, ImageFilter
+
+MANIFEST = "manifest.json"
+CORPUS_VERSION = 1
+
+# ✅ 휴대폰 썸네일 ~ 원본(12MP) 크기
+SIZES = [(640, 480), (1600, 1200), (4032, 3024)]
+
+# ✅ GPS EXIF에 넣을 좌표 (로컬 역지오코더가 같은 표로 주소를 돌려줌)
+LOCATIONS = [
+    (37.5009, 127.0364, "역삼동"),
+    (37.5704, 126.9831, "종로1·2·3·4가동"),
+    (35.1631, 129.1636, "우동"),
+    (33.5007, 126.5297, "이도이동"),
+]
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def _to_rational(value: float):
+    """🔹 십진 좌표 → EXIF 도/분/초 유리수"""
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round(((value - degrees) * 60 - minutes) * 60 * 10000)
+    return (degrees, 1), (minutes, 1), (seconds, 10000)
+
+
+def gps_exif(lat: float, lon: float) -> bytes:
+    return piexif.dump({
+        "0th": {piexif.ImageIFD.Make: b"MindLogBench"},
+        "Exif": {piexif.ExifIFD.DateTimeOriginal: b"2024:05:01 12:00:00"},
+        "GPS": {
+            piexif.GPSIFD.GPSLatitudeRef: b"N" if lat >= 0 else b"S",
+            piexif.GPSIFD.GPSLatitude: _to_rational(lat),
+            piexif.GPSIFD.GPSLongitudeRef: b"E" if lon >= 0 else b"W",
+            piexif.GPSIFD.GPSLongitude: _to_rational(lon),
+        },
+    })
+
+
+def _scene(rng: random.Random, size) -> Image.Image:
+    """🔹 그라디언트 + 도형 + 노이즈 배경 (JPEG 크기/디코딩 비용이 실제 사진과 비슷하도록 노이즈 포함)"""
+    width, height = size
+    np_rng = np.random.default_rng(rng.randrange(2 ** 32))
+    top, bottom = np_rng.integers(0, 256, 3), np_rng.integers(0, 256, 3)
+    ramp = np.linspace(0.0, 1.0, height)[:, None, None]
+    gradient = np.broadcast_to(top * (1 - ramp) + bottom * ramp, (height, width, 3))
+    image = Image.fromarray(gradient.astype(np.uint8), "RGB")
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(rng.randint(4, 10)):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(width // 8, width // 2), y0 + rng.randrange(height // 8, height // 2)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        (draw.rectangle if rng.random() < 0.5 else draw.ellipse)((x0, y0, x1, y1), fill=color)
+    image = image.filter(ImageFilter.GaussianBlur(radius=max(1, width // 800)))
+
+    pixels = np.asarray(image, dtype=np.int16) + np_rng.integers(-24, 25, (height, width, 3), dtype=np.int16)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+
+
+def _schematic_face(size: int) -> Image.Image:
+    """🔹 얼굴 사진이 없을 때 쓰는 도식 얼굴 (검출기가 못 찾을 수 있으므로 결과에 검출 수를 따로 보고)"""
+    face = Image.new("RGBA", (size, int(size * 1.25)), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(face)
+    w, h = face.size
+    draw.ellipse((0, 0, w, h), fill=(224, 182, 150, 255))
+    for cx in (0.32, 0.68):
+        draw.ellipse((w * cx - w * 0.08, h * 0.36, w * cx + w * 0.08, h * 0.46), fill=(255, 255, 255, 255))
+        draw.ellipse((w * cx - w * 0.035, h * 0.38, w * cx + w * 0.035, h * 0.44), fill=(40, 30, 25, 255))
+        draw.line((w * cx - w * 0.1, h * 0.31, w * cx + w * 0.1, h * 0.3), fill=(70, 50, 40, 255), width=max(2, w // 40))
+    draw.polygon([(w * 0.5, h * 0.45), (w * 0.44, h * 0.62), (w * 0.56, h * 0.62)], fill=(205, 160, 130, 255))
+    draw.arc((w * 0.32, h * 0.62, w * 0.68, h * 0.8), 20, 160, fill=(150, 60, 60, 255), width=max(2, w // 30))
+    return face
+
+
+def _face_sources(face_source: Optional[str]) -> List[str]:
+    if not face_source:
+        return []
+    return sorted(
+        os.path.join(face_source, name) for name in os.listdir(face_source)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+
+def _paste_faces(rng: random.Random, image: Image.Image, count: int, sources: List[str]):
+    width, height = image.size
+    slot_width = width // count
+    for i in range(count):
+        face_width = int(min(slot_width * 0.7, height * 0.45))
+        if sources:
+            face = Image.open(sources[rng.randrange(len(sources))]).convert("RGB")
+            face = face.resize((face_width, int(face_width * face.height / face.width)))
+            mask = None
+        else:
+            face = _schematic_face(face_width)
+            mask = face
+        x = i * slot_width + (slot_width - face.width) // 2
+        y = max(0, (height - face.height) // 2 + rng.randrange(-height // 10, height // 10 + 1))
+        image.paste(face, (x, y), mask)
+
+
+def _digest(entries) -> str:
+    return hashlib.sha256("".join(entry["sha256"] for entry in entries).encode()).hexdigest()[:16]
+
+
+def generate_corpus(directory: str, seed: int = 1234, per_combo: int = 2, face_source: Optional[str] = None) -> dict:
+    """🔹 크기 × 얼굴 유무 × GPS 유무 조합마다 per_combo장씩 생성하고 manifest.json 기록"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    sources = _face_sources(face_source)
+    entries = []
+    for width, height in SIZES:
+        for faces in (0, 1):
+            for with_gps in (False, True):
+                for n in range(per_combo):
+                    face_count = rng.randint(1, 3) if faces else 0
+                    image = _scene(rng, (width, height))
+                    if face_count:
+                        _paste_faces(rng, image, face_count, sources)
+                    lat, lon, region = LOCATIONS[rng.randrange(len(LOCATIONS))] if with_gps else (None, None, None)
+
+                    name = f"{width}x{height}_{'face' if faces else 'scene'}_{'gps' if with_gps else 'nogps'}_{n}.jpg"
+                    path = os.path.join(directory, name)
+                    save_kwargs = {"quality": 90}
+                    if with_gps:
+                        save_kwargs["exif"] = gps_exif(lat, lon)
+                    image.save(path, "JPEG", **save_kwargs)
+
+                    with open(path, "rb") as f:
+                        data = f.read()
+                    entries.append({
+                        "file": name,
+                        "width": width,
+                        "height": height,
+                        "faces": face_count,
+                        "gps": [lat, lon] if with_gps else None,
+                        "region": region,
+                        "bytes": len(data),
+                        "sha256": hashlib.sha256(data).hexdigest(),
+                    })
+
+    manifest = {
+        "version": CORPUS_VERSION,
+        "seed": seed,
+        "per_combo": per_combo,
+        "face_source": "photos" if sources else "schematic",
+        "digest": _digest(entries),
+        "images": entries,
+    }
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _read_gps(path: str):
+    try:
+        gps = piexif.load(path).get("GPS") or {}
+    except Exception:
+        return None
+    if piexif.GPSIFD.GPSLatitude not in gps or piexif.GPSIFD.GPSLongitude not in gps:
+        return None
+
+    def _decimal(values, ref, negative):
+        value = sum(num / den / 60 ** i for i, (num, den) in enumerate(values))
+        return -value if ref == negative else value
+
+    return [
+        _decimal(gps[piexif.GPSIFD.GPSLatitude], gps.get(piexif.GPSIFD.GPSLatitudeRef), b"S"),
+        _decimal(gps[piexif.GPSIFD.GPSLongitude], gps.get(piexif.GPSIFD.GPSLongitudeRef), b"W"),
+    ]
+
+
+def load_corpus(directory: str) -> dict:
+    """🔹 manifest.json이 있으면 그대로, 없으면 디렉토리의 이미지를 훑어 manifest 구성 (얼굴 수는 알 수 없음)"""
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        path = os.path.join(directory, name)
+        with open(path, "rb") as f:
+            data = f.read()
+        with Image.open(path) as image:
+            width, height = image.size
+        entries.append({
+            "file": name,
+            "width": width,
+            "height": height,
+            "faces": None,
+            "gps": _read_gps(path),
+            "region": None,
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+    if not entries:
+        raise FileNotFoundError(f"{directory}에 이미지가 없습니다")
+    return {"version": None, "seed": None, "face_source": "external", "digest": _digest(entries), "images": entries}
+
+
+def prepare_corpus(directory: str, seed: int, per_combo: int, face_source: Optional[str], regenerate: bool) -> dict:
+    """🔹 같은 설정으로 만든 코퍼스(또는 manifest 없는 외부 이미지 디렉토리)가 있으면 재사용, 아니면 생성"""
+    if not regenerate and os.path.isdir(directory):
+        try:
+            manifest = load_corpus(directory)
+        except FileNotFoundError:
+            manifest = None
+        expected = (CORPUS_VERSION, seed, per_combo, "photos" if _face_sources(face_source) else "schematic")
+        if manifest is not None and (
+            manifest.get("version") is None
+            or (manifest["version"], manifest["seed"], manifest.get("per_combo"), manifest["face_source"]) == expected
+        ):
+            return manifest
+    return generate_corpus(directory, seed, per_combo, face_source)
+
+
+# ✅ 감정 분류용 합성 일기 문장 조각 (문장 수를 바꿔 짧은 메모 ~ 긴 일기 길이를 섞음)
+DIARY_OPENINGS = ["오늘은", "아침부터", "퇴근길에", "주말에", "오랜만에", "비 오는 날"]
+DIARY_EVENTS = [
+    "친구와 한강에서 자전거를 탔다", "회사에서 발표를 했다", "가족과 저녁을 먹었다", "혼자 카페에서 책을 읽었다",
+    "시험 결과가 나왔다", "길에서 지갑을 잃어버렸다", "오래 기다린 택배가 도착했다", "병원에 다녀왔다",
+]
+DIARY_FEELINGS = [
+    "정말 행복했다", "마음이 조금 무거웠다", "긴장해서 손이 떨렸다", "생각보다 훨씬 놀라웠다",
+    "다시는 겪고 싶지 않다", "너무 화가 나서 잠이 오지 않았다", "다음 여행이 벌써 기다려진다", "그 사람을 믿어도 될 것 같다",
+]
+
+
+def diary_texts(seed: int, count: int) -> List[str]:
+    """🔹 고정 시드로 1~12문장짜리 합성 일기 텍스트 count개 생성"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        sentences = [f"{rng.choice(DIARY_OPENINGS)} {rng.choice(DIARY_EVENTS)}. {rng.choice(DIARY_FEELINGS)}."
+                     for _ in range(rng.randint(1, 12))]
+        texts.append(" ".join(sentences))
+    return texts
@@ -0,0 +1,133 @@
+"""🔹 벤치마크 통계 (지연 분위수, 처리량, 최대 RSS) 및 기준선 비교"""
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import threading
+from importlib import metadata
+from typing import List, Optional
+
+import numpy as np
+
+# ✅ 기준선과 비교하는 지표: (이름, 클수록 나쁜지)
+COMPARED_METRICS = [
+    ("p50_ms", True),
+    ("p95_ms", True),
+    ("images_per_sec", False),
+    ("peak_rss_mb", True),
+]
+
+
+# ✅ app.core.metrics.rss_bytes와 같은 계산 (app 설정은 환경 변수를 바꾼 뒤에 import 해야 하므로 따로 둠)
+def _rss(pid: Optional[int] = None) -> int:
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class RSSSampler:
+    """🔹 측정 구간 동안 이 프로세스 + 자식 프로세스(격리 태거) RSS 합의 최댓값을 주기적으로 기록
+
+    /proc을 읽을 수 없는 환경(macOS 등)에서는 ru_maxrss(프로세스 수명 전체 최댓값)로 대신한다.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        total = _rss() + sum(_rss(child.pid) for child in multiprocessing.active_children())
+        self.peak_bytes = max(self.peak_bytes, total)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        if not self.peak_bytes:
+            scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss 단위: macOS 바이트, 리눅스 KB
+            self.peak_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def summarize(latencies: List[float], wall_seconds: float, images: int, errors: int, peak_rss_bytes: int, **extra) -> dict:
+    """🔹 호출별 지연(초) → 분위수(ms) + 초당 이미지 수"""
+    values = np.array(latencies or [0.0]) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    summary = {
+        "calls": len(latencies),
+        "errors": errors,
+        "images": images,
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "images_per_sec": round(images / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_bytes / 1024 / 1024, 1),
+    }
+    summary.update(extra)
+    return summary
+
+
+def environment() -> dict:
+    """🔹 결과 해석에 필요한 실행 환경 (기준선과 다르면 비교 결과에 경고)"""
+    packages = {}
+    for name in ("torch", "tensorflow", "tensorflow-macos", "deepface", "numpy", "pillow"):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            pass
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "packages": packages,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, rss_tolerance: float):
+    """🔹 기준선 대비 허용 범위를 넘은 항목 목록과 경고 목록 반환"""
+    regressions, warnings = [], []
+    for key in ("corpus", "environment", "settings"):
+        if baseline.get(key) != results.get(key):
+            warnings.append(f"기준선과 {key}가 다릅니다 → 비교 결과는 참고용")
+
+    for suite, levels in results["suites"].items():
+        for level, current in levels.items():
+            previous = baseline.get("suites", {}).get(suite, {}).get(level)
+            if previous is None:
+                warnings.append(f"{suite} c={level}: 기준선 없음")
+                continue
+            for metric, higher_is_worse in COMPARED_METRICS:
+                before, after = previous.get(metric), current.get(metric)
+                if not before or after is None:
+                    continue
+                limit = rss_tolerance if metric == "peak_rss_mb" else tolerance
+                change = (after - before) / before
+                if (change > limit) if higher_is_worse else (change < -limit):
+                    regressions.append(f"{suite} c={level} {metric}: {before} → {after} ({change:+.1%}, 허용 ±{limit:.0%})")
+    return regressions, warnings
+
+
+def format_table(results: dict) -> str:
+    header = f"{'suite':<10}{'c':>4}{'calls':>7}{'err':>5}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'img/s':>10}{'RSS MB':>10}"
+    lines = [header, "-" * len(header)]
+    for suite, levels in results["suites"].items():
+        for level, s in levels.items():
+            lines.append(f"{suite:<10}{level:>4}{s['calls']:>7}{s['errors']:>5}{s['p50_ms']:>11.1f}{s['p95_ms']:>11.1f}"
+                         f"{s['p99_ms']:>11.1f}{s['images_per_sec']:>10.2f}{s['peak_rss_mb']:>10.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,238 @@
+"""🔹 스위트별 실행기 (태거 직접 호출 / `/ai/generate-tags` 전체 경로)
+
+모든 스위트는 같은 순서로 코퍼스를 rounds번 돌며, 동시성 c는 동시에 진행 중인 호출 수다.
+태거 스위트는 서버처럼 스레드에서 태거를 호출하고(`asyncio.to_thread`와 같은 형태),
+전체 경로 스위트는 in-process ASGI 앱(또는 --server-url의 서버)에 HTTP 요청을 보낸다.
+app 모듈은 환경 변수(얼굴 DB/지오코더 경로)를 설정한 뒤에 import 되도록 함수 안에서 import 한다.
+"""
+import asyncio
+import itertools
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from PIL import Image
+
+from benchmarks.report import RSSSampler, summarize
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_threaded(call: Callable, batches: List, concurrency: int):
+    """🔹 batches를 동시성 c로 호출 → (호출별 지연, 오류 수, 결과 목록, 경과 시간)"""
+    def _timed(batch):
+        started = time.perf_counter()
+        try:
+            result = call(batch)
+            return result, time.perf_counter() - started, None
+        except Exception as e:
+            return None, time.perf_counter() - started, e
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+        outcomes = list(executor.map(_timed, batches))
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed for _, elapsed, error in outcomes if error is None]
+    errors = [error for _, _, error in outcomes if error is not None]
+    for error in errors[:3]:
+        print(f"⚠️ 호출 실패: {type(error).__name__}: {error}")
+    return latencies, len(errors), [result for result, _, error in outcomes if error is None], wall
+
+
+def _load_images(corpus_dir: str, manifest: dict, size) -> dict:
+    """🔹 fetch_image와 같은 전처리 (RGB 변환 후 태거 입력 크기로 리사이즈), 측정 구간 밖에서 수행"""
+    images = {}
+    for entry in manifest["images"]:
+        with Image.open(os.path.join(corpus_dir, entry["file"])) as image:
+            images[entry["file"]] = image.convert("RGB").resize(size)
+    return images
+
+
+def _measure(call: Callable, items: list, levels: List[int], rounds: int, batch_size: int,
+             count_result=None, before_level=None) -> dict:
+    work = _chunks(items * rounds, batch_size)
+    call(work[0])  # 첫 호출의 지연 초기화 비용은 측정에서 제외
+    results = {}
+    for concurrency in levels:
+        if before_level:
+            before_level()
+        with RSSSampler() as rss:
+            latencies, errors, outputs, wall = run_threaded(call, work, concurrency)
+        extra = count_result(outputs) if count_result else {}
+        results[str(concurrency)] = summarize(latencies, wall, (len(work) - errors) * batch_size, errors, rss.peak_bytes, **extra)
+        print(f"  c={concurrency}: p95 {results[str(concurrency)]['p95_ms']}ms, "
+              f"{results[str(concurrency)]['images_per_sec']} img/s")
+    return results
+
+
+def _reset_face_database():
+    """🔹 벤치마크용 얼굴 DB 비우기 (FACE_DATABASE_PATH는 __main__에서 작업 디렉토리로 지정됨)"""
+    from app.core.config import settings
+
+    if os.path.exists(settings.FACE_DATABASE_PATH):
+        os.remove(settings.FACE_DATABASE_PATH)
+    shutil.rmtree(settings.FACE_IMAGE_DIR, ignore_errors=True)
+
+
+def bench_place(corpus_dir: str, manifest: dict, levels: List[int], rounds: int, batch_size: int) -> dict:
+    """🔹 PlaceTagger.predict_places (CLIP)"""
+    from app.core.model_manager import model_manager
+
+    model_manager.load_all(names=["place"])
+    tagger = model_manager.get("place")
+    images = _load_images(corpus_dir, manifest, (512, 512))
+    return _measure(lambda batch: tagger.predict_places({name: images[name] for name in batch}),
+                    list(images), levels, rounds, batch_size)
+
+
+def bench_faces(corpus_dir: str, manifest: dict, levels: List[int], rounds: int, batch_size: int) -> dict:
+    """🔹 CompanionTagger.process_faces (RetinaFace + Facenet + 얼굴 DB 매칭)
+
+    얼굴 DB는 동시성 단계마다 비워서 DB 크기에 따른 매칭 비용 차이가 단계 간에 섞이지 않게 한다.
+    검출된 인물 태그 수를 코퍼스의 얼굴 수와 함께 보고한다 (도식 얼굴은 검출되지 않을 수 있음).
+    """
+    from app.core.model_manager import model_manager
+
+    model_manager.load_all(names=["companion"])
+    tagger = model_manager.get("companion")
+    images = _load_images(corpus_dir, manifest, (1024, 1024))
+    expected = {entry["file"]: entry["faces"] for entry in manifest["images"]}
+
+    def _count(outputs):
+        tagged = sum(len(tags) for output in outputs for tags in output.values() if isinstance(tags, list))
+        known = [faces for faces in expected.values() if faces is not None]
+        return {"people_tagged": tagged, "faces_in_corpus": sum(known) * rounds if known else None}
+
+    try:
+        return _measure(lambda batch: tagger.process_faces({name: images[name] for name in batch}),
+                        list(images), levels, rounds, batch_size, _count, _reset_face_database)
+    finally:
+        _reset_face_database()
+
+
+def bench_location(image_base_url: str, manifest: dict, levels: List[int], rounds: int, batch_size: int) -> dict:
+    """🔹 LocationTagger.predict_locations (이미지 다운로드 + EXIF GPS + 로컬 역지오코더)"""
+    from app.core.model_manager import model_manager
+
+    model_manager.load_all(names=["location"])
+    tagger = model_manager.get("location")
+    urls = [f"{image_base_url}/{entry['file']}" for entry in manifest["images"]]
+
+    def _count(outputs):
+        found = sum(1 for output in outputs for tag in output.values() if "region" in tag)
+        return {"regions_found": found, "gps_in_corpus": sum(1 for e in manifest["images"] if e["gps"]) * rounds}
+
+    return _measure(tagger.predict_locations, urls, levels, rounds, batch_size, _count)
+
+
+def bench_emotion(seed: int, levels: List[int], rounds: int, batch_size: int, texts: int = 64) -> dict:
+    """🔹 EmotionClassifier.predict (다국어 NLI 제로샷, 텍스트당 감정 가설 8쌍)
+
+    호출마다 텍스트 끝에 일련번호를 붙여 결과 캐시에 맞지 않게 하므로 모델 처리량을 잰다.
+    동시성이 높을수록 분류 스레드가 여러 호출의 텍스트를 한 배치로 묶는다. 처리량 열(img/s)은 초당 텍스트 수다.
+    """
+    from app.core.model_manager import model_manager
+    from benchmarks.corpus import diary_texts
+
+    model_manager.load_all(names=["emotion"])
+    classifier = model_manager.get("emotion")
+    sequence = itertools.count()
+    return _measure(lambda batch: classifier.predict([f"{text} ({next(sequence)})" for text in batch]),
+                    diary_texts(seed, texts), levels, rounds, batch_size)
+
+
+def _route_sender(client, corpus_dir: str, manifest: dict, urls: List[str], input_mode: str):
+    """🔹 배치 → POST /ai/generate-tags (url: 이미지 URL JSON, bytes: multipart 업로드)"""
+    if input_mode == "url":
+        return lambda batch: client.post("/ai/generate-tags", json={"image_urls": batch})
+
+    payloads = {}
+    for url, entry in zip(urls, manifest["images"]):
+        with open(os.path.join(corpus_dir, entry["file"]), "rb") as f:
+            payloads[url] = (entry["file"], f.read(), "image/jpeg")
+    return lambda batch: client.post("/ai/generate-tags", files=[("images", payloads[url]) for url in batch],
+                                     data={"image_ids": batch})
+
+
+async def _route_level(send, urls: List[str], concurrency: int, rounds: int, batch_size: int):
+    work = _chunks(urls * rounds, batch_size)
+    queue: asyncio.Queue = asyncio.Queue()
+    for batch in work:
+        queue.put_nowait(batch)
+    latencies, statuses = [], {}
+
+    async def _worker():
+        while not queue.empty():
+            batch = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await send(batch)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return latencies, statuses, wall
+
+
+async def _bench_route(send, urls, levels, rounds, batch_size, before_level=None) -> dict:
+    await send(urls[:batch_size])  # 워밍업 (측정 제외)
+    results = {}
+    for concurrency in levels:
+        if before_level:
+            before_level()
+        with RSSSampler() as rss:
+            latencies, statuses, wall = await _route_level(send, urls, concurrency, rounds, batch_size)
+        errors = sum(count for status, count in statuses.items() if status != 200)
+        if errors:
+            print(f"⚠️ c={concurrency}: 실패 응답 {dict((str(k), v) for k, v in statuses.items() if k != 200)}")
+        results[str(concurrency)] = summarize(latencies, wall, len(latencies) * batch_size, errors, rss.peak_bytes)
+        print(f"  c={concurrency}: p95 {results[str(concurrency)]['p95_ms']}ms, "
+              f"{results[str(concurrency)]['images_per_sec']} img/s")
+    return results
+
+
+def bench_route(image_base_url: str, corpus_dir: str, manifest: dict, levels: List[int], rounds: int,
+                batch_size: int, server_url: Optional[str] = None, input_mode: str = "url") -> dict:
+    """🔹 POST /ai/generate-tags 전체 경로 (다운로드 또는 업로드 → 디코딩 → 스케줄러 → 태거 3종)
+
+    server_url이 없으면 이 프로세스에 앱을 올려 ASGI로 직접 호출하고 (RSS에 모델 포함),
+    있으면 실행 중인 서버로 요청한다 (이때 RSS는 벤치마크 프로세스 것만 측정됨).
+    요청마다 코퍼스의 다른 이미지를 보내므로 c가 코퍼스 크기보다 작으면 진행 중 중복 합치기는 일어나지 않는다.
+    """
+    import httpx
+
+    urls = [f"{image_base_url}/{entry['file']}" for entry in manifest["images"]]
+    timeout = httpx.Timeout(600.0)
+
+    async def _run():
+        if server_url:
+            async with httpx.AsyncClient(base_url=server_url, timeout=timeout) as client:
+                send = _route_sender(client, corpus_dir, manifest, urls, input_mode)
+                return await _bench_route(send, urls, levels, rounds, batch_size)
+
+        from app.core.model_manager import model_manager
+        from app.main import app
+        from app.services.tagging import close_http_session
+
+        model_manager.load_all()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                send = _route_sender(client, corpus_dir, manifest, urls, input_mode)
+                return await _bench_route(send, urls, levels, rounds, batch_size, _reset_face_database)
+        finally:
+            _reset_face_database()
+            await close_http_session()
+
+    return asyncio.run(_run())
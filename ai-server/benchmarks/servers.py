@@ -0,0 +1,74 @@
+"""🔹 벤치마크용 로컬 HTTP 서버 (코퍼스 이미지 서빙, Nominatim 대역 역지오코더)"""
+import json
+import math
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.corpus import LOCATIONS
+
+
+class LocalServer:
+    """🔹 데몬 스레드에서 도는 ThreadingHTTPServer"""
+
+    def __init__(self, handler, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="bench-http", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _QuietFileHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory: str, host: str = "127.0.0.1") -> LocalServer:
+    """🔹 코퍼스 디렉토리를 정적 파일로 서빙 (지역/전체 경로 스위트가 URL로 다운로드)"""
+    return LocalServer(partial(_QuietFileHandler, directory=directory), host)
+
+
+class _GeocodeHandler(BaseHTTPRequestHandler):
+    """🔹 /reverse?lat=&lon= → 가장 가까운 LOCATIONS 항목의 주소 (Nominatim 응답 형식)"""
+
+    latency = 0.0
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            lat, lon = float(query["lat"][0]), float(query["lon"][0])
+        except (KeyError, ValueError):
+            self._reply(400, {"error": "lat/lon 필요"})
+            return
+        if self.latency:
+            time.sleep(self.latency)
+        _, _, region = min(LOCATIONS, key=lambda item: math.hypot(item[0] - lat, item[1] - lon))
+        self._reply(200, {"lat": str(lat), "lon": str(lon), "address": {"suburb": region, "country": "대한민국"}})
+
+    def _reply(self, status: int, body: dict):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_geocoder(latency_ms: float = 0.0, host: str = "127.0.0.1") -> LocalServer:
+    """🔹 Nominatim 대역 서버 시작 (latency_ms로 외부 API 응답 시간 흉내)"""
+    handler = type("GeocodeHandler", (_GeocodeHandler,), {"latency": latency_ms / 1000})
+    return LocalServer(handler, host)
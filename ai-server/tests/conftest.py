@@ -0,0 +1,7 @@
+"""🔹 ai-server 단위 테스트 공통 설정 (모델 가중치 없이 실행되는 모듈만 테스트)"""
+import os
+import sys
+
+# ✅ 저장소 루트에서 `pytest ai-server/tests/`로 실행해도 `app` 패키지를 찾도록 ai-server 디렉터리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TRACING_ENABLED", "0")
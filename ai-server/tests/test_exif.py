@@ -0,0 +1,105 @@
+"""🔹 EXIF 구간만 받는 Range 다운로드 (read_exif_segment)"""
+import asyncio
+import io
+import re
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import web
+from PIL import Image
+
+from app.utils.exif import exif_extent, read_exif_segment
+
+
+def _jpeg_with_exif(exif_payload: int) -> bytes:
+    """EXIF(APP1) 세그먼트 크기가 exif_payload바이트 정도인 JPEG"""
+    body = io.BytesIO()
+    Image.effect_noise((256, 256), 64).convert("RGB").save(body, "JPEG")  # 첫 Range보다 충분히 큰 파일
+    segment = b"Exif\x00\x00" + b"\x00" * exif_payload
+    app1 = b"\xff\xe1" + (len(segment) + 2).to_bytes(2, "big") + segment
+    return body.getvalue()[:2] + app1 + body.getvalue()[2:]
+
+
+async def _serve(data: bytes, ranges: bool = True, status: int = 200):
+    """Range 요청을 (ranges=False면 무시하고 전체를) 처리하는 로컬 서버 → (runner, URL, 받은 Range 헤더 목록)"""
+    requested = []
+
+    async def handler(request):
+        if status != 200:
+            return web.Response(status=status)
+        header = request.headers.get("Range")
+        requested.append(header)
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)", header or "")
+        if not ranges or match is None:
+            return web.Response(body=data)
+        start, end = int(match.group(1)), int(match.group(2))
+        if start >= len(data):
+            return web.Response(status=416)
+        return web.Response(status=206, body=data[start:end + 1])
+
+    app = web.Application()
+    app.router.add_get("/image.jpg", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    await web.SockSite(runner, sock).start()
+    return runner, f"http://127.0.0.1:{sock.getsockname()[1]}/image.jpg", requested
+
+
+def _fetch(data: bytes, initial: int = 256, ranges: bool = True, status: int = 200):
+    async def run():
+        runner, url, requested = await _serve(data, ranges, status)
+        try:
+            async with aiohttp.ClientSession() as session:
+                prefix, full = await read_exif_segment(session, url, initial, 1024 * 1024)
+        finally:
+            await runner.cleanup()
+        return prefix, full, requested
+    return asyncio.run(run())
+
+
+def test_fetches_only_up_to_end_of_exif_segment():
+    data = _jpeg_with_exif(100)
+
+    prefix, full, requested = _fetch(data, initial=1024)
+
+    status, end = exif_extent(prefix)
+    assert not full and status == "complete"
+    assert len(prefix) < len(data) and data.startswith(prefix[:end])
+    assert requested == ["bytes=0-1023"]
+
+
+def test_grows_range_until_exif_segment_is_complete():
+    data = _jpeg_with_exif(5000)
+
+    prefix, full, requested = _fetch(data, initial=256)
+
+    status, end = exif_extent(prefix)
+    assert not full and status == "complete" and end > 5000
+    assert len(requested) > 1 and requested[1].startswith("bytes=256-")  # 이미 받은 앞부분은 다시 받지 않음
+    assert prefix == data[:len(prefix)]
+
+
+def test_uses_full_body_when_server_ignores_range():
+    data = _jpeg_with_exif(100)
+
+    prefix, full, requested = _fetch(data, ranges=False)
+
+    assert full and prefix == data and len(requested) == 1
+
+
+def test_downloads_whole_file_when_not_jpeg():
+    body = io.BytesIO()
+    Image.new("RGB", (16, 16)).save(body, "PNG")
+
+    prefix, full, requested = _fetch(body.getvalue(), initial=8)
+
+    assert full and prefix == body.getvalue()
+    assert requested[-1] is None  # 마지막 요청은 Range 없이 전체
+
+
+def test_error_response_raises():
+    with pytest.raises(aiohttp.ClientResponseError):
+        _fetch(b"", status=404)
@@ -0,0 +1,53 @@
+"""🔹 비스트리밍 태깅 요청의 얼굴 배치 클러스터링 (FaceBatch)"""
+import asyncio
+
+from app.services import tagging
+
+
+def _fake_pipeline(monkeypatch, broken=()):
+    calls = []
+
+    async def fake_fetch_image(url):
+        if url in broken:
+            return None
+        return {"converted_url": url, "digest": url, "gps": (None, None), "place": None, "face": f"face:{url}"}
+
+    async def no_tags(url, inputs, user_id=None):
+        return []
+
+    async def fake_process_faces(faces):
+        calls.append(sorted(faces))
+        return {url: [f"인물-{face}"] for url, face in faces.items()}, "faces-1"
+
+    monkeypatch.setattr(tagging, "ensure_taggers_ready", lambda stages=None: None)
+    monkeypatch.setattr(tagging, "fetch_image", fake_fetch_image)
+    monkeypatch.setattr(tagging, "_process_faces", fake_process_faces)
+    monkeypatch.setitem(tagging.TAGGER_STAGES, "place", no_tags)
+    monkeypatch.setitem(tagging.TAGGER_STAGES, "region", no_tags)
+    return calls
+
+
+def test_run_tagging_clusters_faces_of_all_images_in_one_call(monkeypatch):
+    calls = _fake_pipeline(monkeypatch, broken={"https://s3/broken.jpg"})
+    # 스케줄러 슬롯(TAGGING_CONCURRENCY)보다 이미지가 많아도 배치가 완성되어야 함
+    urls = [f"https://s3/{index}.jpg" for index in range(tagging.settings.TAGGING_CONCURRENCY + 2)]
+
+    results = asyncio.run(tagging.run_tagging([*urls, "https://s3/broken.jpg"]))
+
+    assert calls == [sorted(urls)]
+    assert [result["tags"] for result in results[:-1]] == [
+        [{"type": "인물", "tag_name": f"인물-face:{url}", "model_version": "faces-1"}] for url in urls]
+    assert results[-1]["error"] and results[-1]["tags"] == []
+
+
+def test_stream_tagging_tags_faces_per_image(monkeypatch):
+    calls = _fake_pipeline(monkeypatch)
+    urls = ["https://s3/a.jpg", "https://s3/b.jpg"]
+
+    async def run():
+        return [event async for event in tagging.stream_tagging(urls)]
+
+    events = asyncio.run(run())
+
+    assert sorted(calls) == [[url] for url in urls]  # 준비되는 대로 내보내므로 이미지별로 처리
+    assert events[-1] == {"event": "done", "count": 2}
@@ -0,0 +1,63 @@
+"""🔹 태거 프로세스 격리: 공유 메모리 이미지 전달과 요청 ID 기반 동시 호출"""
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.workers import isolated
+
+
+class SumTagger:
+    """🔹 테스트용 태거 (이미지별 픽셀 합, delay초 뒤 응답)"""
+
+    def __init__(self):
+        self.version = "sum-1"
+
+    def warmup(self):
+        pass
+
+    def predict_places(self, image_data_dict, delay=0.0):
+        time.sleep(delay)
+        return {key: int(np.asarray(image, dtype=np.int64).sum()) for key, image in image_data_dict.items()}
+
+
+@pytest.fixture
+def tagger(monkeypatch):
+    monkeypatch.setitem(isolated.TAGGER_FAMILIES, "sum", (__name__, "SumTagger", "PLACE_PROCESS_THREADS"))
+    tagger = isolated.IsolatedTagger("sum")
+    yield tagger
+    tagger.close()
+
+
+def test_images_are_passed_through_shared_memory(tagger):
+    images = {"a": Image.new("RGB", (4, 3), (1, 2, 3)), "b": Image.new("L", (2, 2), 10)}
+
+    assert tagger.version == "sum-1"
+    assert tagger.predict_places(images) == {"a": 4 * 3 * 6, "b": 2 * 2 * 30}
+
+
+def test_fast_call_is_not_blocked_by_slow_call(tagger):
+    finished = []
+
+    def _call(name, delay):
+        tagger.predict_places({name: Image.new("RGB", (2, 2))}, delay=delay)
+        finished.append(name)
+
+    slow = threading.Thread(target=_call, args=("slow", 1.0))
+    slow.start()
+    time.sleep(0.1)
+    _call("fast", 0.0)
+    slow.join()
+
+    assert finished == ["fast", "slow"]
+
+
+def test_dead_process_fails_pending_calls_and_restarts(tagger):
+    threading.Timer(0.2, tagger._process.kill).start()
+
+    with pytest.raises(isolated.TaggerProcessError):
+        tagger.predict_places({"a": Image.new("RGB", (2, 2))}, delay=5.0)
+
+    assert tagger.predict_places({"a": Image.new("RGB", (1, 1), (1, 1, 1))}) == {"a": 3}
@@ -0,0 +1,57 @@
+"""🔹 비동기 태깅 작업: 단계별 모델 준비 대기와 콜백 재시도"""
+import asyncio
+
+import aiohttp
+
+from app.services import jobs
+
+
+def _queue(tmp_path):
+    queue = jobs.JobQueue(str(tmp_path / "jobs.db"), maxsize=10, num_workers=0)
+    queue.store = jobs.JobStore(queue.store_path)
+    return queue
+
+
+def test_region_only_job_waits_only_for_the_location_model(tmp_path, monkeypatch):
+    async def fake_run_tagging(image_urls, lane, user_id=None, stages=None, embedding=None):
+        return [{"image_url": url, "tags": [{"type": "지역", "tag_name": "제주"}]} for url in image_urls]
+
+    # 장소/인물 모델은 아직 워밍업 중
+    monkeypatch.setattr(jobs.model_manager, "is_ready", lambda names=None: set(names) <= {"location"})
+    monkeypatch.setattr(jobs, "run_tagging", fake_run_tagging)
+    queue = _queue(tmp_path)
+    job_id = queue.store.create({"image_urls": ["https://s3/a.jpg"], "stages": ["region"]}, None)
+
+    asyncio.run(asyncio.wait_for(queue._run(job_id), 2))
+
+    job = queue.store.get(job_id)
+    assert job["status"] == jobs.DONE
+    assert job["result"]["results"][0]["tags"] == [{"type": "지역", "tag_name": "제주"}]
+
+
+def test_callback_does_not_sleep_after_the_last_attempt(tmp_path, monkeypatch):
+    class DownSession:
+        def __init__(self, **kwargs):
+            pass
+
+        async def __aenter__(self):
+            raise aiohttp.ClientConnectionError("backend 연결 실패")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(jobs.aiohttp, "ClientSession", DownSession)
+    monkeypatch.setattr(jobs.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(jobs.settings, "JOB_CALLBACK_RETRIES", 3)
+    queue = _queue(tmp_path)
+    job_id = queue.store.create({"image_urls": []}, "http://backend/callback")
+
+    asyncio.run(queue._send_callback(job_id, "http://backend/callback"))
+
+    assert sleeps == [2, 4]
+    assert queue.store.get(job_id)["callback_status"] == "failed"
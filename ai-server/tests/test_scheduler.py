@@ -0,0 +1,94 @@
+"""🔹 우선순위 레인 스케줄러: 수락 한도(429)와 슬롯 배정"""
+import asyncio
+
+import pytest
+
+from app.core.scheduler import AdmissionError, LaneScheduler, UnknownLaneError
+
+
+def _scheduler(max_concurrency=1, bulk_concurrency=1):
+    return LaneScheduler({
+        "interactive": {"priority": 0, "weight": 1.0, "max_concurrency": max_concurrency, "max_pending": 4},
+        "bulk": {"priority": 1, "weight": 1.0, "max_concurrency": bulk_concurrency, "max_pending": 2},
+    }, max_concurrency)
+
+
+def test_admit_rejects_over_max_pending_with_retry_after():
+    scheduler = _scheduler()
+    scheduler.admit("bulk", 2)
+
+    with pytest.raises(AdmissionError) as rejected:
+        scheduler.admit("bulk", 1)
+
+    assert rejected.value.retry_after >= 1
+    scheduler.admit("interactive", 4)  # 다른 레인의 한도는 따로 셈
+    scheduler.finish("bulk", 2)
+    scheduler.admit("bulk", 1)
+
+
+def test_empty_lane_admits_request_larger_than_limit():
+    scheduler = _scheduler()
+
+    scheduler.admit("bulk", 10)  # 비어 있으면 한도보다 큰 요청도 받음
+
+    with pytest.raises(AdmissionError):
+        scheduler.admit("bulk", 1)
+
+
+def test_unknown_lane():
+    with pytest.raises(UnknownLaneError):
+        _scheduler().admit("batch", 1)
+
+
+def test_waiting_interactive_runs_before_waiting_bulk():
+    async def run():
+        scheduler = _scheduler()
+        order = []
+        release = asyncio.Event()
+
+        async def job(lane, name, hold=False):
+            async with scheduler.slot(lane):
+                order.append(name)
+                if hold:
+                    await release.wait()
+
+        first = asyncio.create_task(job("bulk", "bulk-1", hold=True))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(job("bulk", "bulk-2")), asyncio.create_task(job("interactive", "interactive"))]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *waiting)
+        return order
+
+    assert asyncio.run(run()) == ["bulk-1", "interactive", "bulk-2"]
+
+
+def test_slot_times_out_while_waiting():
+    async def run():
+        scheduler = _scheduler()
+        async with scheduler.slot("interactive"):
+            with pytest.raises(asyncio.TimeoutError):
+                async with scheduler.slot("interactive", timeout=0.01):
+                    pass
+        return scheduler.running, scheduler.lanes["interactive"].waiters
+
+    running, waiters = asyncio.run(run())
+    assert running == 0 and all(future.done() for future, _ in waiters)
+
+
+def test_slot_is_held_until_abandoned_work_finishes():
+    async def run():
+        scheduler = _scheduler()
+        finish = asyncio.Event()
+        async with scheduler.slot("interactive") as workers:
+            worker = asyncio.ensure_future(finish.wait())
+            workers.append(worker)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(worker), 0.01)  # 마감으로 결과는 버림
+        held = scheduler.running
+        finish.set()
+        await worker
+        await asyncio.sleep(0)
+        return held, scheduler.running
+
+    assert asyncio.run(run()) == (1, 0)
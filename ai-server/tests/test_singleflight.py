@@ -0,0 +1,137 @@
+"""🔹 진행 중 계산 합치기 (SingleFlight)와 태깅 요청의 합치기 키"""
+import asyncio
+
+from app.core.singleflight import SingleFlight
+from app.services import tagging
+
+
+def test_same_key_shares_one_computation():
+    async def run():
+        flight, calls = SingleFlight("test"), []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*[flight.do("key", compute) for _ in range(3)])
+        return results, calls, flight.inflight()
+
+    assert asyncio.run(run()) == (["result"] * 3, [1], 0)
+
+
+def test_different_keys_are_isolated():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def compute(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        return await asyncio.gather(flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+
+
+def test_joiner_recomputes_when_result_is_not_shareable():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def degraded():
+            await asyncio.sleep(0.01)
+            return {"skipped_stages": ["people"]}
+
+        async def complete():
+            return {"skipped_stages": []}
+
+        return await asyncio.gather(
+            flight.do("key", degraded, shareable=lambda result: not result["skipped_stages"]),
+            flight.do("key", complete, shareable=lambda result: not result["skipped_stages"]),
+        )
+
+    leader, joiner = asyncio.run(run())
+    assert leader["skipped_stages"] == ["people"] and joiner["skipped_stages"] == []
+
+
+def test_tag_image_does_not_share_results_across_users(monkeypatch):
+    calls = []
+
+    async def fake_tag_image(url, on_partial, lane, deadline, user_id, stages=None):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return tagging._result(url, [{"type": "장소", "tag_name": user_id}], [])
+
+    monkeypatch.setattr(tagging, "_tag_image", fake_tag_image)
+    monkeypatch.setattr(tagging.settings, "PHASH_MAX_DISTANCE", 8)  # 근접 중복 재사용이 켜져 있으면 사용자별 결과
+
+    async def run():
+        return await asyncio.gather(
+            tagging.tag_image("https://s3/a.jpg", user_id="alice"),
+            tagging.tag_image("https://s3/a.jpg", user_id="alice"),
+            tagging.tag_image("https://s3/a.jpg", user_id="bob"),
+        )
+
+    results = asyncio.run(run())
+    assert sorted(calls) == ["alice", "bob"]
+    assert [result["tags"][0]["tag_name"] for result in results] == ["alice", "alice", "bob"]
+
+
+def test_tag_image_shares_results_when_near_duplicate_reuse_is_off(monkeypatch):
+    calls = []
+
+    async def fake_tag_image(url, on_partial, lane, deadline, user_id, stages=None):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return tagging._result(url, [], [])
+
+    monkeypatch.setattr(tagging, "_tag_image", fake_tag_image)
+    monkeypatch.setattr(tagging.settings, "PHASH_MAX_DISTANCE", 0)
+
+    async def run():
+        return await asyncio.gather(tagging.tag_image("https://s3/a.jpg", user_id="alice"),
+                                    tagging.tag_image("https://s3/a.jpg", user_id="bob"))
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_joiner_computes_itself_after_timeout():
+    async def run():
+        flight = SingleFlight("test")
+
+        async def slow():
+            await asyncio.sleep(0.5)
+            return "slow"
+
+        async def fast():
+            return "fast"
+
+        leader = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0)
+        joiner = await flight.do("key", fast, timeout=0.01)
+        return joiner, await leader
+
+    assert asyncio.run(run()) == ("fast", "slow")
+
+
+def test_interactive_request_does_not_wait_for_bulk_leader(monkeypatch):
+    calls = []
+
+    async def fake_tag_image(url, on_partial, lane, deadline, user_id, stages=None):
+        calls.append(lane)
+        await asyncio.sleep(0.5 if lane == "bulk" else 0)  # bulk는 슬롯을 기다리는 중
+        return tagging._result(url, [{"type": "장소", "tag_name": lane}], [])
+
+    monkeypatch.setattr(tagging, "_tag_image", fake_tag_image)
+    monkeypatch.setattr(tagging.settings, "PHASH_MAX_DISTANCE", 0)
+
+    async def run():
+        bulk = asyncio.ensure_future(tagging.tag_image("https://s3/a.jpg", lane="bulk"))
+        await asyncio.sleep(0)
+        interactive = await asyncio.wait_for(
+            tagging.tag_image("https://s3/a.jpg", lane="interactive", deadline=tagging.Deadline(100)), 0.3)
+        return interactive, await bulk
+
+    interactive, bulk = asyncio.run(run())
+    assert calls == ["bulk", "interactive"]
+    assert interactive["tags"][0]["tag_name"] == "interactive" and bulk["tags"][0]["tag_name"] == "bulk"
@@ -0,0 +1,23 @@
+"""Add traceparent to tagging_job table
+
+Revision ID: a1c5e9f4b2d8
+Revises: f3b9d1c7a6e2
+Create Date: 2026-10-19 21:40:12.503117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a1c5e9f4b2d8"
+down_revision = "f3b9d1c7a6e2"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    """작업을 만든 요청의 trace 컨텍스트(traceparent) 컬럼을 tagging_job 테이블에 추가"""
+    op.add_column("tagging_job", sa.Column("traceparent", sa.String(), nullable=True))
+
+def downgrade() -> None:
+    """다운그레이드 시 traceparent 컬럼을 삭제"""
+    op.drop_column("tagging_job", "traceparent")
@@ -0,0 +1,27 @@
+"""Add CLIP image embedding to image table
+
+Revision ID: c41f7a2e9b10
+Revises: 9a31deff2193
+Create Date: 2026-10-19 10:12:40.512833
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c41f7a2e9b10"
+down_revision = "9a31deff2193"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    """CLIP 이미지 임베딩(embedding, embedding_scale, embedding_model) 컬럼을 image 테이블에 추가"""
+    op.add_column("image", sa.Column("embedding", sa.LargeBinary(), nullable=True))
+    op.add_column("image", sa.Column("embedding_scale", sa.Float(), nullable=True))
+    op.add_column("image", sa.Column("embedding_model", sa.String(), nullable=True))
+
+def downgrade() -> None:
+    """다운그레이드 시 임베딩 컬럼을 삭제"""
+    op.drop_column("image", "embedding_model")
+    op.drop_column("image", "embedding_scale")
+    op.drop_column("image", "embedding")
@@ -0,0 +1,36 @@
+"""Add user_place table for user-registered place labels
+
+Revision ID: d7e3b5a1c284
+Revises: c41f7a2e9b10
+Create Date: 2026-10-19 13:40:18.204719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "d7e3b5a1c284"
+down_revision = "c41f7a2e9b10"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    """사용자 장소(user_place) 테이블 생성"""
+    op.create_table(
+        "user_place",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("label", sa.String(), nullable=False),
+        sa.Column("tag_name", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "label", name="uq_user_place_label"),
+    )
+    op.create_index("ix_user_place_user_id", "user_place", ["user_id"])
+
+def downgrade() -> None:
+    """다운그레이드 시 사용자 장소 테이블 삭제"""
+    op.drop_index("ix_user_place_user_id", table_name="user_place")
+    op.drop_table("user_place")
@@ -0,0 +1,25 @@
+"""Add suggested emotions to diary table
+
+Revision ID: e8a4c6d2f317
+Revises: d7e3b5a1c284
+Create Date: 2026-10-19 15:02:47.318604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e8a4c6d2f317"
+down_revision = "d7e3b5a1c284"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    """AI 감정 추천(suggested_emotions, emotion_model) 컬럼을 diary 테이블에 추가"""
+    op.add_column("diary", sa.Column("suggested_emotions", sa.String(), nullable=True))
+    op.add_column("diary", sa.Column("emotion_model", sa.String(), nullable=True))
+
+def downgrade() -> None:
+    """다운그레이드 시 감정 추천 컬럼을 삭제"""
+    op.drop_column("diary", "emotion_model")
+    op.drop_column("diary", "suggested_emotions")
@@ -0,0 +1,41 @@
+"""Add tagging status to diary and tagging_job table
+
+Revision ID: f3b9d1c7a6e2
+Revises: e8a4c6d2f317
+Create Date: 2026-10-19 17:41:09.582214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "f3b9d1c7a6e2"
+down_revision = "e8a4c6d2f317"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    """diary.tagging_status 컬럼(기존 일기는 done)과 백그라운드 태깅 작업 테이블 추가"""
+    op.add_column("diary", sa.Column("tagging_status", sa.String(), nullable=False, server_default="done"))
+    op.create_table(
+        "tagging_job",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("diary_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.TIMESTAMP(), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["diary_id"], ["diary.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("diary_id"),
+    )
+    op.create_index("ix_tagging_job_status_next_attempt_at", "tagging_job", ["status", "next_attempt_at"])
+
+def downgrade() -> None:
+    """다운그레이드 시 태깅 작업 테이블과 tagging_status 컬럼 삭제"""
+    op.drop_index("ix_tagging_job_status_next_attempt_at", table_name="tagging_job")
+    op.drop_table("tagging_job")
+    op.drop_column("diary", "tagging_status")
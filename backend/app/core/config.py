@@ -1,6 +1,8 @@
 import os
 from dotenv import load_dotenv
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 
 load_dotenv()
 
@@ -13,12 +15,58 @@ DB_NAME = os.getenv("POSTGRES_DB", "mindlog_db")
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 
+# ✅ backend 루트 경로
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
 class Settings:
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_REGION = os.getenv("AWS_REGION", "ap-southeast-2")  # ✅ 기본 리전: 서울
     AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
 
+    # ✅ S3 업로드 (일기 이미지는 동시에 업로드, 큰 파일은 멀티파트로 나눠 병렬 전송)
+    S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "8"))  # 워커 전체에서 동시에 올리는 이미지 수
+    S3_MULTIPART_THRESHOLD_MB = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8"))  # 이보다 크면 멀티파트 업로드
+    S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8"))
+    S3_MULTIPART_CONCURRENCY = int(os.getenv("S3_MULTIPART_CONCURRENCY", "4"))  # 이미지 하나의 파트 동시 전송 수
+    # 이보다 큰 업로드 이미지는 요청 동안 디스크 임시 파일에 두고 스트리밍 (메모리 사용 제한)
+    UPLOAD_SPOOL_MAX_MB = int(os.getenv("UPLOAD_SPOOL_MAX_MB", "4"))
+    UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None  # 비우면 시스템 임시 디렉터리
+
+    # ✅ 분산 트레이싱 (span은 로컬 JSONL 파일로 기록, AI 서버 요청에 traceparent 전파)
+    SERVICE_NAME = os.getenv("SERVICE_NAME", "mindlog-backend")
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+    TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join(BASE_DIR, "data", "traces.jsonl"))
+    TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(50 * 1024 * 1024)))  # 넘으면 .1로 회전
+
+    # ✅ 관리자 API 토큰 (X-Admin-Token 헤더, 비어 있으면 관리자 API와 프로파일링 비활성)
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+    # ✅ 온디맨드 프로파일링 (관리자 API로 켜거나 X-Profile: <ADMIN_TOKEN> 헤더로 요청 단위 실행)
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 시작 시 샘플링 비율 (0이면 꺼짐)
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))  # 스택 샘플링 간격
+    PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "4"))  # 동시에 프로파일링할 최대 요청 수
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(BASE_DIR, "data", "profiles"))
+
+
+    # ✅ 비슷한 일기 검색 (AI 서버가 돌려준 CLIP 임베딩을 이미지별로 저장, 비우면 요청하지 않음)
+    AI_EMBEDDING_FORMAT = os.getenv("AI_EMBEDDING_FORMAT", "int8")  # int8 / float32
+    SIMILAR_INDEX_MAX_USERS = int(os.getenv("SIMILAR_INDEX_MAX_USERS", "1000"))  # 메모리에 유지할 사용자 인덱스 수 (LRU)
+    # 이미지 수가 같아도 이 시간이 지나면 ID 목록을 다시 비교 (다른 워커에서 삭제 + 추가된 경우 반영)
+    SIMILAR_INDEX_SYNC_SECONDS = float(os.getenv("SIMILAR_INDEX_SYNC_SECONDS", "60"))
+
+    # ✅ 백그라운드 이미지 태깅 (일기는 업로드 직후 응답하고 태그는 tagging_job 큐에서 저장)
+    TAGGING_WORKER_THREADS = int(os.getenv("TAGGING_WORKER_THREADS", "2"))  # 0이면 이 프로세스에서 처리하지 않음
+    TAGGING_MAX_ATTEMPTS = int(os.getenv("TAGGING_MAX_ATTEMPTS", "5"))
+    TAGGING_RETRY_BASE_SECONDS = float(os.getenv("TAGGING_RETRY_BASE_SECONDS", "5"))  # 재시도 간격 = 이 값 × 2^(시도-1)
+    TAGGING_POLL_SECONDS = float(os.getenv("TAGGING_POLL_SECONDS", "5"))  # 새 작업 알림이 없을 때 큐 확인 주기
+    TAGGING_LEASE_SECONDS = float(os.getenv("TAGGING_LEASE_SECONDS", "120"))  # running이 이보다 오래되면 다시 가져감
+
+    # ✅ 사용자 장소 (AI 서버 USER_PLACES_MAX_LABELS와 같게 유지)
+    USER_PLACES_MAX = int(os.getenv("USER_PLACES_MAX", "50"))
+
 
 settings = Settings()
 
@@ -28,6 +76,14 @@ s3_client = boto3.client(
     aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
     aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
     region_name=settings.AWS_REGION,
+    # 동시 업로드 × 파트 동시 전송만큼 연결을 열어 두어야 커넥션 풀에서 기다리지 않음
+    config=Config(max_pool_connections=max(10, settings.S3_UPLOAD_CONCURRENCY * settings.S3_MULTIPART_CONCURRENCY)),
+)
+
+s3_transfer_config = TransferConfig(
+    multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+    multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024,
+    max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
 )
 
 S3_BUCKET = settings.AWS_S3_BUCKET_NAME
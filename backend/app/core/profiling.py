@@ -0,0 +1,218 @@
+"""🔹 운영 중 요청 단위 온디맨드 프로파일링
+
+- 관리자 API로 켠 샘플링 비율만큼, 또는 `X-Profile: <관리자 토큰>` 헤더가 붙은 요청을 프로파일링
+- 프로파일링 중인 요청이 있을 때만 샘플러 스레드가 돌며 `sys._current_frames()`로 스택을 수집
+- 결과는 flamegraph.pl / speedscope에서 바로 열 수 있는 collapsed stack(`.folded`)과
+  경로·상태 코드·단계별(span) 시간을 담은 `.json`으로 PROFILE_DIR에 저장
+- ADMIN_TOKEN이 없으면 미들웨어 자체를 등록하지 않으므로 꺼져 있을 때 비용이 없음
+
+샘플러는 프로세스의 모든 스레드를 보므로, 같은 시간에 처리된 다른 요청의 스택도 섞일 수 있다.
+스위치 상태는 워커 프로세스별이다 (여러 워커를 함께 켜려면 PROFILE_SAMPLE_RATE 환경 변수 사용).
+
+원본은 ai-server/app/core/profiling.py이고 backend/app/core/profiling.py는 그대로 복사한 사본이다
+(두 서비스는 따로 빌드되어 공유 패키지가 없음). 고칠 때는 원본을 고친 뒤 복사한다.
+"""
+import asyncio
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from app.core.config import settings
+from app.core import tracing
+
+# ✅ 대기 중인 스레드로 보고 버리는 최상단 프레임 (파일명, 함수명)
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # 작업을 기다리는 ThreadPoolExecutor 워커 (SimpleQueue.get은 C 함수)
+    ("connection.py", "_poll"),
+}
+
+
+def verify_admin_token(token: Optional[str]) -> bool:
+    return bool(settings.ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, settings.ADMIN_TOKEN)
+
+
+def _collapse(frame) -> Optional[str]:
+    """🔹 프레임 체인 → `바깥;...;안쪽` 형식 한 줄 (대기 중인 스레드는 None)"""
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+        return None
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class ProfileSession:
+    """🔹 요청 하나의 스택 샘플 + 단계별 시간"""
+
+    def __init__(self, method: str, path: str, trace_id: Optional[str], trigger: str):
+        self.method = method
+        self.path = path
+        self.trace_id = trace_id
+        self.trigger = trigger
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms = None
+        self.status_code = None
+        self.samples = Counter()
+        self.stages = []
+
+    def finish(self, status_code: Optional[int]):
+        self.status_code = status_code
+        self.duration_ms = round((time.perf_counter() - self._started) * 1000, 3)
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", self.path).strip("_") or "root"
+        stem = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))}"
+                                       f"_{self.method}_{slug}_{(self.trace_id or os.urandom(8).hex())[:16]}")
+        root = f"{self.method} {self.path}"
+        with open(stem + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{root};{stack} {count}\n")
+        with open(stem + ".json", "w", encoding="utf-8") as f:
+            json.dump({
+                "service": settings.SERVICE_NAME,
+                "method": self.method,
+                "path": self.path,
+                "status_code": self.status_code,
+                "trigger": self.trigger,
+                "trace_id": self.trace_id,
+                "started_at": self.started_at,
+                "duration_ms": self.duration_ms,
+                "interval_ms": settings.PROFILE_INTERVAL_MS,
+                "samples": sum(self.samples.values()),
+                "stages": self.stages,
+            }, f, ensure_ascii=False, indent=2)
+        return stem
+
+
+class Profiler:
+    """🔹 프로파일링 스위치 + 스택 샘플러 스레드"""
+
+    def __init__(self):
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.expires_at = None  # 샘플링 자동 종료 시각 (None이면 끌 때까지 유지)
+        self._sessions = {}  # id(session) → session
+        self._by_trace = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---- 스위치 ----
+    def configure(self, sample_rate: float, duration_seconds: Optional[float] = None):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.expires_at = time.time() + duration_seconds if duration_seconds else None
+
+    def status(self) -> dict:
+        return {
+            "sample_rate": self._current_rate(),
+            "expires_at": self.expires_at,
+            "active_sessions": len(self._sessions),
+            "interval_ms": settings.PROFILE_INTERVAL_MS,
+            "profile_dir": settings.PROFILE_DIR,
+        }
+
+    def _current_rate(self) -> float:
+        if self.expires_at is not None and time.time() > self.expires_at:
+            self.sample_rate, self.expires_at = 0.0, None
+        return self.sample_rate
+
+    def trigger(self, headers) -> Optional[str]:
+        """🔹 이 요청을 프로파일링할지 (헤더 → "header", 샘플링 → "sample", 아니면 None)"""
+        for name, value in headers:
+            if name == b"x-profile":
+                return "header" if verify_admin_token(value.decode("latin-1")) else None
+        if self.sample_rate and random.random() < self._current_rate():
+            return "sample"
+        return None
+
+    # ---- 세션 ----
+    def begin(self, method: str, path: str, trigger: str) -> Optional[ProfileSession]:
+        with self._lock:
+            if len(self._sessions) >= settings.PROFILE_MAX_CONCURRENT:
+                return None
+            session = ProfileSession(method, path, tracing.current_trace_id(), trigger)
+            self._sessions[id(session)] = session
+            if session.trace_id:
+                self._by_trace[session.trace_id] = session
+            if len(self._sessions) == 1:
+                tracing.add_span_listener(self._on_span_end)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def end(self, session: ProfileSession, status_code: Optional[int]):
+        with self._lock:
+            self._sessions.pop(id(session), None)
+            self._by_trace.pop(session.trace_id, None)
+            if not self._sessions:
+                tracing.remove_span_listener(self._on_span_end)
+        session.finish(status_code)
+
+    def _on_span_end(self, span):
+        session = self._by_trace.get(span.trace_id)
+        if session is not None:
+            session.stages.append({"name": span.name, "duration_ms": span.duration_ms(), "status": span.status})
+
+    def _sample_loop(self):
+        interval = settings.PROFILE_INTERVAL_MS / 1000
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                sessions = list(self._sessions.values())
+                if not sessions:
+                    self._thread = None
+                    return
+            stacks = [_collapse(frame) for thread_id, frame in sys._current_frames().items() if thread_id != own_id]
+            for stack in stacks:
+                if stack is None:
+                    continue
+                for session in sessions:
+                    session.samples[stack] += 1
+            time.sleep(interval)
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """🔹 선택된 요청을 프로파일링 (TracingMiddleware 안쪽에 두어야 trace_id·단계 시간이 붙음)"""
+
+    def __init__(self, app, exclude_paths=()):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        trigger = None
+        if scope["type"] == "http" and not scope["path"].startswith(self.exclude_paths):
+            trigger = profiler.trigger(scope["headers"])
+        session = profiler.begin(scope["method"], scope["path"], trigger) if trigger else None
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = {}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            profiler.end(session, status.get("code"))
+            await asyncio.to_thread(session.save, settings.PROFILE_DIR)
@@ -0,0 +1,344 @@
+"""🔹 일기 이미지 백그라운드 태깅 (tagging_job 테이블 기반 내구성 큐 + 워커 스레드)"""
+import json
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import requests
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracing import current_traceparent, inject, span, start_trace
+from app.core.uploads import discard_upload, open_upload
+from app.core.vector_index import embedding_columns
+from app.database import SessionLocal
+from app.models.diary_model import Diary, Image, ImageTag, Tag, TaggingJob
+from app.models.user_model import UserPlace
+
+AI_SERVER_URL = "http://192.168.0.16:8001/ai/generate-tags"  # ✅ AI 서버 URL
+AI_REQUEST_TIMEOUT = 30  # ✅ AI 서버 응답 대기 시간 (초)
+# ✅ AI 서버에 전달하는 처리 시간 예산 (네트워크 여유분을 뺀 값, 초과 시 부분 태그 반환)
+AI_DEADLINE_MS = (AI_REQUEST_TIMEOUT - 3) * 1000
+
+# ✅ AI 서버 단계 → 그 단계가 만드는 태그 타입 (다시 계산한 타입의 태그만 교체)
+STAGE_TAG_TYPES = {"place": "장소", "region": "지역", "people": "인물"}
+
+# ✅ 작업 상태 (queued → running → 완료 시 삭제 / failed) 와 일기 태깅 상태
+QUEUED, RUNNING, FAILED = "queued", "running", "failed"
+TAGGING_PENDING, TAGGING_DONE, TAGGING_FAILED = "pending", "done", "failed"
+
+
+def enqueue_tagging(db: Session, diary_id: uuid.UUID):
+    """일기 태깅 작업 추가 (호출한 쪽의 커밋과 함께 저장되므로 일기와 작업이 같이 남음)
+
+    현재 요청의 traceparent도 저장해 워커의 처리 과정이 일기 생성 요청과 같은 trace에 남게 한다.
+    """
+    db.add(TaggingJob(id=uuid.uuid4(), diary_id=diary_id, status=QUEUED, attempts=0,
+                      traceparent=current_traceparent()))
+
+
+def save_tag_results(db: Session, images: Dict[str, uuid.UUID], results: List[dict], stages: List[str]):
+    """AI 결과 → 태그 조회/생성, 다시 계산한 타입의 ImageTag 삭제 후 일괄 삽입, 임베딩 갱신"""
+    replaced: Dict[tuple, List[uuid.UUID]] = {}  # 교체할 태그 타입 묶음 → 이미지 ID
+    new_tags: Dict[uuid.UUID, List[dict]] = {}
+    embeddings = []
+    for result in results:
+        image_id = images.get(result["image_url"])
+        if image_id is None:
+            continue
+        # 마감/오류로 건너뛴 단계의 기존 태그는 그대로 둠
+        types = tuple(STAGE_TAG_TYPES[stage] for stage in stages if stage not in result.get("skipped_stages", []))
+        if not types:
+            continue
+        replaced.setdefault(types, []).append(image_id)
+        new_tags[image_id] = [tag for tag in result["tags"] if tag["type"] in types]
+        columns = embedding_columns(result.get("embedding")) if "place" in stages else {}
+        if columns:
+            embeddings.append({"id": image_id, **columns})
+
+    names = {tag["tag_name"] for tags in new_tags.values() for tag in tags}
+    tag_ids = {tag.tag_name: tag.id for tag in db.query(Tag).filter(Tag.tag_name.in_(names))} if names else {}
+    created = []
+    for tags in new_tags.values():
+        for tag in tags:
+            if tag["tag_name"] not in tag_ids:
+                tag_ids[tag["tag_name"]] = uuid.uuid4()
+                created.append({"id": tag_ids[tag["tag_name"]], "type": tag["type"], "tag_name": tag["tag_name"]})
+    if created:
+        db.bulk_insert_mappings(Tag, created)
+
+    for types, image_ids in replaced.items():
+        type_tag_ids = db.query(Tag.id).filter(Tag.type.in_(types))
+        db.query(ImageTag).filter(ImageTag.image_id.in_(image_ids), ImageTag.tag_id.in_(type_tag_ids)) \
+            .delete(synchronize_session=False)
+    links = {(image_id, tag_ids[tag["tag_name"]]) for image_id, tags in new_tags.items() for tag in tags}
+    if links:
+        db.bulk_insert_mappings(ImageTag, [{"image_id": image_id, "tag_id": tag_id} for image_id, tag_id in links])
+    if embeddings:
+        db.bulk_update_mappings(Image, embeddings)
+
+
+def request_tags(image_urls: List[str], user_id: uuid.UUID, places: dict,
+                 uploads: Optional[List[dict]] = None) -> List[dict]:
+    """AI 서버 태깅 요청
+
+    uploads(일기를 만든 요청이 넘긴 업로드: "s3_url", "filename", "content_type", "data" 또는 "path", "latitude",
+    "longitude")가 있으면 그 바이트를 multipart로 직접 보내 AI 서버가 S3에서 다시 받지 않고,
+    나머지 image_urls(재시도, 다른 프로세스가 받은 일기)는 AI 서버가 S3에서 직접 받는다.
+    결과의 image_url은 둘 다 S3 URL.
+    """
+    uploads = uploads or []
+    local = {upload["s3_url"] for upload in uploads}
+    fields = {
+        # 사용자가 작성한 일기의 태그이므로 일괄 작업(bulk)보다 먼저 처리
+        "priority": "interactive",
+        "deadline_ms": AI_DEADLINE_MS,
+        # user_id: 같은 사용자의 연속 촬영 사진은 AI 서버가 장소/인물 태그를 재사용
+        "user_id": str(user_id),
+        # 장소 태깅에 쓴 CLIP 이미지 임베딩도 함께 받아 저장 (비슷한 일기 검색)
+        **({"embedding": settings.AI_EMBEDDING_FORMAT} if settings.AI_EMBEDDING_FORMAT else {}),
+    }
+    with span("ai.generate_tags", images=len(image_urls) + len(uploads)) as ai_span, ExitStack() as files:
+        if uploads:
+            response = requests.post(
+                AI_SERVER_URL,
+                files=[("images", (u["filename"], files.enter_context(open_upload(u)), u["content_type"]))
+                       for u in uploads],
+                data={
+                    **fields,
+                    "image_urls": [url for url in image_urls if url not in local],
+                    "image_ids": [u["s3_url"] for u in uploads],
+                    # 이미 읽은 GPS는 함께 보내 AI 서버의 EXIF 파싱 생략 (없으면 빈 값)
+                    "lat": ["" if u["latitude"] is None else str(u["latitude"]) for u in uploads],
+                    "lon": ["" if u["longitude"] is None else str(u["longitude"]) for u in uploads],
+                    # 빈 dict도 보내야 AI 서버에 남아 있던 장소 목록이 지워짐
+                    "places": json.dumps(places, ensure_ascii=False),
+                },
+                headers=inject({}),
+                timeout=AI_REQUEST_TIMEOUT,
+            )
+        else:
+            response = requests.post(
+                AI_SERVER_URL,
+                json={**fields, "image_urls": image_urls, "places": places},
+                headers=inject({}),
+                timeout=AI_REQUEST_TIMEOUT,
+            )
+        if ai_span is not None:
+            ai_span.set_attribute("http.status_code", response.status_code)
+        response.raise_for_status()
+        return response.json().get("results", [])
+
+
+def claim_job(db: Session) -> Optional[TaggingJob]:
+    """실행할 작업 하나를 running으로 가져옴 (SKIP LOCKED로 여러 워커/프로세스가 같은 작업을 잡지 않음)
+
+    재시도 시각이 된 queued 작업과, TAGGING_LEASE_SECONDS 넘게 running인 작업(처리하던 프로세스가 죽음)이 대상.
+    마지막 시도 중에 멈춘 작업은 다시 가져가지 않고 failed로 바꾼다 (같은 일기가 프로세스를 계속 죽이는 경우).
+    """
+    while True:
+        job = (
+            db.query(TaggingJob)
+            .filter(or_(
+                and_(TaggingJob.status == QUEUED, TaggingJob.next_attempt_at <= func.now()),
+                and_(TaggingJob.status == RUNNING,
+                     TaggingJob.locked_at < func.now() - timedelta(seconds=settings.TAGGING_LEASE_SECONDS)),
+            ))
+            .order_by(TaggingJob.next_attempt_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            db.rollback()
+            return None
+        if job.status == RUNNING and job.attempts >= settings.TAGGING_MAX_ATTEMPTS:
+            job.status = FAILED
+            job.locked_at = None
+            job.last_error = "마지막 시도 중 처리가 중단됨 (lease 만료)"
+            diary = db.get(Diary, job.diary_id)
+            if diary is not None:
+                diary.tagging_status = TAGGING_FAILED
+            db.commit()
+            continue
+        job.status = RUNNING
+        job.locked_at = func.now()
+        job.attempts += 1
+        db.commit()
+        return job
+
+
+def _retry_delay(job: TaggingJob, error: Exception) -> float:
+    """지수 백오프 (AI 서버가 Retry-After를 주면 그보다 일찍 다시 보내지 않음)"""
+    delay = settings.TAGGING_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+    response = getattr(error, "response", None)
+    try:
+        retry_after = float(response.headers.get("Retry-After") or 0) if response is not None else 0.0
+    except ValueError:
+        retry_after = 0.0
+    return max(delay, retry_after)
+
+
+def _fail_attempt(db: Session, job: TaggingJob, diary: Optional[Diary], error: Exception):
+    """이번 시도 실패 처리: 백오프 후 queued로 되돌리거나, 마지막 시도면 failed"""
+    job.last_error = str(error)[:1000]
+    job.locked_at = None
+    if job.attempts >= settings.TAGGING_MAX_ATTEMPTS:
+        job.status = FAILED
+        if diary is not None:
+            diary.tagging_status = TAGGING_FAILED
+    else:
+        job.status = QUEUED
+        job.next_attempt_at = func.now() + timedelta(seconds=_retry_delay(job, error))
+    print(f"⚠️ 일기 {job.diary_id} 태깅 실패 ({job.attempts}/{settings.TAGGING_MAX_ATTEMPTS}회): {error}")
+    db.commit()
+
+
+def run_job(db: Session, job: TaggingJob, uploads: Optional[List[dict]] = None):
+    """작업 하나 처리: AI 태깅 → 태그 저장 후 작업 삭제, 실패하면 백오프 후 재시도 (마지막 시도면 failed)
+
+    uploads가 있으면 S3 URL 대신 그 바이트로 요청한다 (request_tags 참고).
+    예상하지 못한 예외(태그 저장 중 DB 오류 등)도 롤백한 뒤 같은 방식으로 처리해 running으로 남기지 않는다.
+    """
+    try:
+        _run_job(db, job, uploads)
+    except Exception as e:
+        db.rollback()
+        _fail_attempt(db, job, db.get(Diary, job.diary_id), e)
+
+
+def _run_job(db: Session, job: TaggingJob, uploads: Optional[List[dict]] = None):
+    diary = db.get(Diary, job.diary_id)
+    if diary is None:
+        return  # 처리 전에 일기가 삭제됨 (작업도 CASCADE로 함께 삭제)
+    images = {image.image_url: image.id for image in diary.images}
+    places = {place.label: place.tag_name
+              for place in db.query(UserPlace).filter(UserPlace.user_id == diary.user_id)}
+    last_attempt = job.attempts >= settings.TAGGING_MAX_ATTEMPTS
+
+    try:
+        uploads = [upload for upload in uploads or [] if upload["s3_url"] in images]
+        results = request_tags(list(images), diary.user_id, places, uploads) if images else []
+        errors = [result["error"] for result in results if result.get("error")]
+        # 마감/태거 오류로 AI 서버가 건너뛴 단계도 이미지 오류처럼 다시 시도 (그 단계 없이 done이 되지 않도록)
+        errors += [f"{result['image_url']}: {', '.join(result['skipped_stages'])} 단계 건너뜀"
+                   for result in results if not result.get("error") and result.get("skipped_stages")]
+        if errors and not last_attempt:
+            # 이미지를 받지 못했거나 (S3 일시 오류 등) 단계를 건너뛴 경우 일기 전체를 다시 시도
+            raise RuntimeError(f"이미지 {len(errors)}개 태깅 실패: {errors[0]}")
+    except (requests.RequestException, RuntimeError) as e:
+        _fail_attempt(db, job, diary, e)
+        return
+
+    # 마지막 시도에서도 일부 이미지를 받지 못했거나 단계를 건너뛰었으면 계산된 태그만 저장하고 failed로 표시
+    with span("db.save_tags", images=len(results)):
+        save_tag_results(db, images, [result for result in results if not result.get("error")],
+                         list(STAGE_TAG_TYPES))
+    diary.tagging_status = TAGGING_FAILED if errors else TAGGING_DONE
+    if errors:
+        job.status = FAILED
+        job.last_error = errors[0]
+        job.locked_at = None
+    else:
+        db.delete(job)
+    db.commit()
+
+
+class TaggingWorker:
+    """🔹 tagging_job 큐를 처리하는 백그라운드 스레드 (작업이 DB에 있으므로 여러 프로세스가 나눠 처리)
+
+    create_diary가 작업을 커밋한 뒤 notify()로 바로 깨우고, 알림이 없어도 TAGGING_POLL_SECONDS마다
+    재시도 시각이 된 작업과 다른 프로세스가 처리하다 멈춘 작업을 확인한다.
+    notify()로 넘겨받은 업로드 바이트는 이 프로세스가 그 일기의 작업을 가져가면 첫 시도에 그대로 보내고,
+    첫 시도가 끝나거나 TAGGING_LEASE_SECONDS 안에 가져가지 못하면 (다른 프로세스가 처리) 버린다.
+    재시도는 S3 URL로 한다 (작업은 DB에 남지만 임시 파일은 이 프로세스에만 있으므로).
+    """
+
+    def __init__(self, threads: int):
+        self.threads = threads
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._uploads: Dict[uuid.UUID, tuple] = {}  # 일기 ID → (넘겨받은 시각, 업로드 목록)
+        self._uploads_lock = threading.Lock()
+
+    def start(self):
+        self._stopping.clear()
+        for index in range(self.threads):
+            worker = threading.Thread(target=self._loop, name=f"tagging-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: float = AI_REQUEST_TIMEOUT):
+        """🔹 진행 중인 작업까지만 처리하고 종료 (못 끝낸 작업은 lease가 지나면 다른 프로세스가 가져감)"""
+        self._stopping.set()
+        self._wake.set()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers = []
+        with self._uploads_lock:
+            handed, self._uploads = self._uploads, {}
+        for _, uploads in handed.values():
+            for upload in uploads:
+                discard_upload(upload)
+
+    def notify(self, diary_id: Optional[uuid.UUID] = None, uploads: Optional[List[dict]] = None) -> bool:
+        """🔹 새 작업이 커밋됐음을 알림 (폴링 주기를 기다리지 않고 바로 처리)
+
+        uploads를 함께 넘기면 워커가 그 업로드(임시 파일 포함)를 맡아 첫 시도 후 정리하고 True를 반환한다.
+        이 프로세스에 워커 스레드가 없으면 맡지 않고 False (호출한 쪽이 정리).
+        """
+        taken = bool(diary_id is not None and uploads and self.threads > 0 and not self._stopping.is_set())
+        if taken:
+            with self._uploads_lock:
+                self._uploads[diary_id] = (time.monotonic(), uploads)
+        self._wake.set()
+        return taken
+
+    def _take_uploads(self, diary_id: uuid.UUID) -> List[dict]:
+        """🔹 작업을 가져간 일기의 넘겨받은 업로드 (오래돼 다른 프로세스가 처리했을 업로드는 정리)"""
+        now = time.monotonic()
+        with self._uploads_lock:
+            taken = self._uploads.pop(diary_id, (now, []))[1]
+            expired = [key for key, (handed_at, _) in self._uploads.items()
+                       if now - handed_at > settings.TAGGING_LEASE_SECONDS]
+            stale = [upload for key in expired for upload in self._uploads.pop(key)[1]]
+        for upload in stale:
+            discard_upload(upload)
+        return taken
+
+    def run_once(self) -> bool:
+        """🔹 작업 하나 처리 → 처리한 작업이 있으면 True"""
+        db = SessionLocal()
+        try:
+            job = claim_job(db)
+            if job is None:
+                return False
+            uploads = self._take_uploads(job.diary_id)
+            try:
+                with start_trace("tagging.job", job.traceparent, diary_id=str(job.diary_id), attempt=job.attempts):
+                    run_job(db, job, uploads)
+            finally:
+                for upload in uploads:
+                    discard_upload(upload)
+            return True
+        finally:
+            db.close()
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                print(f"❌ 태깅 작업 처리 오류: {e}")
+                processed = False
+            if not processed:
+                self._wake.wait(settings.TAGGING_POLL_SECONDS)
+                self._wake.clear()
+
+
+# ✅ 전역 워커 (main.py의 startup / shutdown에서 시작 / 종료)
+tagging_worker = TaggingWorker(settings.TAGGING_WORKER_THREADS)
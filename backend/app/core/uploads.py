@@ -0,0 +1,17 @@
+"""🔹 요청 동안 메모리 / 디스크 임시 파일에 보관하는 업로드 이미지 (S3 업로드와 AI 태깅이 같은 바이트를 읽음)"""
+import io
+import os
+
+
+def open_upload(upload: dict):
+    """업로드 이미지를 처음부터 읽는 새 파일 객체"""
+    return open(upload["path"], "rb") if upload["path"] else io.BytesIO(upload["data"])
+
+
+def discard_upload(upload: dict):
+    if upload.get("path"):
+        try:
+            os.remove(upload["path"])
+        except OSError:
+            pass
+        upload["path"] = None
@@ -0,0 +1,197 @@
+"""🔹 비슷한 일기 검색용 사용자별 CLIP 임베딩 인덱스"""
+import base64
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# ✅ 검색 시 한 번에 float로 바꿔 계산하는 행 수 (임시 메모리 상한)
+SEARCH_CHUNK_ROWS = 4096
+
+
+def embedding_columns(payload: Optional[dict]) -> dict:
+    """🔹 AI 서버 응답의 embedding({"embedding_model", "dtype", "dim", "scale", "data"}) → Image 컬럼 값"""
+    if not payload or not payload.get("data"):
+        return {}
+    data = base64.b64decode(payload["data"])
+    dtype = np.int8 if payload.get("dtype") == "int8" else np.dtype("<f4")
+    if len(data) != int(payload.get("dim", 0)) * np.dtype(dtype).itemsize:
+        return {}  # 형식이 맞지 않는 임베딩은 저장하지 않음
+    return {
+        "embedding": data,
+        "embedding_scale": payload.get("scale") if dtype == np.int8 else None,
+        "embedding_model": payload.get("embedding_model"),
+    }
+
+
+def decode_embedding(payload: dict) -> np.ndarray:
+    """🔹 AI 서버 임베딩 표현 → float32 벡터"""
+    data = base64.b64decode(payload["data"])
+    if payload.get("dtype") == "int8":
+        return np.frombuffer(data, dtype=np.int8).astype(np.float32) * float(payload["scale"])
+    return np.frombuffer(data, dtype="<f4").astype(np.float32)
+
+
+def _quantize(data: bytes, scale: Optional[float]) -> Tuple[np.ndarray, float]:
+    """🔹 저장된 임베딩 → (int8 코드, 스케일), float32로 저장된 것도 인덱스에서는 int8로 보관"""
+    if scale is not None:
+        return np.frombuffer(data, dtype=np.int8), float(scale)
+    vector = np.frombuffer(data, dtype="<f4")
+    peak = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = peak / 127 if peak > 0 else 1.0
+    return np.clip(np.rint(vector / scale), -127, 127).astype(np.int8), scale
+
+
+class _Vectors:
+    """🔹 한 사용자 + 한 모델 버전의 이미지 임베딩 (int8 행렬 + 행별 스케일)"""
+
+    def __init__(self, dim: int):
+        self.image_ids: List[uuid.UUID] = []
+        self.diary_ids: List[uuid.UUID] = []
+        self.image_urls: List[str] = []
+        self.codes = np.empty((0, dim), dtype=np.int8)
+        self.scales = np.empty(0, dtype=np.float32)
+
+    def add(self, rows: List[tuple]):
+        self.image_ids.extend(row[0] for row in rows)
+        self.diary_ids.extend(row[1] for row in rows)
+        self.image_urls.extend(row[4] for row in rows)
+        self.codes = np.concatenate([self.codes, np.stack([row[2] for row in rows])])
+        self.scales = np.concatenate([self.scales, np.array([row[3] for row in rows], dtype=np.float32)])
+
+    def remove(self, image_ids: set):
+        keep = [i for i, image_id in enumerate(self.image_ids) if image_id not in image_ids]
+        self.image_ids = [self.image_ids[i] for i in keep]
+        self.diary_ids = [self.diary_ids[i] for i in keep]
+        self.image_urls = [self.image_urls[i] for i in keep]
+        self.codes, self.scales = self.codes[keep], self.scales[keep]
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        return self.codes[rows].astype(np.float32) * self.scales[rows, None]
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """🔹 정규화된 query와 모든 행의 코사인 유사도 (저장 벡터는 AI 서버에서 정규화됨)"""
+        scores = np.empty(len(self.image_ids), dtype=np.float32)
+        for start in range(0, len(scores), SEARCH_CHUNK_ROWS):
+            chunk = self.codes[start:start + SEARCH_CHUNK_ROWS].astype(np.float32)
+            scores[start:start + SEARCH_CHUNK_ROWS] = (chunk @ query) * self.scales[start:start + SEARCH_CHUNK_ROWS]
+        return scores
+
+    def best_per_diary(self, scores: np.ndarray, limit: int, exclude=None) -> List[Tuple[uuid.UUID, float, str]]:
+        """🔹 유사도 높은 순으로 일기별 최고 점수 행만 골라 (일기 ID, 점수, 이미지 URL) 최대 limit개"""
+        results, seen = [], {exclude}
+        for row in np.argsort(-scores, kind="stable"):
+            diary_id = self.diary_ids[row]
+            if diary_id in seen:
+                continue
+            seen.add(diary_id)
+            results.append((diary_id, float(scores[row]), self.image_urls[row]))
+            if len(results) == limit:
+                break
+        return results
+
+
+class VectorIndex:
+    """🔹 사용자별 CLIP 임베딩 인메모리 인덱스 (비슷한 일기 검색)
+
+    DB에 저장된 임베딩을 처음 검색할 때 한 번 읽어 두고, 이후에는 sync()가 (이미지 ID, 모델 버전) 목록만
+    비교해 새로 생겼거나 다른 버전으로 다시 계산된 이미지의 임베딩만 읽고 사라진 이미지는 뺀다 (다시 추론하지 않음).
+    서로 다른 모델 버전의 임베딩은 비교할 수 없으므로 버전별로 따로 보관한다.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._users: "OrderedDict[uuid.UUID, Dict[str, _Vectors]]" = OrderedDict()
+        self._synced_at: Dict[uuid.UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def needs_sync(self, user_id: uuid.UUID, count: int, max_age: float, model: Optional[str] = None) -> bool:
+        """🔹 DB의 임베딩 이미지 수가 인덱스와 다르거나, 마지막 sync가 max_age초보다 오래됐거나,
+        model 버전의 임베딩이 인덱스에 없으면 (재태깅으로 모델이 바뀐 직후) True
+        """
+        with self._lock:
+            shards = self._users.get(user_id)
+            if shards is None:
+                return True
+            if model is not None and not shards.get(model or ""):
+                return True
+            indexed = sum(len(vectors.image_ids) for vectors in shards.values())
+            return indexed != count or time.monotonic() - self._synced_at.get(user_id, 0.0) > max_age
+
+    def sync(self, user_id: uuid.UUID, present: Dict[uuid.UUID, Optional[str]],
+             load: Callable[[List[uuid.UUID]], List[tuple]]):
+        """🔹 현재 DB의 (임베딩이 있는) 이미지 {ID: 모델 버전}에 맞춰 인덱스 갱신
+
+        모델 버전이 바뀐 이미지는 이전 버전 행을 빼고 다시 읽는다.
+        load(이미지 ID 목록) → [(image_id, diary_id, embedding, embedding_scale, embedding_model, image_url)]
+        """
+        present = {image_id: model or "" for image_id, model in present.items()}
+        with self._lock:
+            shards = self._users.setdefault(user_id, {})
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                evicted, _ = self._users.popitem(last=False)
+                self._synced_at.pop(evicted, None)
+            indexed = {image_id: model for model, vectors in shards.items() for image_id in vectors.image_ids}
+
+        removed = {image_id for image_id, model in indexed.items() if present.get(image_id) != model}
+        missing = [image_id for image_id, model in present.items() if indexed.get(image_id) != model]
+        rows = load(missing) if missing else []
+
+        with self._lock:
+            if removed:
+                for model in list(shards):
+                    shards[model].remove(removed)
+                    if not shards[model].image_ids:
+                        del shards[model]  # 모두 다른 버전으로 다시 계산된 이전 버전
+            indexed = {image_id for vectors in shards.values() for image_id in vectors.image_ids}
+            by_model: Dict[str, List[tuple]] = {}
+            for image_id, diary_id, data, scale, model, image_url in rows:
+                if image_id in indexed:
+                    continue  # 동시에 sync한 요청이 이미 추가함
+                codes, scale = _quantize(data, scale)
+                by_model.setdefault(model or "", []).append((image_id, diary_id, codes, scale, image_url))
+            for model, model_rows in by_model.items():
+                dim = len(model_rows[0][2])
+                model_rows = [row for row in model_rows if len(row[2]) == dim]
+                if model not in shards:
+                    shards[model] = _Vectors(dim)
+                elif shards[model].codes.shape[1] != dim:
+                    continue
+                shards[model].add(model_rows)
+            self._synced_at[user_id] = time.monotonic()
+
+    def similar(self, user_id: uuid.UUID, diary_id: uuid.UUID, limit: int) -> List[Tuple[uuid.UUID, float, str]]:
+        """🔹 diary_id 일기 사진들의 평균 임베딩과 가장 비슷한 다른 일기 → (일기 ID, 점수, 가장 비슷한 사진 URL)"""
+        best: Dict[uuid.UUID, tuple] = {}
+        with self._lock:
+            for vectors in self._users.get(user_id, {}).values():
+                rows = [i for i, owner in enumerate(vectors.diary_ids) if owner == diary_id]
+                if not rows:
+                    continue
+                query = vectors.vectors(np.array(rows)).mean(axis=0)
+                norm = float(np.linalg.norm(query))
+                if norm == 0:
+                    continue
+                for match in vectors.best_per_diary(vectors.scores(query / norm), limit, exclude=diary_id):
+                    if match[1] > best.get(match[0], (None, -2.0))[1]:
+                        best[match[0]] = match
+        return sorted(best.values(), key=lambda match: match[1], reverse=True)[:limit]
+
+    def search(self, user_id: uuid.UUID, query: np.ndarray, model: str, limit: int) -> List[Tuple[uuid.UUID, float, str]]:
+        """🔹 같은 모델 버전의 텍스트 임베딩으로 사진 검색 (한 번의 행렬 곱) → (일기 ID, 점수, 사진 URL)"""
+        norm = float(np.linalg.norm(query))
+        with self._lock:
+            vectors = self._users.get(user_id, {}).get(model or "")
+            if vectors is None or not vectors.image_ids or norm == 0:
+                return []
+            return vectors.best_per_diary(vectors.scores(query.astype(np.float32) / norm), limit)
+
+
+# ✅ 전역 인덱스 (워커 프로세스 메모리, 다른 워커가 저장한 이미지는 다음 sync에서 반영)
+vector_index = VectorIndex(settings.SIMILAR_INDEX_MAX_USERS)
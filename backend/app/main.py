@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, diary, feeling
+from app.routers import admin, auth, diary, feeling
 from app.database import Base, engine
+from app.core.config import settings
+from app.core.tracing import TracingMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.tagging_queue import tagging_worker
 
 
 # ✅ DB 테이블 자동 생성 (개발용, Alembic을 사용할 경우 생략 가능)
@@ -26,10 +30,31 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 HTTP 헤더 허용
 )
 
+# ✅ 온디맨드 프로파일링 (관리자 토큰이 있을 때만 등록, TracingMiddleware 안쪽에서 실행)
+if settings.ADMIN_TOKEN or settings.PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(ProfilingMiddleware, exclude_paths=("/admin",))
+
+# ✅ 요청별 서버 span (AI 서버 요청까지 같은 trace로 이어짐)
+app.add_middleware(TracingMiddleware)
+
 # ✅ 라우터 등록 (API 엔드포인트 설정)
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(diary.router, tags=["Diary"])
 app.include_router(feeling.router)
+app.include_router(admin.router)
+
+# ✅ 백그라운드 이미지 태깅 워커 (tagging_job 테이블의 작업 처리)
+
+
+@app.on_event("startup")
+def start_tagging_worker():
+    tagging_worker.start()
+
+
+@app.on_event("shutdown")
+def stop_tagging_worker():
+    tagging_worker.stop()
+
 
 # ✅ 기본 엔드포인트
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Text, Float
+from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Text, Float, LargeBinary, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -15,6 +15,11 @@ class Diary(Base):
     date = Column(TIMESTAMP, nullable=False)
     text = Column(Text, nullable=True)
     emotions = Column(String, nullable=True)  # 감정(emotions) 컬럼 추가
+    # ✅ AI 서버가 일기 텍스트로 추천한 감정 (사용자가 고른 emotions는 바꾸지 않음, ", "로 구분)
+    suggested_emotions = Column(String, nullable=True)
+    emotion_model = Column(String, nullable=True)  # 추천에 쓴 감정 모델 버전
+    # ✅ 이미지 태깅 상태 (pending: 백그라운드 태깅 대기/진행 중, done: 태그 저장됨, failed: 재시도 모두 실패)
+    tagging_status = Column(String, nullable=False, default="done", server_default="done")
     # server_default 수정
     created_at = Column(TIMESTAMP, server_default=func.now())
 
@@ -39,6 +44,10 @@ class Image(Base):
     image_url = Column(String, nullable=False)
     latitude = Column(Float, nullable=True)  # ✅ 위도 추가
     longitude = Column(Float, nullable=True)  # ✅ 경도 추가
+    # ✅ AI 서버가 장소 태깅에 쓴 CLIP 이미지 임베딩 (비슷한 일기 검색용, 다시 추론하지 않음)
+    embedding = Column(LargeBinary, nullable=True)  # little-endian 벡터 바이트 (int8 또는 float32)
+    embedding_scale = Column(Float, nullable=True)  # int8 양자화 스케일 (float32면 NULL)
+    embedding_model = Column(String, nullable=True)  # 임베딩을 만든 모델 버전 (버전이 같은 것끼리만 비교)
 
     # 이미지 -> 다이어리 관계
     diary = relationship("Diary", back_populates="images")
@@ -67,3 +76,20 @@ class ImageTag(Base):
     # 태그 매핑 관계
     image = relationship("Image", back_populates="tags")
     tag = relationship("Tag")
+
+
+class TaggingJob(Base):
+    """일기 이미지 태깅 작업 (DB에 남으므로 서버가 재시작돼도 이어서 처리)"""
+    __tablename__ = "tagging_job"
+    __table_args__ = (Index("ix_tagging_job_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    diary_id = Column(UUID(as_uuid=True), ForeignKey(
+        "diary.id", ondelete="CASCADE"), nullable=False, unique=True)
+    status = Column(String, nullable=False, default="queued")  # queued → running → done / failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)  # 재시도 대기 (지수 백오프)
+    locked_at = Column(TIMESTAMP, nullable=True)  # running 시작 시각 (오래되면 다른 워커가 다시 가져감)
+    last_error = Column(Text, nullable=True)
+    traceparent = Column(String, nullable=True)  # 작업을 만든 요청의 trace (워커가 같은 trace로 이어서 기록)
+    created_at = Column(TIMESTAMP, server_default=func.now())
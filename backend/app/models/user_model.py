@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 from app.database import Base
@@ -12,3 +12,15 @@ class User(Base):
     username = Column(String, nullable=False)
     hashed_password = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UserPlace(Base):
+    """사용자가 등록한 장소 (AI 서버가 전역 장소 목록과 함께 제로샷으로 분류)"""
+    __tablename__ = "user_place"
+    __table_args__ = (UniqueConstraint("user_id", "label", name="uq_user_place_label"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    label = Column(String, nullable=False)  # CLIP에 넣는 영문 설명 (예: "my living room with a grey sofa")
+    tag_name = Column(String, nullable=False)  # 붙일 장소 태그 (예: "우리집")
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,34 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
+from app.core.config import settings
+from app.core.profiling import profiler, verify_admin_token
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """🔹 X-Admin-Token 헤더 확인 (ADMIN_TOKEN 미설정이면 관리자 API 비활성)"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="관리자 API가 비활성화되어 있습니다.")
+    if not verify_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+class ProfilingSettings(BaseModel):
+    sample_rate: float  # 0 ~ 1, 0이면 끔 (X-Profile 헤더 요청은 항상 프로파일링)
+    duration_seconds: Optional[float] = None  # 지나면 자동으로 꺼짐
+
+
+@router.get("/profiling")
+def get_profiling():
+    """🔹 현재 워커의 프로파일링 스위치 상태"""
+    return profiler.status()
+
+
+@router.put("/profiling")
+def update_profiling(request: ProfilingSettings):
+    """🔹 요청 샘플링 비율 변경 (이 요청을 받은 워커 프로세스에만 적용)"""
+    profiler.configure(request.sample_rate, request.duration_seconds)
+    return profiler.status()
@@ -5,8 +5,12 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
-from app.models.user_model import User
-from app.schemas.user_schema import UserCreate, Token, UserResponse
+import uuid
+from typing import List
+
+from app.core.config import settings
+from app.models.user_model import User, UserPlace
+from app.schemas.user_schema import UserCreate, Token, UserResponse, UserPlaceCreate, UserPlaceResponse
 from app.database import get_db
 
 router = APIRouter()
@@ -114,3 +118,37 @@ def get_user_info(user: User = Depends(get_current_user)):
         "username": user.username,
         "created_at": user.created_at
     }
+
+# ✅ 사용자 장소 API (예: "우리집", 다니는 헬스장 — 이후 업로드하는 사진의 장소 태깅에 함께 사용)
+
+
+@router.get("/me/places", response_model=List[UserPlaceResponse])
+def list_user_places(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    return db.query(UserPlace).filter(UserPlace.user_id == user.id).order_by(UserPlace.created_at).all()
+
+
+@router.post("/me/places", response_model=UserPlaceResponse, status_code=status.HTTP_201_CREATED)
+def create_user_place(place: UserPlaceCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    label, tag_name = place.label.strip(), place.tag_name.strip()
+    if not label or not tag_name:
+        raise HTTPException(status_code=400, detail="장소 설명과 태그 이름을 입력해 주세요.")
+    places = db.query(UserPlace).filter(UserPlace.user_id == user.id).all()
+    if any(existing.label == label for existing in places):
+        raise HTTPException(status_code=409, detail="이미 등록된 장소 설명입니다.")
+    if len(places) >= settings.USER_PLACES_MAX:
+        raise HTTPException(status_code=400, detail=f"장소는 최대 {settings.USER_PLACES_MAX}개까지 등록할 수 있습니다.")
+
+    new_place = UserPlace(user_id=user.id, label=label, tag_name=tag_name)
+    db.add(new_place)
+    db.commit()
+    db.refresh(new_place)
+    return new_place
+
+
+@router.delete("/me/places/{place_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user_place(place_id: uuid.UUID, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    place = db.query(UserPlace).filter(UserPlace.id == place_id, UserPlace.user_id == user.id).first()
+    if place is None:
+        raise HTTPException(status_code=404, detail="장소를 찾을 수 없습니다.")
+    db.delete(place)
+    db.commit()
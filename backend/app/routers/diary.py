@@ -1,30 +1,68 @@
 import uuid
+import asyncio
+import contextvars
 import requests
 import io
+import shutil
+import tempfile
 import piexif
 from PIL import Image as PILImage, ExifTags
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.database import get_db
 from app.models.diary_model import Diary, Image, Tag, ImageTag
-from app.schemas.diary_schema import DiaryResponse, TagResponse, ImageResponse, PlaceResponse
+from app.schemas.diary_schema import (DiaryResponse, TagResponse, ImageResponse, PlaceResponse, SimilarDiaryResponse,
+                                      TaggingStatusResponse)
 from app.routers.auth import get_current_user
-from app.core.config import s3_client, settings  # ✅ S3 클라이언트 임포트
+from app.core.config import s3_client, s3_transfer_config, settings  # ✅ S3 클라이언트 임포트
+from app.core.tagging_queue import TAGGING_PENDING, enqueue_tagging, tagging_worker
+from app.core.tracing import inject, span
+from app.core.uploads import discard_upload, open_upload
+from app.core.vector_index import decode_embedding, vector_index
 from datetime import datetime, timedelta, timezone
 from calendar import monthrange
 from fastapi import Query
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 router = APIRouter(prefix="/diary", tags=["Diary"])
 
-AI_SERVER_URL = "http://192.168.0.16:8001/ai/generate-tags"  # ✅ AI 서버 URL
-
-
-def extract_gps_from_exif(image_data):
-    """EXIF 메타데이터에서 GPS 정보 추출"""
+AI_TEXT_ENCODE_URL = "http://192.168.0.16:8001/ai/encode-text"  # ✅ 검색어 CLIP 텍스트 임베딩
+AI_TEXT_ENCODE_TIMEOUT = 5  # ✅ 검색어 인코딩 대기 시간 (초)
+# ✅ EXIF(APP1)를 찾기 위해 읽는 파일 앞부분 크기 (APP1은 최대 64KB, 보통 APP0 바로 뒤에 옴)
+EXIF_HEADER_BYTES = 128 * 1024
+JPEG_MAGIC = b"\xff\xd8\xff"
+SPOOL_COPY_BYTES = 1024 * 1024
+
+
+def read_exif_segment(header: bytes) -> Optional[bytes]:
+    """JPEG 앞부분 바이트에서 EXIF(APP1) 세그먼트만 찾아 반환 (이미지 전체를 디코딩하지 않음)"""
+    if not header.startswith(JPEG_MAGIC):
+        return None
+    offset = 2
+    while offset + 4 <= len(header) and header[offset] == 0xFF:
+        marker = header[offset + 1]
+        if marker == 0xFF:  # 채움 바이트
+            offset += 1
+            continue
+        if marker == 0xDA:  # SOS 이후는 이미지 데이터
+            return None
+        length = int.from_bytes(header[offset + 2:offset + 4], "big")
+        segment = header[offset + 4:offset + 2 + length]
+        if marker == 0xE1 and segment.startswith(b"Exif\x00\x00"):
+            return segment if len(segment) == length - 2 else None
+        offset += 2 + length
+    return None
+
+
+def extract_gps_from_exif(exif_data: Optional[bytes]):
+    """EXIF 메타데이터(APP1 세그먼트)에서 GPS 정보 추출"""
+    if not exif_data:
+        return None, None
     try:
-        exif_dict = piexif.load(image_data)
+        exif_dict = piexif.load(exif_data)
         gps_data = exif_dict.get("GPS", {})
 
         if not gps_data or 2 not in gps_data or 4 not in gps_data:
@@ -60,45 +98,85 @@ def extract_gps_from_exif(image_data):
         return None, None
 
 
-def upload_image_to_s3(image: UploadFile, s3_filename: str):
-    """GPS 메타데이터 포함하여 S3 업로드 및 GPS 정보 반환"""
+# ✅ S3 업로드 전용 스레드 풀 (요청끼리 공유, 워커 전체의 동시 업로드 수 상한)
+_upload_executor = ThreadPoolExecutor(max_workers=settings.S3_UPLOAD_CONCURRENCY, thread_name_prefix="s3-upload")
+
+
+def s3_image_url(s3_filename: str) -> str:
+    """S3 객체 URL (업로드 전에 미리 계산해 AI 태깅 결과와 매칭하는 키로 사용)"""
+    return f"https://{settings.AWS_S3_BUCKET_NAME}.s3.amazonaws.com/{s3_filename}"
+
+
+def spool_upload(file) -> dict:
+    """업로드 파일 → {"data" 또는 "path", "header"} (UPLOAD_SPOOL_MAX_MB보다 크면 디스크 임시 파일로 옮김)"""
+    limit = settings.UPLOAD_SPOOL_MAX_MB * 1024 * 1024
+    file.seek(0)
+    head = file.read(max(limit, EXIF_HEADER_BYTES) + 1)
+    if len(head) <= limit:
+        return {"data": head, "path": None, "header": head[:EXIF_HEADER_BYTES]}
+    with tempfile.NamedTemporaryFile(dir=settings.UPLOAD_SPOOL_DIR, prefix="upload-", delete=False) as spool:
+        spool.write(head)
+        shutil.copyfileobj(file, spool, SPOOL_COPY_BYTES)
+    return {"data": None, "path": spool.name, "header": head[:EXIF_HEADER_BYTES]}
+
+
+def transcode_to_jpeg(upload: dict):
+    """JPEG가 아닌 이미지(PNG, WebP 등)만 EXIF를 유지하며 JPEG로 변환해 upload 내용을 바꿈"""
+    with open_upload(upload) as source, span("image.encode_jpeg"):
+        pil_image = PILImage.open(source)
+        exif_bytes = pil_image.info.get("exif") or b""
+        if exif_bytes and not exif_bytes.startswith(b"Exif\x00\x00"):
+            exif_bytes = b"Exif\x00\x00" + exif_bytes
+        if pil_image.mode not in ("RGB", "L"):
+            pil_image = pil_image.convert("RGB")  # 알파 채널 / 팔레트는 JPEG로 저장할 수 없음
+        buffer = io.BytesIO()
+        pil_image.save(buffer, format="JPEG", **({"exif": exif_bytes} if exif_bytes else {}))
+    discard_upload(upload)
+    upload.update(spool_upload(buffer))
+    upload["content_type"] = "image/jpeg"
+
+
+def upload_image_to_s3(upload: dict, s3_filename: str):
+    """원본 바이트 그대로 S3 업로드 후 URL 반환 (JPEG는 다시 인코딩하지 않으므로 EXIF / 화질 그대로 유지)"""
+    with open_upload(upload) as source, span("s3.upload", key=s3_filename):
+        s3_client.upload_fileobj(
+            source,
+            settings.AWS_S3_BUCKET_NAME,
+            s3_filename,
+            ExtraArgs={"ContentType": "image/jpeg"},
+            Config=s3_transfer_config,
+        )
 
-    # ✅ 이미지 로드
-    image_data = image.file.read()
-    image.file.seek(0)  # 읽기 위치 리셋
-    pil_image = PILImage.open(io.BytesIO(image_data))
+    return s3_image_url(s3_filename)
 
-    # ✅ GPS 정보 추출
-    latitude, longitude = extract_gps_from_exif(image_data)
 
-    # ✅ EXIF 정보 로드
-    try:
-        exif_dict = piexif.load(image_data)
-        exif_bytes = piexif.dump(exif_dict)
-    except Exception:
-        exif_bytes = None
-
-    # ✅ EXIF 정보 유지하면서 JPEG로 변환
-    buffer = io.BytesIO()
-    if exif_bytes:
-        pil_image.save(buffer, format="JPEG", exif=exif_bytes)
-    else:
-        pil_image.save(buffer, format="JPEG")
-    buffer.seek(0)
-
-    # ✅ S3 업로드
-    s3_client.upload_fileobj(
-        buffer,
-        settings.AWS_S3_BUCKET_NAME,
-        s3_filename,
-        ExtraArgs={"ContentType": "image/jpeg"},
-    )
+async def upload_images_to_s3(uploads: list):
+    """일기 이미지 전체를 업로드 스레드 풀에서 동시에 S3 업로드 (가장 느린 이미지 하나만큼 걸림)"""
+    loop = asyncio.get_running_loop()
+
+    def _upload(upload):
+        with span("diary.upload_image", filename=upload["filename"]):
+            upload_image_to_s3(upload, upload["s3_filename"])
 
-    return f"https://{settings.AWS_S3_BUCKET_NAME}.s3.amazonaws.com/{s3_filename}", latitude, longitude
+    # 이미지마다 현재 컨텍스트를 복사해 넘겨 업로드 span이 요청 trace 아래에 남도록 함
+    await asyncio.gather(*(
+        loop.run_in_executor(_upload_executor, contextvars.copy_context().run, _upload, upload)
+        for upload in uploads
+    ))
 
     """다이어리 생성 API - 이미지의 GPS 정보 저장"""
 
 
+def spooled_uploads():
+    """요청 동안 쓰는 업로드 목록 (응답 후 디스크로 옮긴 임시 파일 삭제)"""
+    uploads = []
+    try:
+        yield uploads
+    finally:
+        for upload in uploads:
+            discard_upload(upload)
+
+
 @router.post("/", response_model=DiaryResponse, status_code=status.HTTP_201_CREATED)
 async def create_diary(
     date: str = Form(...),
@@ -107,6 +185,7 @@ async def create_diary(
     images: List[UploadFile] = File(...),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
+    uploads: list = Depends(spooled_uploads),
 ):
 
     new_diary = Diary(
@@ -121,60 +200,49 @@ async def create_diary(
 
     uploaded_images = []
 
-    # ✅ 이미지 S3 업로드 (EXIF 유지 & GPS 저장)
+    # ✅ 이미지는 한 번만 읽어(큰 파일은 디스크로) 앞부분 EXIF에서 GPS를 얻고 S3 키(URL)를 먼저 정함
     for image in images:
+        upload = await asyncio.to_thread(spool_upload, image.file)
+        uploads.append(upload)
+        upload["content_type"] = image.content_type or "application/octet-stream"
         file_extension = image.filename.split(".")[-1]
+        if not upload["header"].startswith(JPEG_MAGIC):
+            # JPEG가 아닌 이미지만 변환 (JPEG 원본은 그대로 저장)
+            await asyncio.to_thread(transcode_to_jpeg, upload)
+            file_extension = "jpg"
         s3_filename = f"{uuid.uuid4()}.{file_extension}"
-
-        s3_url, latitude, longitude = upload_image_to_s3(image, s3_filename)
+        latitude, longitude = extract_gps_from_exif(read_exif_segment(upload["header"]))
 
         # ✅ Image 테이블에 GPS 정보 함께 저장
         new_image = Image(
             id=uuid.uuid4(),
             diary_id=new_diary.id,
-            image_url=s3_url,
+            image_url=s3_image_url(s3_filename),
             latitude=latitude,
             longitude=longitude,
         )
         db.add(new_image)
         uploaded_images.append(new_image)
+        upload.update({
+            "filename": image.filename,
+            "s3_filename": s3_filename,
+            "s3_url": new_image.image_url,
+            "latitude": latitude,
+            "longitude": longitude,
+        })
 
-    db.commit()
-    db.refresh(new_diary)
-
-    # ✅ AI 서버에 이미지 URL 전달하여 태그 요청
-    try:
-        ai_response = requests.post(AI_SERVER_URL, json={"image_urls": [
-                                    img.image_url for img in uploaded_images]})
-        ai_results = ai_response.json().get("results", [])
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI 서버 요청 실패: {str(e)}")
-
-    tags = set()
-
-    # ✅ AI 서버 응답을 기반으로 태그 매핑
-    for result in ai_results:
-        image_url = result["image_url"]
-        image = next(
-            (img for img in uploaded_images if img.image_url == image_url), None)
-
-        if not image:
-            continue  # 해당 URL의 이미지가 DB에 없으면 스킵
-
-        for tag_data in result["tags"]:
-            tag = db.query(Tag).filter(
-                Tag.tag_name == tag_data["tag_name"]).first()
-            if not tag:
-                tag = Tag(id=uuid.uuid4(),
-                          type=tag_data["type"], tag_name=tag_data["tag_name"])
-                db.add(tag)
-                db.flush()
-
-            new_image_tag = ImageTag(image_id=image.id, tag_id=tag.id)
-            db.add(new_image_tag)
-            tags.add(tag)
+    # ✅ S3 업로드 (이미지끼리 병렬, EXIF 유지)
+    await upload_images_to_s3(uploads)
 
-    db.commit()
+    # ✅ 태깅은 백그라운드 작업으로 넘기고 바로 응답 (일기와 작업을 같이 커밋해 작업이 유실되지 않음)
+    new_diary.tagging_status = TAGGING_PENDING
+    enqueue_tagging(db, new_diary.id)
+    with span("db.commit"):
+        db.commit()
+        db.refresh(new_diary)
+    # ✅ 이 프로세스의 워커가 작업을 가져가면 방금 받은 바이트를 그대로 AI 서버로 보냄 (S3에서 다시 받지 않음)
+    if tagging_worker.notify(new_diary.id, list(uploads)):
+        uploads.clear()  # 임시 파일은 워커가 첫 시도 후 삭제
 
     return DiaryResponse(
         id=new_diary.id,
@@ -190,9 +258,9 @@ async def create_diary(
         ],
         emotions=emotions,
         text=new_diary.text,
-        tags=[{"id": tag.id, "type": tag.type, "tag_name": tag.tag_name}
-              for tag in tags],
+        tags=[],  # 태그는 백그라운드 태깅 후 GET /diary/{diary_id}/tagging 으로 확인
         created_at=new_diary.created_at,
+        tagging_status=new_diary.tagging_status,
     )
 
 
@@ -254,7 +322,8 @@ def get_diary_list(
             emotions=diary.emotions.split(", ") if diary.emotions else [],
             text=diary.text,
             tags=tags,
-            created_at=diary.created_at
+            created_at=diary.created_at,
+            tagging_status=diary.tagging_status
         ))
 
     return response
@@ -426,6 +495,84 @@ def get_diary_by_person(person_name: str, db: Session = Depends(get_db), user=De
     return {"person_name": person_name, "diaries": response}
 
 
+def sync_vector_index(db: Session, user_id, model: Optional[str] = None):
+    """사용자 임베딩 인덱스를 DB에 맞춤 (이미지 수가 같고 최근에 맞췄고 model 버전이 있으면 ID 목록 조회도 생략)"""
+    with span("vector_index.sync"):
+        embedded = (
+            db.query(Image)
+            .join(Diary, Diary.id == Image.diary_id)
+            .filter(Diary.user_id == user_id, Image.embedding.isnot(None))
+        )
+        count = embedded.with_entities(func.count(Image.id)).scalar()
+        if not vector_index.needs_sync(user_id, count, settings.SIMILAR_INDEX_SYNC_SECONDS, model):
+            return
+
+        # ✅ (이미지 ID, 모델 버전) 목록만 비교해 새로 생겼거나 다시 계산된 임베딩만 읽음 (다시 추론하지 않음)
+        vector_index.sync(
+            user_id,
+            dict(embedded.with_entities(Image.id, Image.embedding_model).all()),
+            lambda image_ids: db.query(
+                Image.id, Image.diary_id, Image.embedding, Image.embedding_scale, Image.embedding_model,
+                Image.image_url,
+            ).filter(Image.id.in_(image_ids)).all(),
+        )
+
+
+def matched_diaries(db: Session, matches: list) -> List[SimilarDiaryResponse]:
+    """(일기 ID, 점수, 사진 URL) 목록 → 응답 (점수 순서 유지, 썸네일은 가장 잘 맞은 사진)"""
+    diaries = {d.id: d for d in db.query(Diary).filter(Diary.id.in_([match[0] for match in matches])).all()}
+
+    response = []
+    for diary_id, score, image_url in matches:
+        diary = diaries.get(diary_id)
+        if diary is None:
+            continue
+        response.append(SimilarDiaryResponse(
+            id=diary.id,
+            date=diary.date,
+            thumbnail_url=image_url,
+            text=(diary.text or "")[:100],  # 최대 100자 제한
+            emotions=diary.emotions.split(", ") if diary.emotions else [],
+            score=round(score, 4),
+        ))
+    return response
+
+
+def encode_search_text(query: str) -> dict:
+    """AI 서버에서 검색어 CLIP 텍스트 임베딩 받기 (AI 서버가 검색어별 LRU 캐시 유지)"""
+    with span("ai.encode_text"):
+        response = requests.post(
+            AI_TEXT_ENCODE_URL,
+            json={"texts": [query], "embedding": "float32"},
+            headers=inject({}),
+            timeout=AI_TEXT_ENCODE_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()["embeddings"][0]
+
+
+# ✅ "/{diary_id}"보다 먼저 등록해야 "search"가 diary_id로 해석되지 않음
+@router.get("/search", response_model=List[SimilarDiaryResponse])
+def search_diaries(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """자연어로 사진 검색 (예: "바다에서 찍은 사진", "birthday cake") → 점수 순 다이어리"""
+    try:
+        payload = encode_search_text(q)
+    except requests.RequestException as e:
+        raise HTTPException(status_code=503, detail=f"AI 서버 요청 실패: {str(e)}")
+
+    # ✅ 태깅 버전(model_version)이 아니라 임베딩 버전으로 비교 → 장소 목록을 바꿔도 저장된 임베딩을 그대로 검색
+    sync_vector_index(db, user.id, payload.get("embedding_model"))
+    with span("vector_index.search"):
+        matches = vector_index.search(user.id, decode_embedding(payload), payload.get("embedding_model"), limit)
+
+    return matched_diaries(db, matches)
+
+
 @router.get("/{diary_id}", response_model=DiaryResponse)
 def get_diary(diary_id: uuid.UUID, db: Session = Depends(get_db), user=Depends(get_current_user)):
     """UUID 기반 특정 다이어리 조회"""
@@ -457,5 +604,58 @@ def get_diary(diary_id: uuid.UUID, db: Session = Depends(get_db), user=Depends(g
                 tag_name=tag.tag_name
             ) for tag in diary.tags
         ],
-        created_at=diary.created_at
+        created_at=diary.created_at,
+        tagging_status=diary.tagging_status
     )
+
+
+@router.get("/{diary_id}/tagging", response_model=TaggingStatusResponse)
+def get_tagging_status(diary_id: uuid.UUID, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """이미지 태깅 상태 조회 (앱이 pending 동안 폴링, 끝나면 저장된 태그도 함께 반환)"""
+    tagging_status = db.query(Diary.tagging_status).filter(
+        Diary.id == diary_id,
+        Diary.user_id == user.id
+    ).scalar()
+
+    if tagging_status is None:
+        raise HTTPException(status_code=404, detail="다이어리를 찾을 수 없습니다.")
+
+    tags = []
+    if tagging_status != TAGGING_PENDING:
+        tags = (
+            db.query(Tag)
+            .join(ImageTag, Tag.id == ImageTag.tag_id)
+            .join(Image, Image.id == ImageTag.image_id)
+            .filter(Image.diary_id == diary_id)
+            .distinct()
+            .all()
+        )
+
+    return TaggingStatusResponse(
+        diary_id=diary_id,
+        tagging_status=tagging_status,
+        tags=[TagResponse(id=tag.id, type=tag.type, tag_name=tag.tag_name) for tag in tags],
+    )
+
+
+@router.get("/{diary_id}/similar", response_model=List[SimilarDiaryResponse])
+def get_similar_diaries(
+    diary_id: uuid.UUID,
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """사진이 가장 비슷한 과거 다이어리 조회 (저장된 CLIP 임베딩 기준, 다시 추론하지 않음)"""
+    diary = db.query(Diary).filter(
+        Diary.id == diary_id,
+        Diary.user_id == user.id
+    ).first()
+
+    if not diary:
+        raise HTTPException(status_code=404, detail="다이어리를 찾을 수 없습니다.")
+
+    sync_vector_index(db, user.id)
+    with span("similar.search"):
+        matches = vector_index.similar(user.id, diary.id, limit)
+
+    return matched_diaries(db, matches)
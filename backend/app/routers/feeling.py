@@ -3,9 +3,12 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Dict
 from collections import Counter
+from pydantic import BaseModel, Field
 from app.database import get_db
 from app.models.diary_model import Diary
 from app.routers.auth import get_current_user
+from app.core.tracing import inject, span
+import requests
 import urllib.parse
 
 router = APIRouter(tags=["Feeling"])
@@ -13,6 +16,22 @@ router = APIRouter(tags=["Feeling"])
 # ✅ 감정 기본 리스트 (모든 감정을 포함)
 ALL_EMOTIONS = ["기쁨", "신뢰", "긴장", "놀람", "슬픔", "혐오", "격노", "열망"]
 
+AI_EMOTION_URL = "http://192.168.0.16:8001/ai/emotions"  # ✅ 일기 텍스트 감정 분석
+AI_EMOTION_TIMEOUT = 10  # ✅ 감정 분석 대기 시간 (초)
+
+
+def request_emotions(texts: list, priority: str = "interactive", timeout: float = AI_EMOTION_TIMEOUT) -> dict:
+    """AI 서버에 일기 텍스트 감정 분석 요청 → {"model_version", "emotions", "results": [{"scores", "suggested"}]}"""
+    with span("ai.emotions", texts=len(texts)):
+        response = requests.post(AI_EMOTION_URL, json={"texts": texts, "priority": priority},
+                                 headers=inject({}), timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class EmotionSuggestRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=5000)
+
 
 # 🟢 1. 1년 동안 가장 많이 나온 감정 조회
 @router.get("/archive/feeling")
@@ -93,3 +112,23 @@ def get_monthly_feeling_count(emotion: str, year: int, db: Session = Depends(get
         month_count[month_str] += 1
 
     return month_count
+
+
+# 🟢 4. 작성 중인 일기 텍스트로 감정 추천
+@router.post("/feeling/suggest")
+def suggest_feeling(request: EmotionSuggestRequest, user=Depends(get_current_user)):
+    """일기 텍스트를 AI 서버 감정 모델로 분석해 추천 감정과 감정별 확률을 반환 (저장하지 않음)"""
+    text = request.text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="텍스트를 입력해 주세요.")
+    try:
+        result = request_emotions([text])
+    except requests.RequestException as e:
+        raise HTTPException(status_code=503, detail=f"감정 분석 요청 실패: {str(e)}")
+
+    analysis = result["results"][0]
+    return {
+        "suggested": analysis["suggested"],
+        "scores": {emotion: analysis["scores"].get(emotion, 0.0) for emotion in ALL_EMOTIONS},
+        "model_version": result.get("model_version"),
+    }
@@ -38,10 +38,17 @@ class DiaryResponse(BaseModel):
     text: Optional[str]
     tags: List[TagResponse]  # 태그 리스트 추가
     created_at: datetime  # 생성 날짜
+    tagging_status: str = "done"  # 이미지 태깅 상태 (pending / done / failed)
 
     class Config:
         orm_mode = True  # SQLAlchemy 모델 변환 지원
 
+# ✅ 이미지 태깅 상태 응답 스키마 (앱이 pending 동안 폴링)
+class TaggingStatusResponse(BaseModel):
+    diary_id: uuid.UUID
+    tagging_status: str  # pending / done / failed
+    tags: List[TagResponse]  # 저장된 태그 (pending이면 빈 목록, failed면 받은 이미지의 태그만)
+
 # ✅ 개별 장소 다이어리 응답 스키마
 class PlaceDiaryResponse(BaseModel):
     id: uuid.UUID  # 다이어리 ID
@@ -59,4 +66,13 @@ class PlaceResponse(BaseModel):
     diaries: List[PlaceDiaryResponse]  # 다이어리 리스트 (썸네일 + 위치 포함)
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# ✅ 비슷한 다이어리 / 사진 검색 응답 스키마 (CLIP 임베딩 코사인 유사도 순)
+class SimilarDiaryResponse(BaseModel):
+    id: uuid.UUID
+    date: datetime
+    thumbnail_url: Optional[str]  # 가장 잘 맞은 사진
+    text: Optional[str]  # 최대 100자
+    emotions: List[str]
+    score: float  # 코사인 유사도 (-1 ~ 1, 비슷한 일기: 사진끼리 / 검색: 검색어와 사진)
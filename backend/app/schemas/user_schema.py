@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from uuid import UUID  # ✅ UUID 타입 추가
 
@@ -30,3 +30,20 @@ class UserResponse(BaseModel):
     email: str
     username: str
     created_at: datetime
+
+# ✅ 사용자 장소 등록 요청 / 응답 스키마
+
+
+class UserPlaceCreate(BaseModel):
+    label: str = Field(..., min_length=1, max_length=100)  # 영문 설명 (CLIP은 영어로 학습됨)
+    tag_name: str = Field(..., min_length=1, max_length=50)
+
+
+class UserPlaceResponse(BaseModel):
+    id: UUID
+    label: str
+    tag_name: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
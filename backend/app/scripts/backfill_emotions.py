@@ -0,0 +1,64 @@
+"""기존 일기 텍스트 감정 추천 일괄 보정
+
+AI 서버 /ai/emotions를 bulk 우선순위로 호출해 일기별 추천 감정(suggested_emotions)을 채운다.
+사용자가 고른 emotions는 바꾸지 않는다. 이미 채워진 일기는 건너뛰므로 중단 후 다시 실행해도 된다.
+
+    cd backend
+    python -m app.scripts.backfill_emotions                # 추천이 없는 일기만
+    python -m app.scripts.backfill_emotions --all          # 모든 일기 다시 분석 (감정 모델 교체 후)
+    python -m app.scripts.backfill_emotions --chunk 128 --limit 1000
+"""
+import argparse
+import time
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.diary_model import Diary
+from app.routers.feeling import request_emotions
+
+# ✅ 요청당 텍스트 수 (AI 서버 EMOTION_BULK_MAX_TEXTS 이하)
+DEFAULT_CHUNK = 128
+BULK_TIMEOUT = 300  # ✅ bulk 요청은 작성 중 추천 요청에 밀리므로 넉넉히 대기 (초)
+
+
+def backfill_emotions(db: Session, chunk: int = DEFAULT_CHUNK, redo: bool = False, limit: int = None) -> int:
+    """텍스트가 있는 일기를 chunk개씩 분석해 추천 감정 저장 → 갱신한 일기 수"""
+    query = db.query(Diary.id, Diary.text).filter(func.length(func.trim(Diary.text)) > 0)
+    if not redo:
+        query = query.filter(Diary.suggested_emotions.is_(None))
+    rows = query.order_by(Diary.created_at).limit(limit).all()  # limit이 None이면 전체
+    print(f"📦 분석할 일기 {len(rows)}개 (요청당 {chunk}개)")
+
+    updated = 0
+    started_at = time.time()
+    for start in range(0, len(rows), chunk):
+        batch = rows[start:start + chunk]
+        result = request_emotions([text.strip() for _, text in batch], priority="bulk", timeout=BULK_TIMEOUT)
+        for (diary_id, _), analysis in zip(batch, result["results"]):
+            db.query(Diary).filter(Diary.id == diary_id).update({
+                Diary.suggested_emotions: ", ".join(analysis["suggested"]),
+                Diary.emotion_model: result.get("model_version"),
+            }, synchronize_session=False)
+        db.commit()  # 묶음마다 커밋 → 중단돼도 처리한 일기는 남음
+        updated += len(batch)
+        elapsed = time.time() - started_at
+        print(f"  {updated}/{len(rows)} ({updated / elapsed:.1f}개/초)")
+
+    print(f"✅ 감정 추천 저장 완료: {updated}개")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기존 일기 감정 추천 일괄 보정")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="AI 서버 요청당 텍스트 수")
+    parser.add_argument("--all", action="store_true", help="이미 추천이 있는 일기도 다시 분석")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 일기 수")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        backfill_emotions(db, args.chunk, args.all, args.limit)
+    finally:
+        db.close()
@@ -0,0 +1,172 @@
+"""기존 이미지 태그 일괄 재생성 (장소 모델 / 임계값 / 장소 목록 교체 후)
+
+이미지를 ID 순(keyset)으로 chunk개씩 읽어 AI 서버 /ai/generate-tags의 bulk 레인으로 보내고
+(동시에 최대 concurrency개 요청), 다시 계산한 단계의 태그 타입만 ImageTag에서 한 번에 교체한다.
+chunk마다 커밋 후 마지막 이미지 ID를 체크포인트 파일에 기록하므로, 중단 후 같은 명령으로 이어서 실행된다.
+
+    cd backend
+    python -m app.scripts.retag_images                          # 장소 태그 + CLIP 임베딩만 다시 계산
+    python -m app.scripts.retag_images --stages place,people --concurrency 2
+    python -m app.scripts.retag_images --restart                # 체크포인트를 무시하고 처음부터
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from sqlalchemy.orm import Session
+
+from app.core.config import BASE_DIR, settings
+from app.core.tagging_queue import AI_SERVER_URL, STAGE_TAG_TYPES, save_tag_results
+from app.database import SessionLocal
+from app.models.diary_model import Diary, Image
+from app.models.user_model import UserPlace
+
+DEFAULT_CHECKPOINT = os.path.join(BASE_DIR, "data", "retag_images.checkpoint.json")
+REQUEST_TIMEOUT = 300  # ✅ bulk 레인은 사용자 요청에 밀리므로 넉넉히 대기 (초)
+MAX_RETRIES = 5  # ✅ 429 / 503 (큐 초과, 모델 교체 중) 재시도 횟수
+MAX_FAILED_IDS = 1000  # ✅ 체크포인트에 기록할 실패 이미지 ID 상한
+
+
+def _load_checkpoint(path: str, options: dict, restart: bool) -> dict:
+    """체크포인트 읽기 (옵션이 다르거나 restart면 새로 시작)"""
+    if not restart and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("options") == options:
+            print(f"↩️ 체크포인트에서 이어서 실행: {state['done']}개 완료, 마지막 이미지 {state['last_id']}")
+            return state
+        print("⚠️ 체크포인트 옵션이 달라 처음부터 실행")
+    return {"options": options, "last_id": None, "done": 0, "failed": 0, "failed_ids": []}
+
+
+def _save_checkpoint(path: str, state: dict):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+def _image_query(db: Session, last_id: Optional[str]):
+    query = db.query(Image.id, Image.image_url, Diary.user_id).join(Diary, Image.diary_id == Diary.id)
+    if last_id is not None:
+        query = query.filter(Image.id > uuid.UUID(last_id))
+    return query
+
+
+def _user_places(db: Session, user_ids: set) -> Dict[uuid.UUID, dict]:
+    places = {user_id: {} for user_id in user_ids}
+    for place in db.query(UserPlace).filter(UserPlace.user_id.in_(user_ids)):
+        places[place.user_id][place.label] = place.tag_name
+    return places
+
+
+def _request_tags(image_urls: List[str], user_id: uuid.UUID, places: dict, stages: List[str],
+                  embedding: Optional[str]) -> List[dict]:
+    """AI 서버 bulk 레인 태깅 (429/503이면 Retry-After만큼 기다렸다가 재시도)"""
+    payload = {
+        "image_urls": image_urls,
+        "priority": "bulk",
+        "deadline_ms": (REQUEST_TIMEOUT - 10) * 1000,
+        "user_id": str(user_id),
+        "places": places,
+        "stages": stages,
+        **({"embedding": embedding} if embedding else {}),
+    }
+    for attempt in range(MAX_RETRIES + 1):
+        response = requests.post(AI_SERVER_URL, json=payload, timeout=REQUEST_TIMEOUT)
+        if response.status_code in (429, 503) and attempt < MAX_RETRIES:
+            time.sleep(float(response.headers.get("Retry-After") or 2 ** attempt))
+            continue
+        response.raise_for_status()
+        return response.json().get("results", [])
+
+
+def retag_images(db: Session, stages: List[str], chunk: int = 256, per_request: int = 8, concurrency: int = 4,
+                 checkpoint: str = DEFAULT_CHECKPOINT, restart: bool = False, limit: Optional[int] = None) -> dict:
+    """이미지 태그 재생성 → 최종 체크포인트 상태"""
+    embedding = settings.AI_EMBEDDING_FORMAT if "place" in stages else None
+    state = _load_checkpoint(checkpoint, {"stages": stages, "embedding": embedding}, restart)
+    remaining = _image_query(db, state["last_id"]).count()
+    if limit:
+        remaining = min(remaining, limit)
+    print(f"📦 다시 태깅할 이미지 {remaining}개 (단계: {', '.join(stages)}, 요청당 {per_request}장, 동시 {concurrency}개)")
+
+    processed = 0
+    started_at = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while processed < remaining:
+            rows = _image_query(db, state["last_id"]).order_by(Image.id).limit(min(chunk, remaining - processed)).all()
+            if not rows:
+                break
+            places = _user_places(db, {user_id for _, _, user_id in rows})
+
+            # 같은 사용자 이미지끼리 요청을 묶음 (사용자 장소 목록 / 근접 중복 재사용 범위)
+            requests_by_user: Dict[uuid.UUID, List[str]] = {}
+            for _, image_url, user_id in rows:
+                requests_by_user.setdefault(user_id, []).append(image_url)
+            batches = [(user_id, urls[start:start + per_request])
+                       for user_id, urls in requests_by_user.items() for start in range(0, len(urls), per_request)]
+            futures = [(urls, executor.submit(_request_tags, urls, user_id, places[user_id], stages, embedding))
+                       for user_id, urls in batches]
+
+            images = {image_url: image_id for image_id, image_url, _ in rows}
+            results, failed = [], []
+            for urls, future in futures:
+                try:
+                    for result in future.result():
+                        # 이미지를 받지 못한 경우 기존 태그를 지우지 않도록 실패로 기록
+                        if result.get("error"):
+                            failed.append(str(images[result["image_url"]]))
+                        else:
+                            results.append(result)
+                except requests.RequestException as e:
+                    print(f"⚠️ 태깅 요청 실패 ({len(urls)}장): {e}")
+                    failed.extend(str(images[url]) for url in urls)
+
+            save_tag_results(db, images, results, stages)
+            db.commit()
+
+            processed += len(rows)
+            state["last_id"] = str(rows[-1][0])
+            state["done"] += len(rows) - len(failed)
+            state["failed"] += len(failed)
+            state["failed_ids"] = (state["failed_ids"] + failed)[:MAX_FAILED_IDS]
+            _save_checkpoint(checkpoint, state)
+
+            rate = processed / max(time.time() - started_at, 1e-9)
+            eta = (remaining - processed) / rate if rate > 0 else 0
+            print(f"  {processed}/{remaining} ({rate:.1f}장/초, 남은 시간 {eta / 60:.1f}분, 실패 {state['failed']}개)")
+
+    print(f"✅ 재태깅 완료: {state['done']}개 (실패 {state['failed']}개, 실패한 이미지 ID는 {checkpoint})")
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기존 이미지 태그 일괄 재생성")
+    parser.add_argument("--stages", default="place", help=f"다시 계산할 단계 ({', '.join(STAGE_TAG_TYPES)})")
+    parser.add_argument("--chunk", type=int, default=256, help="한 번에 읽고 커밋하는 이미지 수")
+    parser.add_argument("--per-request", type=int, default=8, help="AI 서버 요청당 이미지 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 보내는 AI 서버 요청 수")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="진행 상황 파일")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    parser.add_argument("--limit", type=int, help="이번 실행에서 처리할 최대 이미지 수")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGE_TAG_TYPES)
+    if not stages or unknown:
+        parser.error(f"알 수 없는 단계: {', '.join(sorted(unknown)) or '(없음)'}")
+    stages = [stage for stage in STAGE_TAG_TYPES if stage in stages]
+
+    db = SessionLocal()
+    try:
+        retag_images(db, stages, args.chunk, args.per_request, args.concurrency, args.checkpoint, args.restart,
+                     args.limit)
+    finally:
+        db.close()
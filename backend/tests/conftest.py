@@ -0,0 +1,33 @@
+"""🔹 backend 단위 테스트 공통 설정 (PostgreSQL 대신 메모리 SQLite 사용)"""
+import os
+import sys
+
+# ✅ 저장소 루트에서 `pytest backend/tests/`로 실행해도 `app` 패키지를 찾도록 backend 디렉터리를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("TRACING_ENABLED", "0")
+os.environ.setdefault("TAGGING_WORKER_THREADS", "0")
+
+import pytest
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def db():
+    from app.database import Base, SessionLocal, engine
+    import app.models.diary_model  # noqa: F401 (테이블 등록)
+    import app.models.user_model  # noqa: F401
+
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
@@ -0,0 +1,52 @@
+"""🔹 자연어 사진 검색: 저장된 CLIP 임베딩과 검색어 임베딩을 임베딩 버전으로 맞춤"""
+import base64
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from app.core import tagging_queue as tq
+from app.core.vector_index import VectorIndex
+from app.models.diary_model import Diary, Image
+from app.models.user_model import User
+from app.routers import diary as diary_router
+
+EMBEDDING_MODEL = "ViT-B/32@224px+flip"
+
+
+def _embedding(vector):
+    vector = np.asarray(vector, dtype="<f4")
+    vector = vector / np.linalg.norm(vector)
+    return {"embedding_model": EMBEDDING_MODEL, "dtype": "float32", "dim": len(vector),
+            "data": base64.b64encode(vector.tobytes()).decode("ascii")}
+
+
+def test_search_still_matches_after_vocabulary_reload(db, monkeypatch):
+    user = User(id=uuid.uuid4(), email="user@example.com", username="user", hashed_password="x")
+    db.add(user)
+    db.flush()
+    diary = Diary(id=uuid.uuid4(), user_id=user.id, date=datetime.utcnow(), text="바다 여행")
+    db.add(diary)
+    db.flush()
+    image = Image(id=uuid.uuid4(), diary_id=diary.id, image_url="https://s3/sea.jpg")
+    db.add(image)
+    db.flush()
+
+    # 장소 목록 aaaa로 태깅할 때 저장된 임베딩
+    tq.save_tag_results(db, {image.image_url: image.id}, [{
+        "image_url": image.image_url,
+        "tags": [{"type": "장소", "tag_name": "바다", "model_version": "ViT-B/32@0.2/aaaa"}],
+        "skipped_stages": [],
+        "embedding": _embedding([1, 0, 0]),
+    }], ["place"])
+    db.commit()
+
+    # 장소 목록을 다시 읽어 태깅 버전은 bbbb로 바뀌었지만 임베딩 버전은 그대로
+    monkeypatch.setattr(diary_router, "encode_search_text",
+                        lambda query: {**_embedding([0.9, 0.1, 0]), "model_version": "ViT-B/32@0.2/bbbb"})
+    monkeypatch.setattr(diary_router, "vector_index", VectorIndex(max_users=10))
+
+    results = diary_router.search_diaries(q="바다", limit=5, db=db, user=user)
+
+    assert [result.id for result in results] == [diary.id]
+    assert results[0].thumbnail_url == image.image_url
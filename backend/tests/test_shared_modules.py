@@ -0,0 +1,17 @@
+"""🔹 ai-server에서 복사해 온 모듈(tracing, profiling)이 원본과 같은지 확인"""
+import os
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_CORE = os.path.join(BACKEND_DIR, "app", "core")
+AI_SERVER_CORE = os.path.join(os.path.dirname(BACKEND_DIR), "ai-server", "app", "core")
+
+
+@pytest.mark.parametrize("name", ["tracing.py", "profiling.py"])
+def test_copied_module_matches_ai_server(name):
+    original = os.path.join(AI_SERVER_CORE, name)
+    if not os.path.exists(original):
+        pytest.skip("ai-server 소스가 없는 환경 (backend 이미지 단독 빌드)")
+    with open(original, encoding="utf-8") as f, open(os.path.join(BACKEND_CORE, name), encoding="utf-8") as g:
+        assert g.read() == f.read(), f"backend/app/core/{name}이 ai-server 원본과 다릅니다 — 원본을 다시 복사하세요"
@@ -0,0 +1,184 @@
+"""🔹 tagging_job 큐: 작업 가져오기(lease) / 재시도 / 실패 처리"""
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from app.core import tagging_queue as tq
+from app.core import tracing
+from app.models.diary_model import Diary, Image, ImageTag, TaggingJob
+from app.models.user_model import User
+
+
+@pytest.fixture(autouse=True)
+def queue_settings(monkeypatch):
+    # SQLite에는 now() + interval이 없으므로 파이썬 시각으로 계산 (PostgreSQL에서는 DB 시각)
+    monkeypatch.setattr(tq, "func", SimpleNamespace(now=datetime.utcnow))
+    monkeypatch.setattr(tq.settings, "TAGGING_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(tq.settings, "TAGGING_RETRY_BASE_SECONDS", 60)
+    monkeypatch.setattr(tq.settings, "TAGGING_LEASE_SECONDS", 120)
+
+
+@pytest.fixture
+def diary(db):
+    user = User(id=uuid.uuid4(), email="user@example.com", username="user", hashed_password="x")
+    db.add(user)
+    db.flush()
+    diary = Diary(id=uuid.uuid4(), user_id=user.id, date=datetime.utcnow(), tagging_status=tq.TAGGING_PENDING)
+    db.add(diary)
+    db.flush()
+    db.add(Image(id=uuid.uuid4(), diary_id=diary.id, image_url="https://s3/a.jpg"))
+    tq.enqueue_tagging(db, diary.id)
+    db.commit()
+    return diary
+
+
+def _job(db, diary):
+    db.expire_all()
+    return db.query(TaggingJob).filter(TaggingJob.diary_id == diary.id).one_or_none()
+
+
+def _tags(urls, user_id, places, uploads=None):
+    return [{"image_url": url, "tags": [{"type": "장소", "tag_name": "바다"}], "skipped_stages": [], "error": None}
+            for url in urls]
+
+
+def test_claim_job_marks_running_and_counts_attempt(db, diary):
+    job = tq.claim_job(db)
+
+    assert job.diary_id == diary.id
+    assert job.status == tq.RUNNING and job.attempts == 1 and job.locked_at is not None
+    assert tq.claim_job(db) is None  # lease가 살아 있는 running 작업은 다시 가져가지 않음
+
+
+def test_run_job_saves_tags_and_deletes_job(db, diary, monkeypatch):
+    monkeypatch.setattr(tq, "request_tags", _tags)
+
+    tq.run_job(db, tq.claim_job(db))
+
+    assert _job(db, diary) is None
+    assert db.get(Diary, diary.id).tagging_status == tq.TAGGING_DONE
+    assert db.query(ImageTag).count() == 1
+
+
+def test_worker_sends_handed_off_upload_bytes_and_discards_them(db, diary, monkeypatch, tmp_path):
+    sent = []
+
+    def _capture(urls, user_id, places, uploads=None):
+        sent.append([upload["s3_url"] for upload in uploads])
+        return _tags(urls, user_id, places)
+
+    monkeypatch.setattr(tq, "request_tags", _capture)
+    spool = tmp_path / "upload-a"
+    spool.write_bytes(b"\xff\xd8\xff")
+    upload = {"s3_url": "https://s3/a.jpg", "path": str(spool), "data": None}
+    worker = tq.TaggingWorker(threads=1)
+
+    assert worker.notify(diary.id, [upload])
+    assert worker.run_once()
+
+    assert sent == [["https://s3/a.jpg"]]  # S3에서 다시 받지 않고 받은 바이트를 그대로 보냄
+    assert not spool.exists()
+    assert _job(db, diary) is None
+
+
+def test_worker_continues_the_trace_of_the_request_that_queued_the_job(db, diary, monkeypatch):
+    monkeypatch.setattr(tracing.settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "_exporter", SimpleNamespace(export=lambda span: None))
+    monkeypatch.setattr(tq, "request_tags", _tags)
+    db.query(TaggingJob).delete()
+    with tracing.start_trace("POST /diary/") as request_span:
+        tq.enqueue_tagging(db, diary.id)
+        db.commit()
+
+    finished = []
+    tracing.add_span_listener(finished.append)
+    try:
+        assert tq.TaggingWorker(threads=1).run_once()
+    finally:
+        tracing.remove_span_listener(finished.append)
+
+    (job_span,) = [span for span in finished if span.name == "tagging.job"]
+    assert job_span.trace_id == request_span.trace_id and job_span.parent_id == request_span.span_id
+
+
+def test_skipped_stages_are_retried_then_fail_with_partial_tags(db, diary, monkeypatch):
+    def _degraded(urls, user_id, places, uploads=None):
+        return [{"image_url": url, "tags": [{"type": "장소", "tag_name": "바다"}], "skipped_stages": ["people"],
+                 "error": None} for url in urls]
+
+    monkeypatch.setattr(tq, "request_tags", _degraded)
+
+    tq.run_job(db, tq.claim_job(db))
+    job = _job(db, diary)
+    assert job.status == tq.QUEUED and "people" in job.last_error
+    assert db.get(Diary, diary.id).tagging_status == tq.TAGGING_PENDING
+    assert db.query(ImageTag).count() == 0
+
+    job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    tq.run_job(db, tq.claim_job(db))
+    assert _job(db, diary).status == tq.FAILED
+    assert db.get(Diary, diary.id).tagging_status == tq.TAGGING_FAILED
+    assert db.query(ImageTag).count() == 1  # 마지막 시도에서 계산된 장소 태그는 저장
+
+
+def test_request_failure_requeues_with_backoff_then_fails(db, diary, monkeypatch):
+    def _down(urls, user_id, places, uploads=None):
+        raise requests.ConnectionError("AI 서버 연결 실패")
+
+    monkeypatch.setattr(tq, "request_tags", _down)
+
+    tq.run_job(db, tq.claim_job(db))
+    job = _job(db, diary)
+    assert job.status == tq.QUEUED and job.locked_at is None
+    assert job.next_attempt_at > datetime.utcnow() + timedelta(seconds=30)
+    assert tq.claim_job(db) is None  # 백오프가 끝나기 전에는 가져가지 않음
+
+    job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    tq.run_job(db, tq.claim_job(db))
+    job = _job(db, diary)
+    assert job.status == tq.FAILED and job.attempts == 2
+    assert db.get(Diary, diary.id).tagging_status == tq.TAGGING_FAILED
+
+
+def test_unexpected_error_rolls_back_and_requeues(db, diary, monkeypatch):
+    def _broken(*args, **kwargs):
+        raise ValueError("태그 저장 중 오류")
+
+    monkeypatch.setattr(tq, "request_tags", _tags)
+    monkeypatch.setattr(tq, "save_tag_results", _broken)
+
+    tq.run_job(db, tq.claim_job(db))
+
+    job = _job(db, diary)
+    assert job.status == tq.QUEUED and job.locked_at is None
+    assert "태그 저장 중 오류" in job.last_error
+    assert db.query(ImageTag).count() == 0
+
+
+def test_expired_lease_is_reclaimed(db, diary):
+    job = tq.claim_job(db)
+    job.locked_at = datetime.utcnow() - timedelta(seconds=600)  # 처리하던 프로세스가 죽음
+    db.commit()
+
+    reclaimed = tq.claim_job(db)
+
+    assert reclaimed.id == job.id
+    assert reclaimed.status == tq.RUNNING and reclaimed.attempts == 2
+
+
+def test_expired_lease_on_last_attempt_fails_job(db, diary):
+    job = tq.claim_job(db)
+    job.attempts = tq.settings.TAGGING_MAX_ATTEMPTS
+    job.locked_at = datetime.utcnow() - timedelta(seconds=600)
+    db.commit()
+
+    assert tq.claim_job(db) is None
+
+    job = _job(db, diary)
+    assert job.status == tq.FAILED and job.locked_at is None
+    assert db.get(Diary, diary.id).tagging_status == tq.TAGGING_FAILED
@@ -0,0 +1,80 @@
+"""🔹 사용자별 CLIP 임베딩 인덱스: sync(추가/삭제/모델 버전 교체)와 검색"""
+import uuid
+
+import numpy as np
+
+from app.core.vector_index import VectorIndex
+
+USER = uuid.uuid4()
+
+
+def _row(image_id, diary_id, vector, model="clip-v1"):
+    """DB에서 읽은 것과 같은 (image_id, diary_id, embedding, embedding_scale, embedding_model, image_url) 행"""
+    vector = np.asarray(vector, dtype="<f4")
+    return image_id, diary_id, (vector / np.linalg.norm(vector)).tobytes(), None, model, f"https://s3/{image_id}.jpg"
+
+
+def _loader(rows, loaded=None):
+    by_id = {row[0]: row for row in rows}
+
+    def load(image_ids):
+        if loaded is not None:
+            loaded.extend(image_ids)
+        return [by_id[image_id] for image_id in image_ids]
+    return load
+
+
+def test_sync_loads_only_new_images_and_drops_removed():
+    index = VectorIndex(max_users=10)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    diary_a, diary_b = uuid.uuid4(), uuid.uuid4()
+    rows = [_row(a, diary_a, [1, 0, 0]), _row(b, diary_b, [0, 1, 0]), _row(c, diary_b, [0, 0, 1])]
+    loaded = []
+
+    index.sync(USER, {a: "clip-v1", b: "clip-v1"}, _loader(rows, loaded))
+    index.sync(USER, {a: "clip-v1", c: "clip-v1"}, _loader(rows, loaded))
+
+    assert loaded == [a, b, c]  # 이미 있는 a는 다시 읽지 않음
+    assert not index.needs_sync(USER, 2, max_age=60)
+    results = index.search(USER, np.array([0, 1, 1], dtype=np.float32), "clip-v1", limit=5)
+    assert [image_url for _, _, image_url in results] == [f"https://s3/{c}.jpg", f"https://s3/{a}.jpg"]  # b는 빠짐
+
+
+def test_sync_reloads_images_whose_model_changed():
+    index = VectorIndex(max_users=10)
+    image_id, diary_id = uuid.uuid4(), uuid.uuid4()
+    index.sync(USER, {image_id: "clip-v1"}, _loader([_row(image_id, diary_id, [1, 0])]))
+
+    assert index.needs_sync(USER, 1, max_age=60, model="clip-v2")  # 재태깅 직후 새 버전 검색
+
+    index.sync(USER, {image_id: "clip-v2"}, _loader([_row(image_id, diary_id, [0, 1], model="clip-v2")]))
+
+    assert index.search(USER, np.array([1, 0], dtype=np.float32), "clip-v1", limit=5) == []
+    (match,) = index.search(USER, np.array([0, 1], dtype=np.float32), "clip-v2", limit=5)
+    assert match[0] == diary_id and match[1] > 0.99
+
+
+def test_search_returns_best_image_per_diary():
+    index = VectorIndex(max_users=10)
+    diary_a, diary_b = uuid.uuid4(), uuid.uuid4()
+    rows = [_row(uuid.uuid4(), diary_a, [1, 0.1]), _row(uuid.uuid4(), diary_a, [1, 0.2]),
+            _row(uuid.uuid4(), diary_b, [0.2, 1])]
+    index.sync(USER, {row[0]: "clip-v1" for row in rows}, _loader(rows))
+
+    results = index.search(USER, np.array([1, 0], dtype=np.float32), "clip-v1", limit=5)
+
+    assert [diary_id for diary_id, _, _ in results] == [diary_a, diary_b]
+    assert results[0][2] == rows[0][5]
+    assert index.search(USER, np.array([1, 0], dtype=np.float32), "clip-v1", limit=1) == results[:1]
+
+
+def test_similar_excludes_query_diary():
+    index = VectorIndex(max_users=10)
+    diary_a, diary_b, diary_c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    rows = [_row(uuid.uuid4(), diary_a, [1, 0, 0]), _row(uuid.uuid4(), diary_b, [0.9, 0.1, 0]),
+            _row(uuid.uuid4(), diary_c, [0, 0, 1])]
+    index.sync(USER, {row[0]: "clip-v1" for row in rows}, _loader(rows))
+
+    results = index.similar(USER, diary_a, limit=5)
+
+    assert [diary_id for diary_id, _, _ in results] == [diary_b, diary_c]